@@ -1,14 +1,21 @@
+import uuid
+
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from app.core.container import Container
+from app.core.responses import error_response, success_response
 from app.dto.base_response import BaseResponse
+from app.dto.ekyc.request.face_history_request import FaceHistoryRequest
 from app.dto.ekyc.request.login_request import LoginRequest
 from app.dto.ekyc.request.upload_photos_request import UploadPhotosRequest
+from app.dto.ekyc.response.face_history_response import FaceHistoryResponse
 from app.dto.ekyc.response.login_response import LoginResponse
 from app.dto.ekyc.response.upload_photos_response import UploadPhotosResponse
 from app.service.ekyc.ekyc_service import EkycService
+from app.service.ekyc.session_event_hub import SessionEventHub
 from app.util.security import verify_access_token
 
 router = APIRouter(prefix="/ekyc", tags=["ekyc"])
@@ -19,25 +26,24 @@ router = APIRouter(prefix="/ekyc", tags=["ekyc"])
 async def upload_photos(
     request: UploadPhotosRequest = Depends(),
     user_email: str = Depends(verify_access_token),
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
     ekyc_service: EkycService = Depends(Provide[Container.ekyc_service]),
-) -> BaseResponse[UploadPhotosResponse] | JSONResponse:
+) -> Response:
     result, err = await ekyc_service.upload_photos(
         user_email=user_email,
         left_faces=request.left_faces,
         right_faces=request.right_faces,
         front_faces=request.front_faces,
         fcm_token=request.fcm_token,
+        idempotency_key=idempotency_key,
     )
     if err:
-        return JSONResponse(
-            status_code=err.http_status if hasattr(err, "http_status") else 400,
-            content=BaseResponse.error_response(
-                code=err.code, message=err.message
-            ).model_dump(),
-        )
-
-    return BaseResponse.success_response(
-        data=UploadPhotosResponse(session_id=result.session_id),
+        return error_response(err)
+
+    return success_response(
+        data=UploadPhotosResponse.model_construct(session_id=result.session_id),
         message="Photos uploaded successfully",
     )
 
@@ -46,22 +52,70 @@ async def upload_photos(
 @inject
 async def login(
     request: LoginRequest = Depends(),
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
     ekyc_service: EkycService = Depends(Provide[Container.ekyc_service]),
-) -> BaseResponse[LoginResponse] | JSONResponse:
+) -> Response:
     result, err = await ekyc_service.login(
         user_email=request.email,
         faces=request.faces,
         fcm_token=request.fcm_token,
+        idempotency_key=idempotency_key,
     )
     if err:
-        return JSONResponse(
-            status_code=err.http_status if hasattr(err, "http_status") else 400,
-            content=BaseResponse.error_response(
-                code=err.code, message=err.message
-            ).model_dump(),
-        )
-
-    return BaseResponse.success_response(
-        data=LoginResponse(session_id=result.session_id),
+        return error_response(err)
+
+    return success_response(
+        data=LoginResponse.model_construct(session_id=result.session_id),
         message="Login event published successfully",
     )
+
+
+@router.get("/face-history", response_model=BaseResponse[FaceHistoryResponse])
+@inject
+async def face_history(
+    request: FaceHistoryRequest = Depends(),
+    user_email: str = Depends(verify_access_token),
+    ekyc_service: EkycService = Depends(Provide[Container.ekyc_service]),
+) -> Response:
+    result, err = await ekyc_service.get_face_history(
+        user_email=user_email,
+        limit=request.limit,
+        pose=request.pose,
+        created_from=request.created_from,
+        created_to=request.created_to,
+        cursor=request.cursor,
+    )
+    if err:
+        return error_response(err)
+
+    return success_response(
+        # Service rows already match FaceHistoryItem.
+        data={"items": result.items, "next_cursor": result.next_cursor},
+        message="Face history retrieved successfully",
+    )
+
+
+@router.get("/sessions/{session_id}/events", response_class=StreamingResponse)
+@inject
+async def session_events(
+    session_id: uuid.UUID,
+    session_event_hub: SessionEventHub = Depends(Provide[Container.session_event_hub]),
+) -> Response:
+    """Stream the session's verification state as Server-Sent Events.
+
+    The session id returned by upload/login is the only credential, as for
+    the FCM token flow it replaces.
+    """
+    subscription, err = await session_event_hub.subscribe(str(session_id))
+    if err:
+        return error_response(err)
+
+    return StreamingResponse(
+        subscription.frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs even when the client disconnects before the stream starts.
+        background=BackgroundTask(subscription.close),
+    )
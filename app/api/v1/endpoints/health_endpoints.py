@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from app.core.circuit_breaker import breakers
+from app.core.constants import CircuitState
+
 router = APIRouter(
     prefix="/health",
     tags=["health"],
@@ -8,4 +11,8 @@ router = APIRouter(
 
 @router.get("")
 def health_check():
-    return {"status": "ok"}
+    # Always 200: an open breaker means degraded, not down, and the
+    # process itself is still able to serve requests.
+    dependencies = breakers.states()
+    degraded = any(state != CircuitState.CLOSED for state in dependencies.values())
+    return {"status": "degraded" if degraded else "ok", "dependencies": dependencies}
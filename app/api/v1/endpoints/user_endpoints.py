@@ -1,14 +1,23 @@
+import math
+
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import Response
 
 from app.core.container import Container
+from app.core.responses import error_response, success_response
 from app.dto.base_response import BaseResponse
+from app.dto.user.request.batch_get_users_request import BatchGetUsersRequest
 from app.dto.user.request.get_user_request import GetUserRequest
+from app.dto.user.request.refresh_request import RefreshRequest
 from app.dto.user.request.register_request import RegisterRequest
+from app.dto.user.response.batch_get_users_response import BatchGetUsersResponse
 from app.dto.user.response.get_user_response import GetUserResponse
 from app.dto.user.response.login_response import LoginResponse
+from app.dto.user.response.refresh_response import RefreshResponse
 from app.dto.user.response.register_response import RegisterResponse
+from app.service.user.login_rate_limiter import LoginRateLimiter
+from app.service.user.refresh_token_service import RefreshTokenService
 from app.service.user.user_service import UserService
 from app.dto.user.request.login_request import LoginRequest
 from app.util.security import create_access_token
@@ -19,67 +28,135 @@ router = APIRouter(prefix="/user", tags=["user"])
 
 @router.post("/get-by-email", response_model=BaseResponse[GetUserResponse])
 @inject
-def get_user_by_email(
+async def get_user_by_email(
     request: GetUserRequest,
     user_service: UserService = Depends(Provide[Container.user_service]),
-) -> BaseResponse[GetUserResponse] | JSONResponse:
-    user, err = user_service.get_user_by_email(request.email)
+) -> Response:
+    user, err = await user_service.get_user_by_email(request.email)
     if err:
-        return JSONResponse(
-            status_code=err.http_status,
-            content=BaseResponse.error_response(
-                code=err.code, message=err.message
-            ).model_dump(),
-        )
-
-    user_data = GetUserResponse.model_validate(user)
-    return BaseResponse.success_response(
-        data=user_data, message="User retrieved successfully"
+        return error_response(err)
+
+    # Trusted ORM row; copy the exposed fields without re-validating them.
+    user_data = GetUserResponse.model_construct(
+        **{field: getattr(user, field) for field in GetUserResponse.model_fields}
+    )
+    return success_response(data=user_data, message="User retrieved successfully")
+
+
+@router.post("/get-batch", response_model=BaseResponse[BatchGetUsersResponse])
+@inject
+async def get_users_batch(
+    request: BatchGetUsersRequest,
+    user_service: UserService = Depends(Provide[Container.user_service]),
+) -> Response:
+    results, err = await user_service.get_users_batch(
+        emails=request.emails, user_ids=request.user_ids
+    )
+    if err:
+        return error_response(err)
+
+    # Rows come straight from the projected query and already match
+    # BatchUserItem; serialize them as plain dicts instead of re-validating.
+    items = [
+        {
+            "key": key,
+            "found": row is not None,
+            "user": dict(row) if row is not None else None,
+        }
+        for key, row in results
+    ]
+    return success_response(
+        data={"items": items},
+        message="Users retrieved successfully",
     )
 
 
 @router.post("/register", response_model=BaseResponse[RegisterResponse])
 @inject
-def register_user(
+async def register_user(
     request: RegisterRequest,
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
     user_service: UserService = Depends(Provide[Container.user_service]),
-) -> BaseResponse[RegisterResponse] | JSONResponse:
-    user, err = user_service.register_user(
+    refresh_token_service: RefreshTokenService = Depends(
+        Provide[Container.refresh_token_service]
+    ),
+) -> Response:
+    user, err = await user_service.register_user(
         email=request.email,
         password=request.password,
         full_name=request.full_name,
         phone_number=request.phone_number,
+        idempotency_key=idempotency_key,
     )
     if err:
-        return JSONResponse(
-            status_code=err.http_status,
-            content=BaseResponse.error_response(
-                code=err.code, message=err.message
-            ).model_dump(),
-        )
+        return error_response(err)
     token = create_access_token(subject=user.email)
-    return BaseResponse.success_response(
-        data=RegisterResponse(email=user.email, access_token=token),
+    # Without a stored refresh token the client can still use the access token.
+    refresh_token, _ = await refresh_token_service.issue(user.id)
+    return success_response(
+        data=RegisterResponse.model_construct(
+            email=user.email, access_token=token, refresh_token=refresh_token
+        ),
         message="User registered successfully",
     )
 
 
 @router.post("/login", response_model=BaseResponse[LoginResponse])
 @inject
-def login(
+async def login(
     request: LoginRequest,
+    http_request: Request,
     user_service: UserService = Depends(Provide[Container.user_service]),
-) -> BaseResponse[LoginResponse] | JSONResponse:
-    user, err = user_service.login(request.email, request.password)
+    refresh_token_service: RefreshTokenService = Depends(
+        Provide[Container.refresh_token_service]
+    ),
+    login_rate_limiter: LoginRateLimiter = Depends(
+        Provide[Container.login_rate_limiter]
+    ),
+) -> Response:
+    # Before any lookup or password hash: throttled attempts cost nothing.
+    client_ip = http_request.client.host if http_request.client else None
+    retry_after, err = await login_rate_limiter.check(request.email, client_ip)
+    if err:
+        response = error_response(err)
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+    user, err = await user_service.login(request.email, request.password)
     if err:
-        return JSONResponse(
-            status_code=err.http_status,
-            content=BaseResponse.error_response(
-                code=err.code, message=err.message
-            ).model_dump(),
-        )
+        return error_response(err)
     token = create_access_token(subject=user.email)
-    return BaseResponse.success_response(
-        data=LoginResponse(email=user.email, access_token=token),
+    refresh_token, _ = await refresh_token_service.issue(user.id)
+    return success_response(
+        data=LoginResponse.model_construct(
+            email=user.email, access_token=token, refresh_token=refresh_token
+        ),
         message="Login successful",
     )
+
+
+@router.post("/refresh", response_model=BaseResponse[RefreshResponse])
+@inject
+async def refresh(
+    request: RefreshRequest,
+    refresh_token_service: RefreshTokenService = Depends(
+        Provide[Container.refresh_token_service]
+    ),
+) -> Response:
+    """Exchange a refresh token for a new access token and refresh token.
+
+    No password check: one indexed statement rotates the token. The
+    presented token stops working; reusing it revokes the whole chain.
+    """
+    result, err = await refresh_token_service.refresh(request.refresh_token)
+    if err:
+        return error_response(err)
+    owner, refresh_token = result
+    token = create_access_token(subject=owner.email)
+    return success_response(
+        data=RefreshResponse.model_construct(
+            email=owner.email, access_token=token, refresh_token=refresh_token
+        ),
+        message="Token refreshed",
+    )
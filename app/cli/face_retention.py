@@ -0,0 +1,68 @@
+"""Create upcoming login face partitions and expire old ones.
+
+Usage:
+    uv run face-retention
+    uv run face-retention --interval 3600
+
+Months of login captures older than ``retention.login_face_days`` are
+detached, the storage objects they reference are deleted and the partition
+is dropped. Interrupted runs resume from a per-partition checkpoint.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from app.core.config import configs
+from app.core.database import Database
+from app.repository import UserFacePartitionRepository
+from app.service.retention import FaceRetentionService
+from app.service.storage import FirebaseObjectStorage
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=0,
+        help="keep running, one pass every N seconds (default: run once)",
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=configs.FACE_RETENTION_DAYS
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = _parse_args(argv)
+
+    db = Database(db_url=configs.DATABASE_URL)
+    service = FaceRetentionService(
+        partition_repository=UserFacePartitionRepository(db.session),
+        object_storage=FirebaseObjectStorage(configs.GCS_BUCKET_NAME),
+        retention_days=args.retention_days,
+    )
+
+    while True:
+        result = service.run()
+        print(
+            f"detached={len(result.partitions_detached)} "
+            f"dropped={len(result.partitions_dropped)} "
+            f"failed={len(result.partitions_failed)} "
+            f"objects_deleted={result.objects_deleted}"
+        )
+        if args.interval <= 0:
+            return 0 if not result.partitions_failed else 1
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
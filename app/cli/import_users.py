@@ -0,0 +1,89 @@
+"""Bulk-import users from a legacy CSV or NDJSON export.
+
+Usage:
+    uv run import-users customers.csv --errors-out rejected.ndjson --workers 8
+
+Each record needs ``email`` and either ``password`` (hashed here) or
+``password_hashed`` (already in ``salt$hash`` form); ``full_name`` and
+``phone_number`` are optional. Use ``-`` to read from stdin.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from app.core.config import configs
+from app.core.database import Database
+from app.repository import UserRepository
+from app.service.user.user_import_service import UserImportService, read_rows
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV/NDJSON file, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="input format (default: inferred from the file extension)",
+    )
+    parser.add_argument(
+        "--errors-out",
+        default=None,
+        help="NDJSON file for rejected rows (default: <input>.errors.ndjson)",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="password hashing processes (default: number of CPUs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = _parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        suffix = Path(args.input).suffix.lower()
+        fmt = "ndjson" if suffix in (".ndjson", ".jsonl") else "csv"
+    errors_path = args.errors_out or (
+        "import.errors.ndjson" if args.input == "-" else f"{args.input}.errors.ndjson"
+    )
+
+    db = Database(db_url=configs.DATABASE_URL)
+    service = UserImportService(user_repository=UserRepository(db.session))
+
+    source = (
+        sys.stdin
+        if args.input == "-"
+        else open(args.input, "r", encoding="utf-8", newline="")
+    )
+    with source, open(errors_path, "w", encoding="utf-8") as error_out:
+        result = service.import_users(
+            read_rows(source, fmt),
+            error_out=error_out,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+
+    print(
+        f"processed={result.processed} inserted={result.inserted} "
+        f"duplicates={result.duplicates} invalid={result.invalid} "
+        f"failed={result.failed} elapsed={result.elapsed_seconds:.1f}s "
+        f"rate={result.rows_per_second:.0f} rows/s errors={errors_path}"
+    )
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Apply pending schema migrations.
+
+Usage:
+    uv run migrate
+"""
+
+import logging
+import sys
+
+from app.core.config import configs
+from app.core.database import Database
+from app.core.migrations import run_migrations
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    db = Database(db_url=configs.DATABASE_URL)
+    applied = run_migrations(db.engine)
+    if applied:
+        print(f"Applied {len(applied)} migration(s): {', '.join(applied)}")
+    else:
+        print("Schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Lower-case stored user emails in small online batches.
+
+Usage:
+    uv run normalize-emails
+    uv run normalize-emails --batch-size 500 --pause 0.2
+    uv run normalize-emails --report-duplicates
+
+Walks ``tb_users`` by primary key; each batch is its own short transaction
+that locks only the rows it rewrites, so the table stays writable. Safe to
+rerun. Emails that exist in several letter cases are skipped; list them
+with ``--report-duplicates`` and resolve them before ``migrate`` builds
+the case-insensitive unique index.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from app.core.config import configs
+from app.core.database import Database
+from app.repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.05,
+        help="seconds to sleep between batches",
+    )
+    parser.add_argument(
+        "--report-duplicates",
+        action="store_true",
+        help="list emails stored in several letter cases and exit",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = _parse_args(argv)
+    repository = UserRepository(Database(db_url=configs.DATABASE_URL).session)
+
+    if args.report_duplicates:
+        rows, err = repository.find_case_duplicates(limit=1000)
+        if err:
+            print(err.message, file=sys.stderr)
+            return 1
+        for row in rows:
+            print(f"{row['email']}\t{','.join(str(i) for i in row['user_ids'])}")
+        print(f"{len(rows)} duplicated email(s)", file=sys.stderr)
+        return 0
+
+    after_id = None
+    batches = updated = 0
+    started_at = time.perf_counter()
+    while True:
+        result, err = repository.normalize_emails_batch(after_id, args.batch_size)
+        if err:
+            print(err.message, file=sys.stderr)
+            return 1
+        count, after_id = result
+        if after_id is None:
+            break
+        batches += 1
+        updated += count
+        if batches % 100 == 0:
+            logger.info(f"Normalized {updated} emails in {batches} batches so far")
+        time.sleep(args.pause)
+
+    print(
+        f"updated={updated} batches={batches} "
+        f"in {time.perf_counter() - started_at:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Run the API with several pre-forked worker processes.
+
+Usage:
+    uv run serve
+    uv run serve --workers 4 --port 8080
+
+The parent imports the application once (routes, container, schema checks)
+and then forks the workers, so they share that memory copy-on-write. State
+that must not cross a fork (database connections, the Firebase app, the
+Pub/Sub client, executor threads) is reset in each worker by the
+``after_fork_in_child`` hooks of the modules that own it. The parent only
+supervises: it restarts workers that die and, on SIGTERM/SIGINT, stops them
+gracefully within ``server.graceful_timeout_seconds``.
+
+Metrics, circuit breakers, limiters and in-memory caches are per worker;
+``/metrics`` reports only the worker that accepted the scrape.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+
+from app.core.config import configs
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted with a delay.
+_MIN_WORKER_UPTIME_SECONDS = 1.0
+# uvicorn exits with this code when application startup fails.
+_STARTUP_FAILURE = 3
+# Workers still running this long after the graceful timeout are killed.
+_KILL_GRACE_SECONDS = 5
+_STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and a cgroup v2 quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, round(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=configs.SERVER_WORKERS,
+        help="worker processes; 0 means one per available CPU",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=configs.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        help="seconds workers get to finish in-flight requests on shutdown",
+    )
+    return parser.parse_args(argv)
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that shuts down if its supervisor goes away."""
+
+    def __init__(self, config: uvicorn.Config, parent_pid: int) -> None:
+        super().__init__(config)
+        self._parent_pid = parent_pid
+
+    async def on_tick(self, counter: int) -> bool:
+        if counter % 10 == 0 and os.getppid() != self._parent_pid:
+            logger.warning("Supervisor exited, stopping worker")
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+class _Supervisor:
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        sock: socket.socket,
+        workers: int,
+        graceful_timeout: int,
+    ) -> None:
+        self._config = config
+        self._socket = sock
+        self._worker_count = workers
+        self._graceful_timeout = graceful_timeout
+        # pid -> (worker index, monotonic start time)
+        self._workers: dict[int, tuple[int, float]] = {}
+        self._stopping = False
+        self._exit_code = 0
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGALRM, self._kill)
+        for index in range(self._worker_count):
+            self._spawn(index)
+
+        while self._workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index, started_at = self._workers.pop(pid, (None, 0.0))
+            if index is None or self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == _STARTUP_FAILURE:
+                logger.error(f"Worker {index} failed to start, shutting down")
+                self._exit_code = 1
+                self._shutdown()
+                continue
+            logger.warning(f"Worker {index} (pid {pid}) exited with {code}, restarting")
+            if time.monotonic() - started_at < _MIN_WORKER_UPTIME_SECONDS:
+                time.sleep(_MIN_WORKER_UPTIME_SECONDS)
+            if not self._stopping:
+                self._spawn(index)
+
+        signal.alarm(0)
+        logger.info("All workers stopped")
+        return self._exit_code
+
+    def _spawn(self, index: int) -> None:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        parent_pid = os.getpid()
+        # Hold stop signals until the worker is registered, so a shutdown
+        # arriving during the fork still reaches it.
+        signal.pthread_sigmask(signal.SIG_BLOCK, _STOP_SIGNALS)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+                    signal.signal(signum, signal.SIG_DFL)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, _STOP_SIGNALS)
+                os._exit(self._run_worker(parent_pid))
+            self._workers[pid] = (index, time.monotonic())
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, _STOP_SIGNALS)
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def _run_worker(self, parent_pid: int) -> int:
+        # Objects frozen by the parent stay shared; collect only new ones.
+        gc.enable()
+        code = 0
+        try:
+            _WorkerServer(self._config, parent_pid).run(sockets=[self._socket])
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            logger.exception("Worker crashed")
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        return code
+
+    def _stop(self, signum, frame) -> None:
+        if not self._stopping:
+            logger.info(f"Received {signal.Signals(signum).name}")
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"Stopping {len(self._workers)} worker(s)")
+        for pid in self._workers:
+            _signal_worker(pid, signal.SIGTERM)
+        signal.alarm(max(1, self._graceful_timeout + _KILL_GRACE_SECONDS))
+
+    def _kill(self, signum, frame) -> None:
+        logger.warning(f"Killing {len(self._workers)} worker(s) still running")
+        for pid in self._workers:
+            _signal_worker(pid, signal.SIGKILL)
+
+
+def _signal_worker(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    workers = args.workers if args.workers > 0 else available_cpus()
+
+    # Keep the collector from touching (and so copying) preloaded objects
+    # until they are frozen below.
+    gc.disable()
+    from app.main import app
+
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        proxy_headers=True,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = config.bind_socket()
+    gc.freeze()
+    logger.info(f"Serving with {workers} worker(s), parent pid {os.getpid()}")
+    try:
+        return _Supervisor(config, sock, workers, args.graceful_timeout).run()
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Delete uploaded face images that no database row references.
+
+Usage:
+    uv run storage-gc --dry-run
+    uv run storage-gc --grace-hours 48
+
+Only objects under ``gcs.upload_prefix`` older than the grace period
+(``gcs.gc_grace_hours``) are considered.
+"""
+
+import argparse
+import logging
+import sys
+from datetime import timedelta
+
+from app.core.config import configs
+from app.core.database import Database
+from app.repository import UserFaceRepository
+from app.service.storage import FirebaseObjectStorage, StorageGcService
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prefix", default=configs.GCS_UPLOAD_PREFIX)
+    parser.add_argument(
+        "--grace-hours", type=float, default=configs.STORAGE_GC_GRACE_HOURS
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report what would be deleted without deleting",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = _parse_args(argv)
+
+    db = Database(db_url=configs.DATABASE_URL)
+    service = StorageGcService(
+        user_face_repository=UserFaceRepository(db.session),
+        object_storage=FirebaseObjectStorage(configs.GCS_BUCKET_NAME),
+        grace_period=timedelta(hours=args.grace_hours),
+    )
+    result, err = service.collect(prefix=args.prefix, dry_run=args.dry_run)
+    print(
+        f"scanned={result.scanned} referenced={result.referenced} "
+        f"too_recent={result.too_recent} deleted={result.deleted} "
+        f"bytes={result.bytes_deleted} failed={result.failed}"
+    )
+    if err:
+        print(err.message, file=sys.stderr)
+        return 1
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
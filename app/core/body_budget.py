@@ -0,0 +1,259 @@
+"""Process-wide budget for request bodies held in memory.
+
+Every request that declares a ``Content-Length`` reserves that many bytes
+before the application sees it and gives them back once the response has
+been sent (uploaded files live until then). When the budget is used up the
+request queues, first come first served, for a bounded time and is then
+turned away with a 503 instead of growing the process until it is killed.
+Bodies sent without a length reserve budget chunk by chunk as they arrive.
+They are never queued, since the request is already being handled: once
+a chunk does not fit, reading stops and the request gets a 413 (the body
+outgrew the whole budget) or a 503.
+"""
+
+import asyncio
+import logging
+from collections import deque
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import ErrRequestTooLarge, ErrServiceOverloaded
+from app.core.metrics import registry
+from app.core.responses import error_response
+
+logger = logging.getLogger(__name__)
+
+_in_use = registry.gauge(
+    "body_budget_bytes_in_use", "Request body bytes reserved in this process"
+)
+_waiting = registry.gauge(
+    "body_budget_waiting_requests", "Requests queued for body budget"
+)
+_rejected = registry.counter(
+    "body_budget_rejected_total", "Requests turned away by the body budget", ["reason"]
+)
+_wait_seconds = registry.histogram(
+    "body_budget_wait_seconds", "Time requests queued for body budget"
+)
+_body_bytes = registry.histogram(
+    "request_body_bytes",
+    "Request body size",
+    buckets=(1024, 16384, 131072, 1048576, 4194304, 16777216, 67108864),
+)
+
+
+class ByteBudget:
+    """FIFO byte semaphore for the event loop thread."""
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = max(1, capacity)
+        self._used = 0
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def try_acquire(self, size: int) -> bool:
+        if self._waiters or self._used + size > self._capacity:
+            return False
+        self._take(size)
+        return True
+
+    def force_acquire(self, size: int) -> None:
+        """Account ``size`` bytes that are already in memory, even over budget."""
+        self._take(size)
+
+    async def acquire(self, size: int, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for ``size`` bytes; False on timeout."""
+        if self.try_acquire(size):
+            return True
+        if timeout <= 0:
+            return False
+
+        waiter = (size, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        _waiting.set(len(self._waiters))
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter[1]
+        except TimeoutError:
+            pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        # Granted, possibly in the same tick the timeout fired.
+        if waiter[1].done() and not waiter[1].cancelled():
+            return True
+        self._abandon(waiter)
+        return False
+
+    def release(self, size: int) -> None:
+        self._used -= size
+        _in_use.set(self._used)
+        self._wake()
+
+    def _take(self, size: int) -> None:
+        self._used += size
+        _in_use.set(self._used)
+
+    def _abandon(self, waiter: tuple[int, asyncio.Future]) -> None:
+        size, future = waiter
+        if future.done() and not future.cancelled():
+            self.release(size)
+            return
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        _waiting.set(len(self._waiters))
+        # A large request leaving the head of the queue may unblock others.
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            size, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._used + size > self._capacity:
+                break
+            self._waiters.popleft()
+            self._take(size)
+            future.set_result(None)
+        _waiting.set(len(self._waiters))
+
+
+class BodyBudgetMiddleware:
+    """Admits HTTP requests only while their bodies fit in the budget."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budget_bytes: int = configs.BODY_BUDGET_BYTES,
+        wait_seconds: float = configs.BODY_BUDGET_WAIT_SECONDS,
+    ) -> None:
+        self.app = app
+        self.budget = ByteBudget(budget_bytes)
+        self._wait_seconds = wait_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        declared = self._content_length(scope)
+        if declared is None:
+            await self._call_unsized(scope, receive, send)
+            return
+        if declared == 0:
+            await self.app(scope, receive, send)
+            return
+        if declared > self.budget.capacity:
+            _rejected.inc(reason="too_large")
+            await error_response(ErrRequestTooLarge)(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        admitted = await self.budget.acquire(declared, self._wait_seconds)
+        _wait_seconds.observe(loop.time() - started_at)
+        if not admitted:
+            _rejected.inc(reason="timeout")
+            logger.warning(
+                f"Rejected {scope['path']}: {declared} byte body does not fit "
+                f"the body budget ({self.budget.used}/{self.budget.capacity} in use)"
+            )
+            response = error_response(ErrServiceOverloaded)
+            response.headers["Retry-After"] = "1"
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        try:
+            await self.app(scope, counting_receive, send)
+        finally:
+            self.budget.release(declared)
+            _body_bytes.observe(received)
+
+    async def _call_unsized(self, scope: Scope, receive: Receive, send: Send) -> None:
+        received = 0
+        refused: Error | None = None
+        started = False
+
+        async def reserving_receive() -> Message:
+            nonlocal received, refused
+            if refused is not None:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            size = len(message.get("body", b""))
+            # Chunks of a request already being handled skip the queue.
+            if self.budget.used + size > self.budget.capacity:
+                too_large = received + size > self.budget.capacity
+                refused = ErrRequestTooLarge if too_large else ErrServiceOverloaded
+                _rejected.inc(reason="too_large" if too_large else "unsized")
+                logger.warning(
+                    f"Stopped reading {scope['path']}: chunked body of "
+                    f"{received + size}+ bytes does not fit the body budget "
+                    f"({self.budget.used}/{self.budget.capacity} in use)"
+                )
+                # The app sees the client go away; its response is replaced.
+                return {"type": "http.disconnect"}
+            self.budget.force_acquire(size)
+            received += size
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if refused is not None and not started:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, reserving_receive, guarded_send)
+        except Exception:
+            if refused is None or started:
+                raise
+        finally:
+            if received:
+                self.budget.release(received)
+                _body_bytes.observe(received)
+
+        if refused is not None and not started:
+            response = error_response(refused)
+            if refused is ErrServiceOverloaded:
+                response.headers["Retry-After"] = "1"
+            await response(scope, receive, send)
+
+    @staticmethod
+    def _content_length(scope: Scope) -> int | None:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return max(0, int(value))
+                except ValueError:
+                    return None
+        if scope["method"] in ("GET", "HEAD", "DELETE", "OPTIONS"):
+            return 0
+        return None
@@ -0,0 +1,217 @@
+"""Per-dependency circuit breakers.
+
+A breaker watches the calls made to one dependency over a rolling window.
+When the failure rate or the slow-call rate crosses its threshold it opens
+and callers fail fast (``CircuitOpenError``) instead of waiting for SDK
+timeouts. After ``open_seconds`` a few trial calls are let through
+(half-open); their outcome closes the breaker again or re-opens it.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, TypeVar
+
+from app.core.config import configs
+from app.core.constants import CircuitState
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+_calls = registry.counter(
+    "circuit_breaker_calls_total", "Calls observed by the breaker", ["name", "outcome"]
+)
+_rejected = registry.counter(
+    "circuit_breaker_rejected_total", "Calls failed fast by an open breaker", ["name"]
+)
+_transitions = registry.counter(
+    "circuit_breaker_transitions_total", "Breaker state changes", ["name", "state"]
+)
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str) -> None:
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        failure_rate: float = configs.CIRCUIT_FAILURE_RATE,
+        slow_call_rate: float = configs.CIRCUIT_SLOW_CALL_RATE,
+        min_calls: int = configs.CIRCUIT_MIN_CALLS,
+        window_seconds: float = configs.CIRCUIT_WINDOW_SECONDS,
+        open_seconds: float = configs.CIRCUIT_OPEN_SECONDS,
+        half_open_calls: int = configs.CIRCUIT_HALF_OPEN_CALLS,
+    ) -> None:
+        self.name = name
+        self._slow_call_seconds = slow_call_seconds
+        self._failure_rate = failure_rate
+        self._slow_call_rate = slow_call_rate
+        self._min_calls = max(1, min_calls)
+        self._window_seconds = window_seconds
+        self._open_seconds = open_seconds
+        self._half_open_calls = max(1, half_open_calls)
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        # (monotonic time, failed, slow) per call inside the window
+        self._window: deque[tuple[float, bool, bool]] = deque()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """Reserve a call; ``False`` means fail fast.
+
+        Every ``True`` must be followed by :meth:`record` or :meth:`cancel`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_half_open(now)
+            if self._state == CircuitState.CLOSED:
+                return True
+            if (
+                self._state == CircuitState.HALF_OPEN
+                and self._half_open_in_flight < self._half_open_calls
+            ):
+                self._half_open_in_flight += 1
+                return True
+        _rejected.inc(name=self.name)
+        return False
+
+    def check(self) -> None:
+        """Like :meth:`allow`, but raises ``CircuitOpenError`` when rejected."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+    def cancel(self) -> None:
+        """Give back a reservation for a call that never reached the dependency."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def record(self, latency: float, failed: bool) -> None:
+        slow = latency >= self._slow_call_seconds
+        _calls.inc(
+            name=self.name, outcome="failure" if failed else "slow" if slow else "ok"
+        )
+        now = time.monotonic()
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if failed or slow:
+                    self._transition(CircuitState.OPEN, now)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self._half_open_calls:
+                    self._transition(CircuitState.CLOSED, now)
+                return
+            if self._state == CircuitState.OPEN:
+                # A call that started before the breaker opened.
+                return
+
+            self._window.append((now, failed, slow))
+            cutoff = now - self._window_seconds
+            while self._window and self._window[0][0] < cutoff:
+                self._window.popleft()
+            calls = len(self._window)
+            if calls < self._min_calls:
+                return
+            failures = sum(1 for _, f, _ in self._window if f)
+            slow_calls = sum(1 for _, _, s in self._window if s)
+            if (
+                failures / calls >= self._failure_rate
+                or slow_calls / calls >= self._slow_call_rate
+            ):
+                logger.warning(
+                    f"Opening {self.name} circuit: {failures}/{calls} failed, "
+                    f"{slow_calls}/{calls} slow in the last {self._window_seconds:.0f}s"
+                )
+                self._transition(CircuitState.OPEN, now)
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run ``fn`` through the breaker; exceptions count as failures."""
+        self.check()
+        started_at = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self.record(time.perf_counter() - started_at, failed)
+
+    def _maybe_half_open(self, now: float) -> None:
+        if (
+            self._state == CircuitState.OPEN
+            and now - self._opened_at >= self._open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN, now)
+
+    def _transition(self, state: CircuitState, now: float) -> None:
+        if state == self._state:
+            return
+        logger.info(f"{self.name} circuit {self._state} -> {state}")
+        self._state = state
+        self._window.clear()
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = now
+        _transitions.inc(name=self.name, state=state.value)
+
+
+class CircuitBreakers:
+    """The breakers guarding each external dependency."""
+
+    def __init__(self) -> None:
+        self.postgres = CircuitBreaker(
+            "postgres", slow_call_seconds=configs.CIRCUIT_POSTGRES_SLOW_SECONDS
+        )
+        self.storage = CircuitBreaker(
+            "storage", slow_call_seconds=configs.CIRCUIT_STORAGE_SLOW_SECONDS
+        )
+        self.rtdb = CircuitBreaker(
+            "rtdb", slow_call_seconds=configs.CIRCUIT_RTDB_SLOW_SECONDS
+        )
+        self.pubsub = CircuitBreaker(
+            "pubsub", slow_call_seconds=configs.CIRCUIT_PUBSUB_SLOW_SECONDS
+        )
+
+    def all(self) -> list[CircuitBreaker]:
+        return [self.postgres, self.storage, self.rtdb, self.pubsub]
+
+    def states(self) -> dict[str, str]:
+        return {breaker.name: breaker.state.value for breaker in self.all()}
+
+
+breakers = CircuitBreakers()
+
+registry.register_collector(
+    "circuit_breaker_state",
+    "Breaker state (0 closed, 1 half-open, 2 open)",
+    "gauge",
+    lambda: [
+        ("circuit_breaker_state", {"name": breaker.name}, _STATE_VALUES[breaker.state])
+        for breaker in breakers.all()
+    ],
+)
@@ -51,6 +51,38 @@ class Configs:
     POSTGRES_PORT: int = int(
         os.environ.get("POSTGRES_PORT") or _raw.get("database", {}).get("port", 5432)
     )
+    DB_CONNECT_TIMEOUT_SECONDS: int = int(
+        os.environ.get("DB_CONNECT_TIMEOUT_SECONDS")
+        or _raw.get("database", {}).get("connect_timeout_seconds", 5)
+    )
+    # Read replicas (full SQLAlchemy URLs; env var is comma-separated).
+    # Read-only lookups go to a replica whose replay lag is within
+    # DB_REPLICA_MAX_LAG_SECONDS, otherwise to the primary.
+    DATABASE_REPLICA_URLS: List[str] = field(
+        default_factory=lambda: (
+            [
+                url.strip()
+                for url in (os.environ.get("DATABASE_REPLICA_URLS") or "").split(",")
+                if url.strip()
+            ]
+            or list(_raw.get("database", {}).get("replica_urls", []))
+        )
+    )
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(
+        os.environ.get("DB_REPLICA_MAX_LAG_SECONDS")
+        or _raw.get("database", {}).get("replica_max_lag_seconds", 5)
+    )
+    DB_REPLICA_LAG_CHECK_SECONDS: float = float(
+        os.environ.get("DB_REPLICA_LAG_CHECK_SECONDS")
+        or _raw.get("database", {}).get("replica_lag_check_seconds", 5)
+    )
+    # Reads of a key (email, user id) written this recently through the same
+    # process stay on the primary. User lookups that miss on a replica are
+    # always re-checked on the primary.
+    DB_READ_YOUR_WRITES_SECONDS: float = float(
+        os.environ.get("DB_READ_YOUR_WRITES_SECONDS")
+        or _raw.get("database", {}).get("read_your_writes_seconds", 15)
+    )
 
     # JWT config
     JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY") or _raw.get("jwt", {}).get(
@@ -61,6 +93,32 @@ class Configs:
         os.environ.get("JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
         or _raw.get("jwt", {}).get("access_token_expire_minutes", 60)
     )
+    # Opaque refresh tokens (stored hashed in tb_refresh_tokens); each use
+    # rotates the token and extends the chain by this lifetime.
+    JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = int(
+        os.environ.get("JWT_REFRESH_TOKEN_EXPIRE_DAYS")
+        or _raw.get("jwt", {}).get("refresh_token_expire_days", 30)
+    )
+    # Asymmetric signing: <kid>.pem private keys (P-256 for ES256, Ed25519
+    # for EdDSA). The active kid signs (default: last in sort order); every
+    # key verifies and is published at /.well-known/jwks.json. Empty keeps
+    # HS256 with JWT_SECRET_KEY.
+    JWT_SIGNING_KEYS_DIR: str = os.environ.get("JWT_SIGNING_KEYS_DIR") or _raw.get(
+        "jwt", {}
+    ).get("signing_keys_dir", "")
+    JWT_ACTIVE_KID: str = os.environ.get("JWT_ACTIVE_KID") or _raw.get("jwt", {}).get(
+        "active_kid", ""
+    )
+    # Keep accepting HS256 tokens (issued before the switch) until they expire.
+    JWT_ACCEPT_HS256: bool = str(
+        os.environ.get("JWT_ACCEPT_HS256")
+        or _raw.get("jwt", {}).get("accept_hs256", True)
+    ).lower() in ("1", "true", "yes")
+    # Must stay well below the time between publishing a key and signing with it.
+    JWKS_MAX_AGE_SECONDS: int = int(
+        os.environ.get("JWKS_MAX_AGE_SECONDS")
+        or _raw.get("jwt", {}).get("jwks_max_age_seconds", 300)
+    )
 
     # GCS / Firebase Storage config
     GCS_BUCKET_NAME: str = os.environ.get("GCS_BUCKET_NAME") or _raw.get("gcs", {}).get(
@@ -72,9 +130,9 @@ class Configs:
     FIREBASE_CREDENTIALS_PATH: str = os.environ.get(
         "FIREBASE_CREDENTIALS_PATH"
     ) or _raw.get("firebase", {}).get("credentials_path", "firebase_credentials.json")
-    FIREBASE_UPLOAD_MAX_CONCURRENCY: int = int(
-        os.environ.get("FIREBASE_UPLOAD_MAX_CONCURRENCY")
-        or _raw.get("firebase", {}).get("upload_max_concurrency", 6)
+    FIREBASE_HTTP_TIMEOUT_SECONDS: float = float(
+        os.environ.get("FIREBASE_HTTP_TIMEOUT_SECONDS")
+        or _raw.get("firebase", {}).get("http_timeout_seconds", 10)
     )
     FIREBASE_RTDB_URL: str = os.environ.get("FIREBASE_RTDB_URL") or _raw.get(
         "firebase", {}
@@ -90,6 +148,341 @@ class Configs:
     PUBSUB_SIGNIN_TOPIC: str = os.environ.get("PUBSUB_SIGNIN_TOPIC") or _raw.get(
         "pubsub", {}
     ).get("signin_topic", "banking-ekyc-sign-in")
+    # Event payload encoding: "msgpack" or "json". Ordering keys keep each
+    # user's events in order.
+    PUBSUB_EVENT_ENCODING: str = os.environ.get("PUBSUB_EVENT_ENCODING") or _raw.get(
+        "pubsub", {}
+    ).get("event_encoding", "msgpack")
+    PUBSUB_ORDERING_ENABLED: bool = str(
+        os.environ.get("PUBSUB_ORDERING_ENABLED")
+        or _raw.get("pubsub", {}).get("ordering_enabled", True)
+    ).lower() in ("1", "true", "yes")
+
+    # Maximum number of emails / user IDs accepted by /user/get-batch
+    USER_BATCH_LOOKUP_MAX_ITEMS: int = int(
+        os.environ.get("USER_BATCH_LOOKUP_MAX_ITEMS")
+        or _raw.get("user", {}).get("batch_lookup_max_items", 100)
+    )
+
+    # Orphaned upload sweeper
+    STORAGE_GC_GRACE_HOURS: float = float(
+        os.environ.get("STORAGE_GC_GRACE_HOURS")
+        or _raw.get("gcs", {}).get("gc_grace_hours", 24)
+    )
+
+    # tb_user_faces login partitions and retention
+    FACE_PARTITION_MONTHS_AHEAD: int = int(
+        os.environ.get("FACE_PARTITION_MONTHS_AHEAD")
+        or _raw.get("retention", {}).get("partition_months_ahead", 3)
+    )
+    FACE_RETENTION_DAYS: int = int(
+        os.environ.get("FACE_RETENTION_DAYS")
+        or _raw.get("retention", {}).get("login_face_days", 180)
+    )
+    FACE_RETENTION_BATCH_SIZE: int = int(
+        os.environ.get("FACE_RETENTION_BATCH_SIZE")
+        or _raw.get("retention", {}).get("batch_size", 500)
+    )
+    FACE_RETENTION_DELETE_WORKERS: int = int(
+        os.environ.get("FACE_RETENTION_DELETE_WORKERS")
+        or _raw.get("retention", {}).get("delete_workers", 8)
+    )
+    FACE_RETENTION_DELETE_RATE: float = float(
+        os.environ.get("FACE_RETENTION_DELETE_RATE")
+        or _raw.get("retention", {}).get("delete_rate_per_second", 200)
+    )
+
+    # Process-wide adaptive limit on concurrent storage uploads
+    UPLOAD_CONCURRENCY_INITIAL: int = int(
+        os.environ.get("UPLOAD_CONCURRENCY_INITIAL")
+        or _raw.get("upload_scheduler", {}).get("initial_limit", 12)
+    )
+    UPLOAD_CONCURRENCY_MIN: int = int(
+        os.environ.get("UPLOAD_CONCURRENCY_MIN")
+        or _raw.get("upload_scheduler", {}).get("min_limit", 2)
+    )
+    UPLOAD_CONCURRENCY_MAX: int = int(
+        os.environ.get("UPLOAD_CONCURRENCY_MAX")
+        or _raw.get("upload_scheduler", {}).get("max_limit", 32)
+    )
+    # Uploads slower than baseline * tolerance shrink the limit.
+    UPLOAD_LATENCY_TOLERANCE: float = float(
+        os.environ.get("UPLOAD_LATENCY_TOLERANCE")
+        or _raw.get("upload_scheduler", {}).get("latency_tolerance", 2.0)
+    )
+
+    # Per-object upload retries (full-jitter exponential backoff) and hedging
+    UPLOAD_MAX_ATTEMPTS: int = int(
+        os.environ.get("UPLOAD_MAX_ATTEMPTS")
+        or _raw.get("upload_retry", {}).get("max_attempts", 3)
+    )
+    UPLOAD_RETRY_BASE_SECONDS: float = float(
+        os.environ.get("UPLOAD_RETRY_BASE_SECONDS")
+        or _raw.get("upload_retry", {}).get("base_seconds", 0.2)
+    )
+    UPLOAD_RETRY_MAX_SECONDS: float = float(
+        os.environ.get("UPLOAD_RETRY_MAX_SECONDS")
+        or _raw.get("upload_retry", {}).get("max_seconds", 2.0)
+    )
+    # A hedge starts once an upload has run longer than this percentile of
+    # recent upload latencies (but never sooner than the minimum delay).
+    UPLOAD_HEDGE_PERCENTILE: float = float(
+        os.environ.get("UPLOAD_HEDGE_PERCENTILE")
+        or _raw.get("upload_hedge", {}).get("percentile", 95)
+    )
+    UPLOAD_HEDGE_MIN_DELAY_SECONDS: float = float(
+        os.environ.get("UPLOAD_HEDGE_MIN_DELAY_SECONDS")
+        or _raw.get("upload_hedge", {}).get("min_delay_seconds", 0.5)
+    )
+    # Hedges may add at most this percentage of extra uploads; 0 disables hedging.
+    UPLOAD_HEDGE_BUDGET_PERCENT: float = float(
+        os.environ.get("UPLOAD_HEDGE_BUDGET_PERCENT")
+        or _raw.get("upload_hedge", {}).get("budget_percent", 10)
+    )
+
+    # Face-photo quality precheck before upload (needs numpy and pillow;
+    # skipped when they are not installed). Metrics are computed on a
+    # decode downsampled to FACE_QUALITY_ANALYSIS_MAX_SIDE pixels.
+    FACE_QUALITY_ENABLED: bool = str(
+        os.environ.get("FACE_QUALITY_ENABLED")
+        or _raw.get("face_quality", {}).get("enabled", True)
+    ).lower() in ("1", "true", "yes")
+    FACE_QUALITY_WORKERS: int = int(
+        os.environ.get("FACE_QUALITY_WORKERS")
+        or _raw.get("face_quality", {}).get("workers", min(4, os.cpu_count() or 1))
+    )
+    FACE_QUALITY_QUEUE: int = int(
+        os.environ.get("FACE_QUALITY_QUEUE")
+        or _raw.get("face_quality", {}).get("queue", 32)
+    )
+    FACE_QUALITY_MIN_SHORT_SIDE: int = int(
+        os.environ.get("FACE_QUALITY_MIN_SHORT_SIDE")
+        or _raw.get("face_quality", {}).get("min_short_side", 480)
+    )
+    FACE_QUALITY_ANALYSIS_MAX_SIDE: int = int(
+        os.environ.get("FACE_QUALITY_ANALYSIS_MAX_SIDE")
+        or _raw.get("face_quality", {}).get("analysis_max_side", 640)
+    )
+    FACE_QUALITY_MIN_SHARPNESS: float = float(
+        os.environ.get("FACE_QUALITY_MIN_SHARPNESS")
+        or _raw.get("face_quality", {}).get("min_sharpness", 50)
+    )
+    FACE_QUALITY_MIN_BRIGHTNESS: float = float(
+        os.environ.get("FACE_QUALITY_MIN_BRIGHTNESS")
+        or _raw.get("face_quality", {}).get("min_brightness", 50)
+    )
+    FACE_QUALITY_MAX_BRIGHTNESS: float = float(
+        os.environ.get("FACE_QUALITY_MAX_BRIGHTNESS")
+        or _raw.get("face_quality", {}).get("max_brightness", 210)
+    )
+    FACE_QUALITY_MIN_CONTRAST: float = float(
+        os.environ.get("FACE_QUALITY_MIN_CONTRAST")
+        or _raw.get("face_quality", {}).get("min_contrast", 20)
+    )
+    # Share of pixels allowed in the darkest / brightest 16 grey levels.
+    FACE_QUALITY_MAX_CLIPPED_FRACTION: float = float(
+        os.environ.get("FACE_QUALITY_MAX_CLIPPED_FRACTION")
+        or _raw.get("face_quality", {}).get("max_clipped_fraction", 0.3)
+    )
+
+    # Per-process budget for request bodies held in memory (see
+    # app/core/body_budget.py). Requests wait up to the wait time for room,
+    # then get a 503. Uploaded files stay in memory up to the spool size and
+    # roll over to a temporary file beyond it.
+    BODY_BUDGET_BYTES: int = int(
+        os.environ.get("BODY_BUDGET_BYTES")
+        or _raw.get("body_budget", {}).get("bytes", 256 * 1024 * 1024)
+    )
+    BODY_BUDGET_WAIT_SECONDS: float = float(
+        os.environ.get("BODY_BUDGET_WAIT_SECONDS")
+        or _raw.get("body_budget", {}).get("wait_seconds", 2)
+    )
+    UPLOAD_SPOOL_MAX_BYTES: int = int(
+        os.environ.get("UPLOAD_SPOOL_MAX_BYTES")
+        or _raw.get("body_budget", {}).get("spool_max_bytes", 8 * 1024 * 1024)
+    )
+
+    # Server-Sent Events for eKYC session results (see
+    # app/service/ekyc/session_event_hub.py). "rtdb" follows /sessions/{id}
+    # in the Realtime Database; "memory" is an in-process stand-in for local
+    # development. Limits are per worker process.
+    SESSION_EVENTS_SOURCE: str = os.environ.get("SESSION_EVENTS_SOURCE") or _raw.get(
+        "session_events", {}
+    ).get("source", "rtdb")
+    SESSION_EVENTS_HEARTBEAT_SECONDS: float = float(
+        os.environ.get("SESSION_EVENTS_HEARTBEAT_SECONDS")
+        or _raw.get("session_events", {}).get("heartbeat_seconds", 15)
+    )
+    SESSION_EVENTS_TIMEOUT_SECONDS: float = float(
+        os.environ.get("SESSION_EVENTS_TIMEOUT_SECONDS")
+        or _raw.get("session_events", {}).get("timeout_seconds", 300)
+    )
+    SESSION_EVENTS_MAX_SESSIONS: int = int(
+        os.environ.get("SESSION_EVENTS_MAX_SESSIONS")
+        or _raw.get("session_events", {}).get("max_sessions", 500)
+    )
+    SESSION_EVENTS_MAX_SUBSCRIBERS: int = int(
+        os.environ.get("SESSION_EVENTS_MAX_SUBSCRIBERS")
+        or _raw.get("session_events", {}).get("max_subscribers_per_session", 8)
+    )
+
+    # Login throttling (see app/service/user/login_rate_limiter.py): attempts
+    # per email and per client IP within a sliding window. "memory" keeps
+    # the counters per worker process; "postgres" shares them across
+    # replicas in tb_rate_limits. 0 disables a limit.
+    LOGIN_RATE_LIMIT_BACKEND: str = os.environ.get(
+        "LOGIN_RATE_LIMIT_BACKEND"
+    ) or _raw.get("login_rate_limit", {}).get("backend", "memory")
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = int(
+        os.environ.get("LOGIN_RATE_LIMIT_PER_EMAIL")
+        or _raw.get("login_rate_limit", {}).get("per_email", 10)
+    )
+    LOGIN_RATE_LIMIT_PER_IP: int = int(
+        os.environ.get("LOGIN_RATE_LIMIT_PER_IP")
+        or _raw.get("login_rate_limit", {}).get("per_ip", 100)
+    )
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = float(
+        os.environ.get("LOGIN_RATE_LIMIT_WINDOW_SECONDS")
+        or _raw.get("login_rate_limit", {}).get("window_seconds", 60)
+    )
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = int(
+        os.environ.get("LOGIN_RATE_LIMIT_MAX_KEYS")
+        or _raw.get("login_rate_limit", {}).get("max_keys", 100_000)
+    )
+
+    # Circuit breakers (see app/core/circuit_breaker.py)
+    CIRCUIT_FAILURE_RATE: float = float(
+        os.environ.get("CIRCUIT_FAILURE_RATE")
+        or _raw.get("circuit_breaker", {}).get("failure_rate", 0.5)
+    )
+    CIRCUIT_SLOW_CALL_RATE: float = float(
+        os.environ.get("CIRCUIT_SLOW_CALL_RATE")
+        or _raw.get("circuit_breaker", {}).get("slow_call_rate", 0.8)
+    )
+    CIRCUIT_MIN_CALLS: int = int(
+        os.environ.get("CIRCUIT_MIN_CALLS")
+        or _raw.get("circuit_breaker", {}).get("min_calls", 20)
+    )
+    CIRCUIT_WINDOW_SECONDS: float = float(
+        os.environ.get("CIRCUIT_WINDOW_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("window_seconds", 30)
+    )
+    CIRCUIT_OPEN_SECONDS: float = float(
+        os.environ.get("CIRCUIT_OPEN_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("open_seconds", 15)
+    )
+    CIRCUIT_HALF_OPEN_CALLS: int = int(
+        os.environ.get("CIRCUIT_HALF_OPEN_CALLS")
+        or _raw.get("circuit_breaker", {}).get("half_open_calls", 3)
+    )
+    CIRCUIT_POSTGRES_SLOW_SECONDS: float = float(
+        os.environ.get("CIRCUIT_POSTGRES_SLOW_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("postgres_slow_seconds", 5)
+    )
+    CIRCUIT_STORAGE_SLOW_SECONDS: float = float(
+        os.environ.get("CIRCUIT_STORAGE_SLOW_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("storage_slow_seconds", 10)
+    )
+    CIRCUIT_RTDB_SLOW_SECONDS: float = float(
+        os.environ.get("CIRCUIT_RTDB_SLOW_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("rtdb_slow_seconds", 5)
+    )
+    CIRCUIT_PUBSUB_SLOW_SECONDS: float = float(
+        os.environ.get("CIRCUIT_PUBSUB_SLOW_SECONDS")
+        or _raw.get("circuit_breaker", {}).get("pubsub_slow_seconds", 10)
+    )
+
+    # Bulkheaded thread pools (see app/core/executors.py)
+    EXECUTOR_DB_WORKERS: int = int(
+        os.environ.get("EXECUTOR_DB_WORKERS")
+        or _raw.get("executors", {}).get("db", {}).get("workers", 20)
+    )
+    EXECUTOR_DB_QUEUE: int = int(
+        os.environ.get("EXECUTOR_DB_QUEUE")
+        or _raw.get("executors", {}).get("db", {}).get("queue", 200)
+    )
+    EXECUTOR_STORAGE_WORKERS: int = int(
+        os.environ.get("EXECUTOR_STORAGE_WORKERS")
+        or _raw.get("executors", {}).get("storage", {}).get("workers", 32)
+    )
+    EXECUTOR_STORAGE_QUEUE: int = int(
+        os.environ.get("EXECUTOR_STORAGE_QUEUE")
+        or _raw.get("executors", {}).get("storage", {}).get("queue", 256)
+    )
+    EXECUTOR_RTDB_WORKERS: int = int(
+        os.environ.get("EXECUTOR_RTDB_WORKERS")
+        or _raw.get("executors", {}).get("rtdb", {}).get("workers", 8)
+    )
+    EXECUTOR_RTDB_QUEUE: int = int(
+        os.environ.get("EXECUTOR_RTDB_QUEUE")
+        or _raw.get("executors", {}).get("rtdb", {}).get("queue", 64)
+    )
+    EXECUTOR_CPU_WORKERS: int = int(
+        os.environ.get("EXECUTOR_CPU_WORKERS")
+        or _raw.get("executors", {}).get("cpu", {}).get("workers", os.cpu_count() or 4)
+    )
+    EXECUTOR_CPU_QUEUE: int = int(
+        os.environ.get("EXECUTOR_CPU_QUEUE")
+        or _raw.get("executors", {}).get("cpu", {}).get("queue", 64)
+    )
+
+    # Production server (app.cli.serve); 0 workers = one per available CPU.
+    # Executor pools above are per worker process.
+    SERVER_WORKERS: int = int(
+        os.environ.get("SERVER_WORKERS") or _raw.get("server", {}).get("workers", 0)
+    )
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = int(
+        os.environ.get("SERVER_GRACEFUL_TIMEOUT_SECONDS")
+        or _raw.get("server", {}).get("graceful_timeout_seconds", 30)
+    )
+
+    # Startup warm-up and /health/ready. Probes run at most every
+    # READINESS_CACHE_SECONDS; only READINESS_REQUIRED (database, firebase,
+    # storage, pubsub; env var is comma-separated) gate readiness.
+    READINESS_WARMUP_BUDGET_SECONDS: float = float(
+        os.environ.get("READINESS_WARMUP_BUDGET_SECONDS")
+        or _raw.get("readiness", {}).get("warmup_budget_seconds", 10)
+    )
+    READINESS_PROBE_TIMEOUT_SECONDS: float = float(
+        os.environ.get("READINESS_PROBE_TIMEOUT_SECONDS")
+        or _raw.get("readiness", {}).get("probe_timeout_seconds", 2)
+    )
+    READINESS_CACHE_SECONDS: float = float(
+        os.environ.get("READINESS_CACHE_SECONDS")
+        or _raw.get("readiness", {}).get("cache_seconds", 5)
+    )
+    READINESS_REQUIRED: List[str] = field(
+        default_factory=lambda: (
+            [
+                name.strip()
+                for name in (os.environ.get("READINESS_REQUIRED") or "").split(",")
+                if name.strip()
+            ]
+            or list(
+                _raw.get("readiness", {}).get(
+                    "required", ["database", "firebase", "storage"]
+                )
+            )
+        )
+    )
+
+    # Idempotency-Key handling
+    IDEMPOTENCY_TTL_SECONDS: int = int(
+        os.environ.get("IDEMPOTENCY_TTL_SECONDS")
+        or _raw.get("idempotency", {}).get("ttl_seconds", 86400)
+    )
+    IDEMPOTENCY_LOCK_SECONDS: int = int(
+        os.environ.get("IDEMPOTENCY_LOCK_SECONDS")
+        or _raw.get("idempotency", {}).get("lock_seconds", 120)
+    )
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = float(
+        os.environ.get("IDEMPOTENCY_WAIT_TIMEOUT_SECONDS")
+        or _raw.get("idempotency", {}).get("wait_timeout_seconds", 30)
+    )
+    IDEMPOTENCY_CACHE_SIZE: int = int(
+        os.environ.get("IDEMPOTENCY_CACHE_SIZE")
+        or _raw.get("idempotency", {}).get("cache_size", 10000)
+    )
 
     # Other config
     TZ: str = _raw.get("timezone", "Asia/Singapore")
@@ -1,6 +1,23 @@
-from enum import StrEnum
+from enum import IntEnum, StrEnum
 
 
 class Event(StrEnum):
     SIGN_UP = "sign_up"
     SIGN_IN = "sign_in"
+
+
+class IdempotencyStatus(StrEnum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+
+class UploadPriority(IntEnum):
+    # Lower value is served first.
+    LOGIN = 0  # the user is waiting on the result
+    SIGNUP = 1
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
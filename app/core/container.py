@@ -2,10 +2,26 @@ from dependency_injector import containers, providers
 
 from app.core.config import configs
 from app.core.database import Database
-from app.repository import UserFaceRepository, UserRepository
+from app.repository import (
+    IdempotencyRepository,
+    RateLimitRepository,
+    RefreshTokenRepository,
+    UserFacePartitionRepository,
+    UserFaceRepository,
+    UserRepository,
+)
+from app.service.user.login_rate_limiter import LoginRateLimiter
+from app.service.user.refresh_token_service import RefreshTokenService
 from app.service.user.user_service import UserService
 from app.service.ekyc.ekyc_service import EkycService
+from app.service.ekyc.face_quality_checker import FaceQualityChecker
+from app.service.ekyc.session_event_hub import SessionEventHub
+from app.service.health.readiness_service import ReadinessService
+from app.service.idempotency.idempotency_service import IdempotencyService
 from app.service.pubsub.pubsub_service import PubsubService
+from app.service.storage.hedged_uploader import HedgedUploader
+from app.service.storage.object_storage import FirebaseObjectStorage
+from app.service.storage.upload_scheduler import UploadScheduler
 
 
 class Container(containers.DeclarativeContainer):
@@ -16,23 +32,85 @@ class Container(containers.DeclarativeContainer):
         ]
     )
 
-    db = providers.Singleton(Database, db_url=configs.DATABASE_URL)
+    db = providers.Singleton(
+        Database,
+        db_url=configs.DATABASE_URL,
+        replica_urls=configs.DATABASE_REPLICA_URLS,
+    )
+
+    # Repositories and services hold no per-request state (sessions are opened
+    # per call, request data is passed as arguments), so one instance per
+    # process avoids rebuilding them on every request.
+    user_repository = providers.Singleton(
+        UserRepository,
+        session_factory=db.provided.session,
+        read_session_factory=db.provided.read_session,
+    )
+
+    user_face_repository = providers.Singleton(
+        UserFaceRepository,
+        session_factory=db.provided.session,
+        read_session_factory=db.provided.read_session,
+    )
+
+    user_face_partition_repository = providers.Singleton(
+        UserFacePartitionRepository, session_factory=db.provided.session
+    )
+
+    idempotency_repository = providers.Singleton(
+        IdempotencyRepository, session_factory=db.provided.session
+    )
 
-    user_repository = providers.Factory(
-        UserRepository, session_factory=db.provided.session
+    refresh_token_repository = providers.Singleton(
+        RefreshTokenRepository, session_factory=db.provided.session
+    )
+    rate_limit_repository = providers.Singleton(
+        RateLimitRepository, session_factory=db.provided.session
     )
 
-    user_face_repository = providers.Factory(
-        UserFaceRepository, session_factory=db.provided.session
+    idempotency_service = providers.Singleton(
+        IdempotencyService, idempotency_repository=idempotency_repository
     )
 
-    user_service = providers.Factory(UserService, user_repository=user_repository)
+    user_service = providers.Singleton(
+        UserService,
+        user_repository=user_repository,
+        idempotency_service=idempotency_service,
+    )
+
+    refresh_token_service = providers.Singleton(
+        RefreshTokenService, refresh_token_repository=refresh_token_repository
+    )
+    login_rate_limiter = providers.Singleton(
+        LoginRateLimiter, rate_limit_repository=rate_limit_repository
+    )
 
     pubsub_service = providers.Singleton(PubsubService)
 
-    ekyc_service = providers.Factory(
+    readiness_service = providers.Singleton(
+        ReadinessService, db=db, pubsub_service=pubsub_service
+    )
+
+    upload_scheduler = providers.Singleton(UploadScheduler)
+
+    hedged_uploader = providers.Singleton(HedgedUploader, scheduler=upload_scheduler)
+
+    face_quality_checker = providers.Singleton(FaceQualityChecker)
+
+    object_storage = providers.Singleton(
+        FirebaseObjectStorage, bucket_name=configs.GCS_BUCKET_NAME
+    )
+
+    session_event_hub = providers.Singleton(SessionEventHub)
+
+    ekyc_service = providers.Singleton(
         EkycService,
         user_repository=user_repository,
         user_face_repository=user_face_repository,
         pubsub_service=pubsub_service,
+        idempotency_service=idempotency_service,
+        upload_scheduler=upload_scheduler,
+        uploader=hedged_uploader,
+        face_quality_checker=face_quality_checker,
+        object_storage=object_storage,
     )
@@ -1,55 +1,204 @@
+import itertools
 import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Generator
+from dataclasses import dataclass
+from typing import Generator, Sequence
 
-from sqlalchemy import create_engine, event, orm
+from sqlalchemy import create_engine, event, exc, orm, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import NullPool
 
+from app.core.circuit_breaker import CircuitBreaker, breakers
+from app.core.config import configs
+from app.core.metrics import registry
+from app.util.fork import after_fork_in_child
+
 logger = logging.getLogger(__name__)
 
+# Keys written by a session; repositories add to this set via
+# BaseRepository._mark_written and Database.session() records them.
+WRITTEN_KEYS = "written_keys"
+
+# Set in the info of sessions read_session() opened on a replica, to the
+# replica's name.
+REPLICA = "replica"
+
+# Bound on remembered writes; the oldest are forgotten first.
+_MAX_TRACKED_WRITES = 10_000
+
+# Seconds behind the primary; 0 when replay has caught up with what was received.
+_REPLICA_LAG = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+_read_routing = registry.counter(
+    "db_read_routing_total",
+    "Read sessions by target and the reason it was chosen",
+    ["target", "reason"],
+)
+_replica_lag = registry.gauge(
+    "db_replica_lag_seconds", "Last measured replica replay lag", ["replica"]
+)
+
+# Live Database instances, so forked workers can reset them.
+_databases: "weakref.WeakSet[Database]" = weakref.WeakSet()
+
+
+def _is_unavailable(error: BaseException) -> bool:
+    # Only connectivity problems count against the breaker; constraint
+    # violations and the like mean Postgres is answering fine.
+    return isinstance(
+        error, (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)
+    ) or (isinstance(error, exc.DBAPIError) and error.connection_invalidated)
+
+
+def _create_engine(db_url: str) -> Engine:
+    # Neon serverless uses a PgBouncer pooler (*-pooler.*.neon.tech),
+    # so we use NullPool to avoid double-pooling and stale connections.
+    engine = create_engine(
+        db_url,
+        echo=False,
+        poolclass=NullPool,  # Let Neon handle pooling
+        connect_args={
+            "connect_timeout": configs.DB_CONNECT_TIMEOUT_SECONDS,
+            # TCP keepalive — detects dead connections (Neon cold start / drop)
+            "keepalives": 1,
+            "keepalives_idle": 10,  # Start probes after 10s idle
+            "keepalives_interval": 5,  # Probe every 5s
+            "keepalives_count": 3,  # Drop after 3 failed probes (25s max)
+        },
+    )
+
+    # Neon pooler rejects session params in connect 'options',
+    # so we set statement_timeout after connection is established.
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("SET statement_timeout = '30s'")
+        cursor.close()
+
+    return engine
+
+
+@dataclass
+class _Replica:
+    name: str
+    engine: Engine
+    session_factory: orm.sessionmaker
+    lag: float | None = None
+    checked_at: float = float("-inf")
+    unavailable_until: float = 0.0
+
 
 class Database:
-    def __init__(self, db_url: str) -> None:
-        # Neon serverless uses a PgBouncer pooler (*-pooler.*.neon.tech),
-        # so we use NullPool to avoid double-pooling and stale connections.
-        self._engine = create_engine(
-            db_url,
-            echo=False,
-            poolclass=NullPool,  # Let Neon handle pooling
-            connect_args={
-                "connect_timeout": 15,
-                # TCP keepalive — detects dead connections (Neon cold start / drop)
-                "keepalives": 1,
-                "keepalives_idle": 10,  # Start probes after 10s idle
-                "keepalives_interval": 5,  # Probe every 5s
-                "keepalives_count": 3,  # Drop after 3 failed probes (25s max)
-            },
-        )
+    """Primary and optional read-replica sessions.
+
+    ``session()`` always uses the primary. ``read_session(*keys)`` uses a
+    replica, round-robin, unless its lag (checked at most every
+    ``replica_lag_check_seconds`` on a routed session) exceeds
+    ``replica_max_lag_seconds``, it failed to connect, or one of ``keys``
+    was written through this process within ``read_your_writes_seconds``;
+    in each case the read falls back to the primary.
+
+    Recent writes are only known to the process that made them. A read
+    that must see a write made through another worker or pod has to check
+    the primary itself; replica sessions carry ``REPLICA`` in their info
+    so repositories can tell (see ``UserRepository``).
+    """
 
-        # Neon pooler rejects session params in connect 'options',
-        # so we set statement_timeout after connection is established.
-        @event.listens_for(self._engine, "connect")
-        def _on_connect(dbapi_conn, connection_record):
-            cursor = dbapi_conn.cursor()
-            cursor.execute("SET statement_timeout = '30s'")
-            cursor.close()
-
-        self._session_factory = orm.scoped_session(
-            orm.sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=self._engine,
-            ),
+    def __init__(
+        self,
+        db_url: str,
+        replica_urls: Sequence[str] = (),
+        breaker: CircuitBreaker | None = None,
+        replica_max_lag_seconds: float = configs.DB_REPLICA_MAX_LAG_SECONDS,
+        replica_lag_check_seconds: float = configs.DB_REPLICA_LAG_CHECK_SECONDS,
+        read_your_writes_seconds: float = configs.DB_READ_YOUR_WRITES_SECONDS,
+    ) -> None:
+        self._breaker = breaker or breakers.postgres
+        self._engine = _create_engine(db_url)
+        # Every repository call opens and closes its own session, so a plain
+        # sessionmaker is enough; scoped_session only added a thread-local
+        # registry lookup per call.
+        self._session_factory = orm.sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self._engine,
         )
 
+        self._replicas: list[_Replica] = []
+        for index, url in enumerate(replica_urls):
+            engine = _create_engine(url)
+            self._replicas.append(
+                _Replica(
+                    name=make_url(url).host or f"replica-{index}",
+                    engine=engine,
+                    session_factory=orm.sessionmaker(
+                        autocommit=False, autoflush=False, bind=engine
+                    ),
+                )
+            )
+        self._next_replica = itertools.count()
+        self._replica_max_lag_seconds = replica_max_lag_seconds
+        self._replica_lag_check_seconds = replica_lag_check_seconds
+        self._read_your_writes_seconds = read_your_writes_seconds
+        self._recent_writes: OrderedDict[str, float] = OrderedDict()
+        self._recent_writes_lock = threading.Lock()
+        _databases.add(self)
+        if self._replicas:
+            logger.info(
+                f"Database read replicas: {[r.name for r in self._replicas]} "
+                f"(max lag {replica_max_lag_seconds:g}s)"
+            )
+
+    def _after_fork(self) -> None:
+        # Pooled connections belong to the parent; close=False forgets them
+        # without closing sockets the parent may still be using.
+        self._engine.dispose(close=False)
+        for replica in self._replicas:
+            replica.engine.dispose(close=False)
+        self._recent_writes_lock = threading.Lock()
+        self._recent_writes.clear()
+
     @property
     def engine(self):
         return self._engine
 
     @contextmanager
     def session(self) -> Generator[Session, None, None]:
+        """Open a primary session; raises ``CircuitOpenError`` while Postgres is failing."""
+        self._breaker.check()
+        started_at = time.perf_counter()
+        failed = False
         session: Session = self._session_factory()
+        try:
+            yield session
+            self._note_writes(session.info.get(WRITTEN_KEYS, ()))
+        except Exception as e:
+            failed = _is_unavailable(e)
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            self._breaker.record(time.perf_counter() - started_at, failed)
+
+    @contextmanager
+    def read_session(self, *keys: str) -> Generator[Session, None, None]:
+        """Open a session for read-only queries about ``keys``."""
+        session = self._open_replica_session(keys)
+        if session is None:
+            with self.session() as session:
+                yield session
+            return
         try:
             yield session
         except Exception:
@@ -57,4 +206,75 @@ class Database:
             raise
         finally:
             session.close()
-            self._session_factory.remove()
+
+    def _open_replica_session(self, keys: Sequence[str]) -> Session | None:
+        if not self._replicas:
+            return None
+        if self._recently_written(keys):
+            _read_routing.inc(target="primary", reason="read_your_writes")
+            return None
+
+        reason = "unavailable"
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[next(self._next_replica) % len(self._replicas)]
+            now = time.monotonic()
+            if replica.unavailable_until > now:
+                continue
+            check_due = now - replica.checked_at >= self._replica_lag_check_seconds
+            if not check_due and replica.lag > self._replica_max_lag_seconds:
+                reason = "lag"
+                continue
+
+            session: Session = replica.session_factory()
+            try:
+                if check_due:
+                    replica.lag = float(session.execute(_REPLICA_LAG).scalar() or 0)
+                    replica.checked_at = now
+                    _replica_lag.set(replica.lag, replica=replica.name)
+                    if replica.lag > self._replica_max_lag_seconds:
+                        logger.warning(
+                            f"Replica {replica.name} is {replica.lag:.1f}s behind, "
+                            f"reading from the primary"
+                        )
+                        session.close()
+                        reason = "lag"
+                        continue
+                else:
+                    # Connect now so a dead replica falls back instead of
+                    # failing the caller's query.
+                    session.connection()
+            except Exception as e:
+                session.close()
+                replica.unavailable_until = now + self._replica_lag_check_seconds
+                logger.warning(f"Replica {replica.name} unavailable: {e}")
+                continue
+            session.info[REPLICA] = replica.name
+            _read_routing.inc(target="replica", reason="ok")
+            return session
+
+        _read_routing.inc(target="primary", reason=reason)
+        return None
+
+    def _note_writes(self, keys) -> None:
+        if not keys or not self._replicas:
+            return
+        now = time.monotonic()
+        with self._recent_writes_lock:
+            for key in keys:
+                self._recent_writes[key] = now
+                self._recent_writes.move_to_end(key)
+            while len(self._recent_writes) > _MAX_TRACKED_WRITES:
+                self._recent_writes.popitem(last=False)
+
+    def _recently_written(self, keys: Sequence[str]) -> bool:
+        if not keys:
+            return False
+        cutoff = time.monotonic() - self._read_your_writes_seconds
+        with self._recent_writes_lock:
+            return any(self._recent_writes.get(key, cutoff) > cutoff for key in keys)
+
+
+@after_fork_in_child
+def _reset_after_fork() -> None:
+    for database in list(_databases):
+        database._after_fork()
@@ -9,5 +9,34 @@ ErrUserNotFound = Error(4040002, "user not found")
 
 ErrInternalError = Error(5000000, "internal error")
 ErrDatabaseError = Error(5000001, "database error")
+ErrStorageError = Error(5000002, "storage error")
 ErrUserAlreadyExists = Error(4090001, "user already exists")
 ErrInvalidCredentials = Error(4010001, "invalid credentials")
+ErrInvalidRefreshToken = Error(4010002, "invalid or expired refresh token")
+ErrRefreshTokenReused = Error(
+    4010003, "refresh token was already used, please log in again"
+)
+
+ErrIdempotencyKeyInProgress = Error(
+    4090002, "a request with this idempotency key is still in progress"
+)
+ErrIdempotencyKeyReused = Error(
+    4220001, "idempotency key was already used for a different request"
+)
+ErrInvalidCursor = Error(4000001, "invalid pagination cursor")
+ErrServiceOverloaded = Error(5030001, "service is overloaded, retry later")
+ErrDatabaseUnavailable = Error(5030002, "database is temporarily unavailable")
+ErrStorageUnavailable = Error(5030003, "photo storage is temporarily unavailable")
+ErrSessionEventsUnavailable = Error(
+    5030004, "session events are temporarily unavailable"
+)
+ErrRequestTooLarge = Error(4130001, "request body is too large")
+ErrTooManyRequests = Error(4290001, "too many attempts, retry later")
+
+# Face-photo quality precheck; messages name the offending photo.
+ErrFacePhotoUnreadable = Error(4220002, "face photo could not be decoded")
+ErrFacePhotoLowResolution = Error(4220003, "face photo resolution is too low")
+ErrFacePhotoBlurry = Error(4220004, "face photo is too blurry")
+ErrFacePhotoTooDark = Error(4220005, "face photo is too dark")
+ErrFacePhotoOverexposed = Error(4220006, "face photo is overexposed")
+ErrFacePhotoLowContrast = Error(4220007, "face photo has too little contrast")
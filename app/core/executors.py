@@ -0,0 +1,145 @@
+"""Separately sized thread pools (bulkheads) for blocking work.
+
+Each dependency gets its own pool so that, for example, a slow storage
+upload cannot starve database queries or password hashing of threads.
+Pools have a bounded queue: when it is full, new work is rejected with
+``ExecutorRejectedError`` (served as 503) instead of piling up latency.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.core.config import configs
+from app.core.metrics import registry
+from app.util.fork import after_fork_in_child
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_queue_wait = registry.histogram(
+    "executor_queue_wait_seconds",
+    "Time tasks spent queued before a worker picked them up",
+    ["pool"],
+)
+_active = registry.gauge(
+    "executor_active_workers", "Workers currently running a task", ["pool"]
+)
+_queued = registry.gauge(
+    "executor_queued_tasks", "Tasks waiting for a free worker", ["pool"]
+)
+_max_workers = registry.gauge(
+    "executor_max_workers", "Configured worker count", ["pool"]
+)
+_rejected = registry.counter(
+    "executor_rejected_total", "Tasks rejected because the queue was full", ["pool"]
+)
+_completed = registry.counter(
+    "executor_completed_total", "Tasks that finished running", ["pool"]
+)
+
+
+class ExecutorRejectedError(RuntimeError):
+    def __init__(self, pool: str) -> None:
+        super().__init__(f"{pool} executor is saturated")
+        self.pool = pool
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        _max_workers.set(self.max_workers, pool=name)
+        _active.set(0, pool=name)
+        _queued.set(0, pool=name)
+
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> Future:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                _rejected.inc(pool=self.name)
+                raise ExecutorRejectedError(self.name)
+            self._pending += 1
+        _queued.inc(pool=self.name)
+        try:
+            return self._executor.submit(
+                self._run, time.perf_counter(), fn, *args, **kwargs
+            )
+        except BaseException:
+            self._finish()
+            _queued.dec(pool=self.name)
+            raise
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run ``fn`` on this pool and await its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run(self, queued_at: float, fn: Callable[..., T], *args, **kwargs) -> T:
+        _queued.dec(pool=self.name)
+        _queue_wait.observe(time.perf_counter() - queued_at, pool=self.name)
+        _active.inc(pool=self.name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _active.dec(pool=self.name)
+            _completed.inc(pool=self.name)
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class Executors:
+    """The named pools, sized from ``Configs``."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Replace every pool with a fresh, empty one."""
+        # Repository calls (psycopg2 blocks the calling thread).
+        self.db = BoundedExecutor(
+            "db", configs.EXECUTOR_DB_WORKERS, configs.EXECUTOR_DB_QUEUE
+        )
+        # Firebase Storage uploads and deletes.
+        self.storage = BoundedExecutor(
+            "storage", configs.EXECUTOR_STORAGE_WORKERS, configs.EXECUTOR_STORAGE_QUEUE
+        )
+        # Firebase Realtime Database writes.
+        self.rtdb = BoundedExecutor(
+            "rtdb", configs.EXECUTOR_RTDB_WORKERS, configs.EXECUTOR_RTDB_QUEUE
+        )
+        # PBKDF2 hashing; hashlib releases the GIL while it runs.
+        self.cpu = BoundedExecutor(
+            "cpu", configs.EXECUTOR_CPU_WORKERS, configs.EXECUTOR_CPU_QUEUE
+        )
+
+    def all(self) -> list[BoundedExecutor]:
+        return [self.db, self.storage, self.rtdb, self.cpu]
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in self.all():
+            executor.shutdown(wait=wait)
+
+
+executors = Executors()
+
+
+@after_fork_in_child
+def _reset_after_fork() -> None:
+    # Worker threads do not survive fork(), and the copied pools would
+    # count them as alive and never start new ones.
+    executors.reset()
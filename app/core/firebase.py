@@ -0,0 +1,66 @@
+import logging
+from pathlib import Path
+
+import firebase_admin
+from firebase_admin import credentials, storage
+
+from app.core.config import configs
+from app.util.fork import after_fork_in_child
+
+logger = logging.getLogger(__name__)
+
+_firebase_app: firebase_admin.App | None = None
+
+
+def get_firebase_app() -> firebase_admin.App:
+    global _firebase_app
+    if _firebase_app is None:
+        cred_path = Path(configs.FIREBASE_CREDENTIALS_PATH)
+        if not cred_path.is_absolute():
+            # Resolve relative path from project root (2 levels up from this file)
+            cred_path = Path(__file__).resolve().parents[2] / cred_path
+        cred = credentials.Certificate(str(cred_path))
+        _firebase_app = firebase_admin.initialize_app(
+            cred,
+            {
+                "storageBucket": configs.GCS_BUCKET_NAME,
+                "databaseURL": configs.FIREBASE_RTDB_URL,
+                # Bounds RTDB/Storage HTTP calls; the SDK default is no timeout.
+                "httpTimeout": configs.FIREBASE_HTTP_TIMEOUT_SECONDS,
+            },
+        )
+        logger.info("Firebase Admin app initialized")
+    return _firebase_app
+
+
+def ensure_access_token() -> None:
+    """Fetch an OAuth2 access token unless the cached one is still valid.
+
+    The Storage and RTDB clients share the app's credential, so calling this
+    ahead of time takes the token round trip off the first request.
+    """
+    credential = get_firebase_app().credential
+    if not credential.get_credential().valid:
+        credential.get_access_token()
+
+
+@after_fork_in_child
+def _reset_after_fork() -> None:
+    # The app's HTTP sessions and cached clients were created by the parent;
+    # the child initializes its own on first use.
+    global _firebase_app
+    if _firebase_app is None:
+        return
+    try:
+        firebase_admin.delete_app(_firebase_app)
+    except Exception as e:
+        logger.warning(f"Failed to discard inherited Firebase app: {e}")
+    _firebase_app = None
+
+
+def get_bucket():
+    """Return the configured Firebase Storage bucket handle."""
+    if not configs.GCS_BUCKET_NAME:
+        raise ValueError("Firebase Storage bucket is not configured")
+    get_firebase_app()
+    return storage.bucket()
@@ -0,0 +1,269 @@
+"""Ordered, idempotent schema changes for databases created before a model change.
+
+``SQLModel.metadata.create_all`` only creates missing tables, so indexes or
+columns added to existing tables are applied here instead. Each migration
+runs once and is recorded in ``tb_schema_migrations``; statements use
+``IF [NOT] EXISTS`` (or an ``applies_if`` check) so they are also no-ops on
+freshly created schemas.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+from app.core.config import configs
+from app.model import UserFaceModel
+from app.model.user_face_model import (
+    ENROLLMENT_PARTITION,
+    ENROLLMENT_POSES,
+    ENROLLMENT_UNIQUE_INDEX,
+    LOGIN_POSE,
+    add_months,
+    login_partition_ddl,
+)
+
+logger = logging.getLogger(__name__)
+
+_LOCK_KEY = "tb_schema_migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    name: str
+    # SQL strings, or callables for steps that need to inspect the data.
+    statements: tuple[str | Callable[[Connection], None], ...]
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    transactional: bool = True
+    # Optional boolean query; the migration is recorded without running
+    # when it returns false (e.g. the schema was created in its final shape).
+    applies_if: str | None = None
+
+
+_USER_FACES_IS_PLAIN_TABLE = (
+    "SELECT EXISTS (SELECT 1 FROM pg_class "
+    "WHERE oid = to_regclass('tb_user_faces') AND relkind = 'r')"
+)
+
+
+def _partition_user_faces(conn: Connection) -> None:
+    """Rebuild a plain ``tb_user_faces`` as the partitioned table.
+
+    Runs in a single transaction: the legacy table is renamed out of the way,
+    the partitioned table is created from the model, rows are copied across
+    and the legacy table is dropped.
+    """
+    for statement in (
+        "ALTER TABLE tb_user_faces RENAME TO tb_user_faces_legacy",
+        "ALTER INDEX tb_user_faces_pkey RENAME TO tb_user_faces_legacy_pkey",
+        "ALTER INDEX IF EXISTS ix_tb_user_faces_user_pose_created_id "
+        "RENAME TO ix_tb_user_faces_legacy_history",
+        "ALTER INDEX IF EXISTS ix_tb_user_faces_user_id "
+        "RENAME TO ix_tb_user_faces_legacy_user_id",
+        "ALTER SEQUENCE IF EXISTS tb_user_faces_id_seq "
+        "RENAME TO tb_user_faces_legacy_id_seq",
+    ):
+        conn.execute(text(statement))
+    UserFaceModel.__table__.create(conn)
+
+    oldest = conn.execute(
+        text(
+            "SELECT min(created_at)::date FROM tb_user_faces_legacy "
+            "WHERE pose = :pose AND created_at IS NOT NULL"
+        ),
+        {"pose": LOGIN_POSE},
+    ).scalar()
+    current = date.today().replace(day=1)
+    month = (oldest or current).replace(day=1)
+    while month <= add_months(current, configs.FACE_PARTITION_MONTHS_AHEAD):
+        conn.execute(text(login_partition_ddl(month)))
+        month = add_months(month, 1)
+
+    # The enrollment partition is unique on (user_id, pose), and racing
+    # delete-then-insert re-uploads could leave several rows per pose: copy
+    # only the newest. The others' images become unreferenced for storage-gc.
+    result = conn.execute(
+        text(
+            "INSERT INTO tb_user_faces "
+            "(id, user_id, pose, source_images, created_at, updated_at) "
+            "SELECT id, user_id, coalesce(pose, 'unknown'), source_images, "
+            "coalesce(created_at, now()), updated_at FROM ("
+            "SELECT *, row_number() OVER ("
+            "PARTITION BY user_id, pose "
+            "ORDER BY created_at DESC NULLS LAST, id DESC) AS rank "
+            "FROM tb_user_faces_legacy) AS legacy "
+            "WHERE rank = 1 OR pose IS NULL OR pose NOT IN :enrollment_poses"
+        ).bindparams(bindparam("enrollment_poses", expanding=True)),
+        {"enrollment_poses": list(ENROLLMENT_POSES)},
+    )
+    logger.info(f"Copied {result.rowcount} rows into partitioned tb_user_faces")
+    conn.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence('tb_user_faces', 'id'), "
+            "coalesce((SELECT max(id) FROM tb_user_faces), 0) + 1, false)"
+        )
+    )
+    conn.execute(text("DROP TABLE tb_user_faces_legacy"))
+
+
+def _create_email_lower_index(conn: Connection) -> None:
+    """Build the case-insensitive unique email index without blocking writes."""
+    duplicates = conn.execute(
+        text(
+            "SELECT count(*) FROM (SELECT 1 FROM tb_users WHERE email IS NOT NULL "
+            "GROUP BY lower(email) HAVING count(*) > 1) AS dup"
+        )
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} emails exist in several letter cases; merge or rename "
+            "them (see `normalize-emails --report-duplicates`) and rerun migrate"
+        )
+    # A failed CONCURRENTLY build leaves an invalid index behind.
+    invalid = conn.execute(
+        text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass('ux_tb_users_email_lower')"
+        )
+    ).scalar()
+    if invalid:
+        conn.execute(text("DROP INDEX CONCURRENTLY ux_tb_users_email_lower"))
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_tb_users_email_lower "
+            "ON tb_users (lower(email))"
+        )
+    )
+
+
+def _create_enrollment_unique_index(conn: Connection) -> None:
+    """Keep the newest row per (user, enrollment pose), then index uniquely.
+
+    The old delete-then-insert could leave duplicates when two re-uploads
+    raced; their images become unreferenced and ``storage-gc`` removes them.
+    """
+    result = conn.execute(
+        text(
+            f"DELETE FROM {ENROLLMENT_PARTITION} AS f USING ("
+            "SELECT id, row_number() OVER ("
+            "PARTITION BY user_id, pose ORDER BY created_at DESC, id DESC) AS rank "
+            f"FROM {ENROLLMENT_PARTITION}) AS ranked "
+            "WHERE f.id = ranked.id AND ranked.rank > 1"
+        )
+    )
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate enrollment face rows")
+    # A failed CONCURRENTLY build leaves an invalid index behind.
+    invalid = conn.execute(
+        text(
+            "SELECT NOT indisvalid FROM pg_index "
+            f"WHERE indexrelid = to_regclass('{ENROLLMENT_UNIQUE_INDEX}')"
+        )
+    ).scalar()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {ENROLLMENT_UNIQUE_INDEX}"))
+    conn.execute(
+        text(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {ENROLLMENT_UNIQUE_INDEX} "
+            f"ON {ENROLLMENT_PARTITION} (user_id, pose)"
+        )
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        name="0001_tb_user_faces_history_index",
+        statements=(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+            "ix_tb_user_faces_user_pose_created_id "
+            "ON tb_user_faces (user_id, pose, created_at, id) "
+            "INCLUDE (source_images)",
+            # Superseded by the composite index above (same leading column).
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_tb_user_faces_user_id",
+        ),
+        transactional=False,
+        # Partitioned schemas get this index from the model.
+        applies_if=_USER_FACES_IS_PLAIN_TABLE,
+    ),
+    Migration(
+        name="0002_tb_user_faces_partition_by_pose",
+        statements=(_partition_user_faces,),
+        applies_if=_USER_FACES_IS_PLAIN_TABLE,
+    ),
+    Migration(
+        name="0003_tb_users_email_lower_unique_index",
+        statements=(_create_email_lower_index,),
+        transactional=False,
+    ),
+    Migration(
+        name="0004_tb_user_faces_enrollment_unique_pose",
+        statements=(_create_enrollment_unique_index,),
+        transactional=False,
+    ),
+]
+
+
+def run_migrations(engine: Engine) -> list[str]:
+    """Apply pending migrations in order and return the names applied."""
+    SQLModel.metadata.create_all(engine)
+
+    applied_now: list[str] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS tb_schema_migrations ("
+                "name text PRIMARY KEY, "
+                "applied_at timestamptz NOT NULL DEFAULT now())"
+            )
+        )
+        # Serialize concurrent runs (e.g. several deploy jobs).
+        conn.execute(
+            text("SELECT pg_advisory_lock(hashtext(:key))"), {"key": _LOCK_KEY}
+        )
+        try:
+            applied = set(
+                conn.execute(text("SELECT name FROM tb_schema_migrations")).scalars()
+            )
+            for migration in MIGRATIONS:
+                if migration.name in applied:
+                    continue
+                if (
+                    migration.applies_if
+                    and not conn.execute(text(migration.applies_if)).scalar()
+                ):
+                    logger.info(f"Skipping migration {migration.name}: not needed")
+                    _record(conn, migration.name)
+                    continue
+                logger.info(f"Applying migration {migration.name}")
+                if migration.transactional:
+                    with engine.begin() as tx:
+                        _execute(tx, migration.statements)
+                        _record(tx, migration.name)
+                else:
+                    _execute(conn, migration.statements)
+                    _record(conn, migration.name)
+                applied_now.append(migration.name)
+        finally:
+            conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": _LOCK_KEY}
+            )
+    return applied_now
+
+
+def _execute(conn: Connection, statements) -> None:
+    for statement in statements:
+        if callable(statement):
+            statement(conn)
+        else:
+            conn.execute(text(statement))
+
+
+def _record(conn, name: str) -> None:
+    conn.execute(
+        text("INSERT INTO tb_schema_migrations (name) VALUES (:name)"),
+        {"name": name},
+    )
@@ -0,0 +1,87 @@
+"""JSON responses for the ``BaseResponse`` envelope without the generic path.
+
+Endpoints still declare ``response_model=BaseResponse[...]`` for the OpenAPI
+schema, but return a ready ``Response`` so FastAPI skips re-validating and
+re-encoding trusted service output. Payloads are written to JSON directly by
+pydantic-core, other bodies by orjson, and the envelopes of the constant errors in
+``app.core.exceptions`` are serialized once at import.
+"""
+
+import uuid
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.core import exceptions
+from app.core.ecode import Error
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _envelope(success: bool, code: int, message: str, data: Any) -> dict:
+    return {"success": success, "code": code, "message": message, "data": data}
+
+
+_ERROR_BODIES: dict[tuple[int, str], bytes] = {
+    (err.code, err.message): dumps(_envelope(False, err.code, err.message, None))
+    for err in vars(exceptions).values()
+    if isinstance(err, Error)
+}
+
+
+def success_response(
+    data: BaseModel | dict | list | None, message: str = "Success", code: int = 0
+) -> Response:
+    """Envelope ``data`` as ``BaseResponse.success_response`` would, unvalidated.
+
+    ``data`` may be a model or, for large trusted payloads, the plain dicts
+    already matching the response model (``model_construct`` is slow in bulk).
+    """
+    # pydantic-core writes models straight to JSON; only the small envelope
+    # around it goes through ``dumps``.
+    if isinstance(data, BaseModel):
+        payload = data.model_dump_json().encode("utf-8")
+    else:
+        payload = dumps(data)
+    body = b"".join(
+        (
+            b'{"success":true,"code":',
+            dumps(code),
+            b',"message":',
+            dumps(message),
+            b',"data":',
+            payload,
+            b"}",
+        )
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def error_response(err: Error) -> Response:
+    body = _ERROR_BODIES.get((err.code, err.message))
+    if body is None:
+        body = dumps(_envelope(False, err.code, err.message, None))
+    return Response(
+        content=body, status_code=err.http_status, media_type="application/json"
+    )
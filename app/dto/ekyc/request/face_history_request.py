@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+
+
+@dataclass
+class FaceHistoryRequest:
+    pose: Optional[str] = Query(
+        None, description="Only return rows for this pose (e.g. login, left)"
+    )
+    created_from: Optional[datetime] = Query(
+        None, description="Only rows created at or after this time"
+    )
+    created_to: Optional[datetime] = Query(
+        None, description="Only rows created before this time"
+    )
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    )
+    limit: int = Query(20, ge=1, le=100, description="Page size")
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class FaceHistoryItem(BaseModel):
+    id: int = Field(..., description="Face record ID")
+    pose: Optional[str] = Field(None, description="Pose of the captured faces")
+    source_images: Optional[list[str]] = Field(None, description="Image URLs")
+    created_at: datetime = Field(..., description="When the faces were captured")
+
+
+class FaceHistoryResponse(BaseModel):
+    items: list[FaceHistoryItem] = Field(..., description="Page of face records")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page; absent on the last page"
+    )
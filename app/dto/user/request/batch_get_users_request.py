@@ -0,0 +1,27 @@
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field, model_validator
+
+from app.core.config import configs
+
+
+class BatchGetUsersRequest(BaseModel):
+    emails: Optional[list[EmailStr]] = Field(
+        None,
+        min_length=1,
+        max_length=configs.USER_BATCH_LOOKUP_MAX_ITEMS,
+        description="Emails to look up",
+    )
+    user_ids: Optional[list[uuid.UUID]] = Field(
+        None,
+        min_length=1,
+        max_length=configs.USER_BATCH_LOOKUP_MAX_ITEMS,
+        description="User IDs to look up",
+    )
+
+    @model_validator(mode="after")
+    def _exactly_one_key_list(self):
+        if (self.emails is None) == (self.user_ids is None):
+            raise ValueError("Provide exactly one of 'emails' or 'user_ids'")
+        return self
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(
+        ..., min_length=1, max_length=128, description="Refresh token from login"
+    )
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.dto.user.response.get_user_response import GetUserResponse
+
+
+class BatchUserItem(BaseModel):
+    key: str = Field(..., description="Email or user ID as sent in the request")
+    found: bool = Field(..., description="Whether a user matched the key")
+    user: Optional[GetUserResponse] = Field(None, description="Matched user")
+
+
+class BatchGetUsersResponse(BaseModel):
+    items: list[BatchUserItem] = Field(
+        ..., description="One item per requested key, in request order"
+    )
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RefreshResponse(BaseModel):
+    email: Optional[str]
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+    class Config:
+        from_attributes = True
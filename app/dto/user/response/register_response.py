@@ -6,6 +6,8 @@ from pydantic import BaseModel
 class RegisterResponse(BaseModel):
     email: Optional[str]
     access_token: str
+    # Omitted when the token could not be stored; log in again to get one.
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
     class Config:
@@ -1,13 +1,22 @@
 import logging
 import sys
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from datetime import date
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.v1.routes import routers as v1_routers
+from app.core.body_budget import BodyBudgetMiddleware
 from app.core.config import configs
 from app.core.container import Container
+from app.core.exceptions import ErrServiceOverloaded
+from app.core.executors import ExecutorRejectedError
+from app.core.metrics import registry
+from app.core.responses import FastJSONResponse, error_response
 from app.util.class_object import singleton
+from app.util.jwt_keys import get_key_ring
 
+from starlette.formparsers import MultiPartParser
 from starlette.middleware.cors import CORSMiddleware
 from sqlmodel import SQLModel
 
@@ -21,10 +30,11 @@ logger = logging.getLogger(__name__)
 
 
 class HealthCheckFilter(logging.Filter):
-    """Suppress uvicorn access logs for the /health endpoint."""
+    """Suppress uvicorn access logs for the /health and /metrics endpoints."""
 
     def filter(self, record: logging.LogRecord) -> bool:
-        return "/health" not in record.getMessage()
+        message = record.getMessage()
+        return "/health" not in message and "/metrics" not in message
 
 
 # Suppress noisy health-check logs from uvicorn access logger
@@ -41,6 +51,8 @@ class AppCreator:
             title=configs.PROJECT_NAME,
             openapi_url=f"{configs.API}/openapi.json",
             version="0.0.1",
+            default_response_class=FastJSONResponse,
+            lifespan=self._lifespan,
         )
 
         # set db and container
@@ -50,6 +62,9 @@ class AppCreator:
         self.db = self.container.db()
         logger.info("Database and container initialized successfully")
 
+        # load the JWT keys now so a bad key file stops startup
+        get_key_ring()
+
         # auto-create tables
         try:
             SQLModel.metadata.create_all(self.db.engine)
@@ -57,6 +72,18 @@ class AppCreator:
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
 
+        # make sure inserts never land in the login default partition
+        err = self.container.user_face_partition_repository().ensure_login_partitions(
+            date.today().replace(day=1), configs.FACE_PARTITION_MONTHS_AHEAD + 1
+        )
+        if err:
+            logger.error(f"Failed to create login face partitions: {err.message}")
+
+        # bound the request bodies held in memory; uploaded files stay in
+        # memory (covered by the budget) up to the spool size
+        MultiPartParser.spool_max_size = configs.UPLOAD_SPOOL_MAX_BYTES
+        self.app.add_middleware(BodyBudgetMiddleware)
+
         # set CORS middleware
         logger.info("Configuring CORS middleware...")
         self.app.add_middleware(
@@ -77,9 +104,63 @@ class AppCreator:
         def health():
             return JSONResponse(content={"status": "ok"})
 
+        @self.app.get("/health/ready", include_in_schema=False)
+        async def ready():
+            readiness = self.container.readiness_service()
+            is_ready, results = await readiness.check()
+            return JSONResponse(
+                status_code=200 if is_ready else 503,
+                content={
+                    "status": "ready" if is_ready else "not_ready",
+                    "dependencies": {
+                        name: {
+                            "ok": result.ok,
+                            "required": readiness.required(name),
+                            "latency_ms": round(result.latency_seconds * 1000, 1),
+                        }
+                        for name, result in results.items()
+                    },
+                },
+            )
+
+        @self.app.get("/.well-known/jwks.json", include_in_schema=False)
+        def jwks(request: Request):
+            key_ring = get_key_ring()
+            headers = {
+                "Cache-Control": f"public, max-age={configs.JWKS_MAX_AGE_SECONDS}",
+                "ETag": key_ring.jwks_etag,
+            }
+            if key_ring.jwks_not_modified(request.headers.get("if-none-match")):
+                return Response(status_code=304, headers=headers)
+            return Response(
+                key_ring.jwks, media_type="application/jwk-set+json", headers=headers
+            )
+
+        @self.app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(
+                registry.render(), media_type="text/plain; version=0.0.4"
+            )
+
+        @self.app.exception_handler(ExecutorRejectedError)
+        async def executor_rejected(request, exc: ExecutorRejectedError):
+            logger.warning(f"Rejected {request.url.path}: {exc}")
+            response = error_response(ErrServiceOverloaded)
+            response.headers["Retry-After"] = "1"
+            return response
+
         self.app.include_router(v1_routers, prefix=configs.API_V1_STR)
         logger.info(f"Routes registered. API available at {configs.API_V1_STR}")
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        # Runs in each server process (after fork under `serve`), so every
+        # worker warms its own clients. Failures only delay readiness.
+        await self.container.readiness_service().warm_up()
+        yield
+        self.container.face_quality_checker().shutdown()
+        self.container.session_event_hub().shutdown()
+
 
 app_creator = AppCreator()
 app = app_creator.app
@@ -1,6 +1,12 @@
 from app.model.user_model import UserModel as UserModel
 from app.model.base_model import BaseModel as BaseModel
 from app.model.user_face_model import UserFaceModel as UserFaceModel
+from app.model.idempotency_key_model import IdempotencyKeyModel as IdempotencyKeyModel
+from app.model.refresh_token_model import RefreshTokenModel as RefreshTokenModel
+from app.model.rate_limit_model import RateLimitModel as RateLimitModel
+from app.model.face_retention_checkpoint_model import (
+    FaceRetentionCheckpointModel as FaceRetentionCheckpointModel,
+)
 
 
 # this file exists to expose the models that other modules are allowed to import from the database layer
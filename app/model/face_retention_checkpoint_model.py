@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime
+from sqlmodel import Field, SQLModel, func
+
+
+class FaceRetentionCheckpointModel(SQLModel, table=True):
+    __tablename__ = "tb_face_retention_checkpoints"
+
+    partition_name: str = Field(primary_key=True)
+    last_id: int = Field(sa_column=Column(BigInteger, nullable=False, default=0))
+    objects_deleted: int = Field(
+        sa_column=Column(BigInteger, nullable=False, default=0)
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        )
+    )
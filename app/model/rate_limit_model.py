@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, Integer
+from sqlmodel import Field, SQLModel
+
+
+class RateLimitModel(SQLModel, table=True):
+    """Sliding-window counters shared by all replicas.
+
+    ``window_index`` is ``floor(epoch / window_seconds)``; the counts of the
+    previous and current fixed windows approximate the sliding window.
+    """
+
+    __tablename__ = "tb_rate_limits"
+
+    key: str = Field(primary_key=True)
+    window_index: int = Field(sa_column=Column(BigInteger, nullable=False, index=True))
+    previous_count: int = Field(sa_column=Column(Integer, nullable=False))
+    current_count: int = Field(sa_column=Column(Integer, nullable=False))
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from sqlmodel import Field, SQLModel, func
+
+
+class RefreshTokenModel(SQLModel, table=True):
+    """One issued refresh token, stored as the SHA-256 of the opaque value.
+
+    Tokens are rotated on every use; all tokens descending from one login
+    share a ``family_id`` so that replaying a used token can revoke the
+    whole chain.
+    """
+
+    __tablename__ = "tb_refresh_tokens"
+
+    token_hash: bytes = Field(sa_column=Column(LargeBinary, primary_key=True))
+    family_id: uuid.UUID = Field(
+        sa_column=Column(UUID(as_uuid=True), nullable=False, index=True)
+    )
+    user_id: uuid.UUID = Field(
+        sa_column=Column(
+            UUID(as_uuid=True),
+            ForeignKey("tb_users.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        )
+    )
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True)
+    )
+    used_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    revoked_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), server_default=func.now())
+    )
@@ -1,30 +1,97 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import ARRAY, BigInteger, Column, DateTime, Text
+from sqlalchemy import DDL, ARRAY, BigInteger, Column, DateTime, Index, Text, event
 from sqlmodel import Field, SQLModel, func
 
+# tb_user_faces is LIST-partitioned by pose. Enrollment poses are replaced in
+# place and live forever, so they get a plain partition; login captures are
+# append-only and RANGE-partitioned by month on created_at so that retention
+# can detach and drop whole months instead of running DELETEs.
+ENROLLMENT_POSES = ("left", "right", "straight")
+LOGIN_POSE = "login"
+
+ENROLLMENT_PARTITION = "tb_user_faces_enrollment"
+# One row per (user, enrollment pose); save_ekyc_faces upserts against it.
+ENROLLMENT_UNIQUE_INDEX = "ux_tb_user_faces_enrollment_user_pose"
+LOGIN_PARTITION = "tb_user_faces_login"
+LOGIN_MONTH_PARTITION_PREFIX = f"{LOGIN_PARTITION}_p"
+
 
 class UserFaceModel(SQLModel, table=True):
     __tablename__ = "tb_user_faces"
+    __table_args__ = (
+        # Keyset pagination for face history; INCLUDE makes it covering.
+        Index(
+            "ix_tb_user_faces_user_pose_created_id",
+            "user_id",
+            "pose",
+            "created_at",
+            "id",
+            postgresql_include=["source_images"],
+        ),
+        # Partitioned tables need every partition key in the primary key.
+        {"postgresql_partition_by": "LIST (pose)"},
+    )
 
     id: Optional[int] = Field(
         default=None,
         sa_column=Column(BigInteger, primary_key=True, autoincrement=True),
     )
-    user_id: uuid.UUID = Field(foreign_key="tb_users.id", nullable=False, index=True)
-    pose: Optional[str] = Field(default=None)
+    user_id: uuid.UUID = Field(foreign_key="tb_users.id", nullable=False)
+    pose: str = Field(sa_column=Column(Text, primary_key=True))
     source_images: Optional[list[str]] = Field(
         default=None,
         sa_column=Column(ARRAY(Text), nullable=True),
     )
 
     created_at: datetime = Field(
-        sa_column=Column(DateTime(timezone=True), server_default=func.now())
+        sa_column=Column(
+            DateTime(timezone=True), primary_key=True, server_default=func.now()
+        )
     )
     updated_at: datetime = Field(
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
         )
     )
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month ``count`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def login_partition_name(month: date) -> str:
+    return f"{LOGIN_MONTH_PARTITION_PREFIX}{month:%Y%m}"
+
+
+def login_partition_ddl(month: date) -> str:
+    """DDL creating the monthly login partition containing ``month``."""
+    start = month.replace(day=1)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {login_partition_name(start)} "
+        f"PARTITION OF {LOGIN_PARTITION} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+_poses = ", ".join(f"'{pose}'" for pose in ENROLLMENT_POSES)
+for _statement in (
+    f"CREATE TABLE IF NOT EXISTS {ENROLLMENT_PARTITION} "
+    f"PARTITION OF tb_user_faces FOR VALUES IN ({_poses})",
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {ENROLLMENT_UNIQUE_INDEX} "
+    f"ON {ENROLLMENT_PARTITION} (user_id, pose)",
+    f"CREATE TABLE IF NOT EXISTS {LOGIN_PARTITION} "
+    f"PARTITION OF tb_user_faces FOR VALUES IN ('{LOGIN_POSE}') "
+    "PARTITION BY RANGE (created_at)",
+    # Safety nets; monthly partitions are created ahead so these stay empty.
+    f"CREATE TABLE IF NOT EXISTS {LOGIN_PARTITION}_default "
+    f"PARTITION OF {LOGIN_PARTITION} DEFAULT",
+    "CREATE TABLE IF NOT EXISTS tb_user_faces_default "
+    "PARTITION OF tb_user_faces DEFAULT",
+):
+    event.listen(UserFaceModel.__table__, "after_create", DDL(_statement))
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from sqlalchemy import Index, func
 from sqlmodel import Field
 
 from app.model.base_model import BaseModel
@@ -13,3 +14,7 @@ class UserModel(BaseModel, table=True):
     full_name: Optional[str] = Field(default=None)
     password_hashed: Optional[str] = Field(default=None)
     is_ekyc_uploaded: bool = Field(default=False)
+
+
+# Case-insensitive uniqueness; lookups filter on lower(email) to use it.
+Index("ux_tb_users_email_lower", func.lower(UserModel.__table__.c.email), unique=True)
@@ -1,3 +1,20 @@
 from app.repository.base_repository import BaseRepository as BaseRepository
+from app.repository.user_records import (
+    RefreshTokenOwner as RefreshTokenOwner,
+    UserCredentials as UserCredentials,
+    UserProfile as UserProfile,
+)
 from app.repository.user_repository import UserRepository as UserRepository
 from app.repository.user_face_repository import UserFaceRepository as UserFaceRepository
+from app.repository.idempotency_repository import (
+    IdempotencyRepository as IdempotencyRepository,
+)
+from app.repository.user_face_partition_repository import (
+    UserFacePartitionRepository as UserFacePartitionRepository,
+)
+from app.repository.refresh_token_repository import (
+    RefreshTokenRepository as RefreshTokenRepository,
+)
+from app.repository.rate_limit_repository import (
+    RateLimitRepository as RateLimitRepository,
+)
@@ -2,6 +2,10 @@ import logging
 from contextlib import AbstractContextManager
 from typing import Callable, Type, TypeVar
 
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.database import REPLICA, WRITTEN_KEYS
+from app.core.ecode import Error
+from app.core.exceptions import ErrDatabaseError, ErrDatabaseUnavailable
 from app.model import BaseModel
 from sqlalchemy.orm import Session
 
@@ -14,9 +18,33 @@ class BaseRepository:
         self,
         session_factory: Callable[..., AbstractContextManager[Session]],
         model: Type[T],
+        read_session_factory: Callable[..., AbstractContextManager[Session]]
+        | None = None,
     ) -> None:
         self.session_factory = session_factory
+        # Called with the keys being read (see Database.read_session);
+        # defaults to the primary.
+        self.read_session_factory = read_session_factory or (
+            lambda *keys: session_factory()
+        )
         self.model = model
         logger.debug(
             f"Initialized {self.__class__.__name__} for model {model.__name__}"
         )
+
+    @staticmethod
+    def _database_error(e: Exception) -> Error:
+        """Map an exception from a session block to the error returned to callers."""
+        if isinstance(e, CircuitOpenError):
+            return ErrDatabaseUnavailable
+        return Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+
+    @staticmethod
+    def _mark_written(session: Session, *keys: str) -> None:
+        """Keep reads of ``keys`` on the primary for a while after this session."""
+        session.info.setdefault(WRITTEN_KEYS, set()).update(keys)
+
+    @staticmethod
+    def _from_replica(session: Session) -> bool:
+        """Whether ``session`` reads a replica, which may lag the primary."""
+        return REPLICA in session.info
@@ -0,0 +1,174 @@
+import logging
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy import and_, delete, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlmodel import func
+
+from app.core.constants import IdempotencyStatus
+from app.core.ecode import Error
+from app.core.exceptions import ErrDatabaseError
+from app.model import IdempotencyKeyModel
+from app.repository.base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyRepository(BaseRepository):
+    def __init__(
+        self, session_factory: Callable[..., AbstractContextManager[Session]]
+    ) -> None:
+        super().__init__(session_factory, IdempotencyKeyModel)
+        logger.info("IdempotencyRepository initialized")
+
+    def claim(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        ttl_seconds: int,
+        lock_seconds: int,
+    ) -> tuple[IdempotencyKeyModel | None, Error | None]:
+        """Try to take ownership of an idempotency key.
+
+        Returns ``(None, None)`` when this call claimed the key. Expired keys and
+        in-progress keys whose lock has lapsed (crashed replica) are re-claimed.
+        Otherwise the record currently holding the key is returned.
+        """
+        model = IdempotencyKeyModel
+        try:
+            with self.session_factory() as session:
+                stmt = pg_insert(model).values(
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    status=IdempotencyStatus.IN_PROGRESS,
+                    response=None,
+                    locked_until=func.now() + timedelta(seconds=lock_seconds),
+                    expires_at=func.now() + timedelta(seconds=ttl_seconds),
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[model.scope, model.key],
+                    set_={
+                        "fingerprint": stmt.excluded.fingerprint,
+                        "status": stmt.excluded.status,
+                        "response": None,
+                        "locked_until": stmt.excluded.locked_until,
+                        "expires_at": stmt.excluded.expires_at,
+                        "created_at": func.now(),
+                    },
+                    where=or_(
+                        model.expires_at < func.now(),
+                        and_(
+                            model.status == IdempotencyStatus.IN_PROGRESS,
+                            model.locked_until < func.now(),
+                        ),
+                    ),
+                ).returning(model.key)
+
+                # The holder can release the key between our upsert and the
+                # read-back, so retry a couple of times before giving up.
+                for _ in range(3):
+                    claimed = session.execute(stmt).first() is not None
+                    session.commit()
+                    if claimed:
+                        return None, None
+
+                    record = session.execute(
+                        select(model).where(model.scope == scope, model.key == key)
+                    ).scalar_one_or_none()
+                    if record is not None:
+                        session.expunge(record)
+                        return record, None
+
+                return None, Error(
+                    ErrDatabaseError.code,
+                    f"Could not claim idempotency key '{scope}/{key}'",
+                )
+        except Exception as e:
+            logger.error(
+                f"Database error while claiming idempotency key '{scope}/{key}': {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def get(
+        self, scope: str, key: str
+    ) -> tuple[IdempotencyKeyModel | None, Error | None]:
+        try:
+            with self.session_factory() as session:
+                record = session.execute(
+                    select(self.model).where(
+                        self.model.scope == scope, self.model.key == key
+                    )
+                ).scalar_one_or_none()
+                if record is not None:
+                    session.expunge(record)
+                return record, None
+        except Exception as e:
+            logger.error(
+                f"Database error while reading idempotency key '{scope}/{key}': {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def complete(self, scope: str, key: str, response: dict) -> Error | None:
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    update(self.model)
+                    .where(self.model.scope == scope, self.model.key == key)
+                    .values(status=IdempotencyStatus.COMPLETED, response=response)
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while completing idempotency key '{scope}/{key}': {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def release(self, scope: str, key: str) -> Error | None:
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    delete(self.model).where(
+                        self.model.scope == scope,
+                        self.model.key == key,
+                        self.model.status == IdempotencyStatus.IN_PROGRESS,
+                    )
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while releasing idempotency key '{scope}/{key}': {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def purge_expired(self, limit: int) -> tuple[int, Error | None]:
+        try:
+            with self.session_factory() as session:
+                expired = (
+                    select(self.model.scope, self.model.key)
+                    .where(self.model.expires_at < func.now())
+                    .limit(limit)
+                )
+                result = session.execute(
+                    delete(self.model).where(
+                        tuple_(self.model.scope, self.model.key).in_(expired)
+                    )
+                )
+                session.commit()
+                return result.rowcount, None
+        except Exception as e:
+            logger.error(
+                f"Database error while purging idempotency keys: {str(e)}",
+                exc_info=True,
+            )
+            return 0, self._database_error(e)
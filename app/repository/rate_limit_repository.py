@@ -0,0 +1,126 @@
+import logging
+import time
+from contextlib import AbstractContextManager
+from typing import Callable
+
+from sqlalchemy import bindparam, case, delete, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.ecode import Error
+from app.model import RateLimitModel
+from app.repository.base_repository import BaseRepository
+from app.util.rate_limiter import sliding_window_retry_after
+
+logger = logging.getLogger(__name__)
+
+_limits = RateLimitModel.__table__
+
+
+def _build_hit():
+    stmt = pg_insert(_limits).values(
+        key=bindparam("limit_key"),
+        window_index=bindparam("window_index"),
+        previous_count=0,
+        current_count=1,
+    )
+    window_index = stmt.excluded.window_index
+    # The stored windows rolled forward to the caller's window.
+    previous = case(
+        (_limits.c.window_index == window_index, _limits.c.previous_count),
+        (_limits.c.window_index == window_index - 1, _limits.c.current_count),
+        else_=0,
+    )
+    current = case(
+        (_limits.c.window_index == window_index, _limits.c.current_count),
+        else_=0,
+    )
+    # Rejected hits leave the row untouched and return nothing.
+    return stmt.on_conflict_do_update(
+        index_elements=[_limits.c.key],
+        set_={
+            "window_index": window_index,
+            "previous_count": previous,
+            "current_count": current + 1,
+        },
+        where=previous * bindparam("previous_weight") + current < bindparam("limit"),
+    ).returning(literal_column("1"))
+
+
+# One round trip per admitted hit: insert the key or, under its row lock,
+# roll its windows forward and count the hit if the estimate is below the
+# limit.
+_HIT = _build_hit()
+
+_GET_COUNTS = select(
+    _limits.c.window_index, _limits.c.previous_count, _limits.c.current_count
+).where(_limits.c.key == bindparam("limit_key"))
+
+_PURGE = delete(_limits).where(_limits.c.window_index < bindparam("before_window"))
+
+
+class RateLimitRepository(BaseRepository):
+    def __init__(
+        self, session_factory: Callable[..., AbstractContextManager[Session]]
+    ) -> None:
+        super().__init__(session_factory, RateLimitModel)
+        logger.info("RateLimitRepository initialized")
+
+    def hit(
+        self, key: str, limit: int, window_seconds: float
+    ) -> tuple[float, Error | None]:
+        """Count one hit for ``key``: 0 if allowed, else seconds to wait.
+
+        Windows are derived from wall-clock time, so replicas must keep
+        their clocks in sync (NTP) for the counters to line up.
+        """
+        now = time.time()
+        window_index = int(now // window_seconds)
+        elapsed = now - window_index * window_seconds
+        try:
+            with self.session_factory() as session:
+                admitted = session.execute(
+                    _HIT,
+                    {
+                        "limit_key": key,
+                        "window_index": window_index,
+                        "previous_weight": 1 - elapsed / window_seconds,
+                        "limit": limit,
+                    },
+                ).first()
+                session.commit()
+                if admitted:
+                    return 0.0, None
+                row = session.execute(_GET_COUNTS, {"limit_key": key}).first()
+                if row is None:
+                    return window_seconds, None
+                previous, current = row.previous_count, row.current_count
+                if row.window_index < window_index:
+                    previous = current if row.window_index == window_index - 1 else 0
+                    current = 0
+                return sliding_window_retry_after(
+                    limit, window_seconds, previous, current, elapsed
+                ), None
+        except Exception as e:
+            logger.error(
+                f"Database error while counting rate limit hit: {str(e)}",
+                exc_info=True,
+            )
+            return 0.0, self._database_error(e)
+
+    def purge_stale(self, window_seconds: float) -> tuple[int, Error | None]:
+        """Delete keys whose counters no longer contribute to any window."""
+        try:
+            with self.session_factory() as session:
+                result = session.execute(
+                    _PURGE,
+                    {"before_window": int(time.time() // window_seconds) - 1},
+                )
+                session.commit()
+                return result.rowcount, None
+        except Exception as e:
+            logger.error(
+                f"Database error while purging rate limits: {str(e)}",
+                exc_info=True,
+            )
+            return 0, self._database_error(e)
@@ -0,0 +1,201 @@
+import logging
+import uuid
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy import (
+    Interval,
+    LargeBinary,
+    bindparam,
+    delete,
+    insert,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+from sqlmodel import func
+
+from app.core.ecode import Error
+from app.model import RefreshTokenModel, UserModel
+from app.repository.base_repository import BaseRepository
+from app.repository.user_records import RefreshTokenOwner
+
+logger = logging.getLogger(__name__)
+
+_tokens = RefreshTokenModel.__table__
+_users = UserModel.__table__
+
+_INSERT_TOKEN = insert(_tokens).values(
+    token_hash=bindparam("token_hash"),
+    family_id=bindparam("family_id"),
+    user_id=bindparam("user_id"),
+    expires_at=func.now() + bindparam("ttl", type_=Interval),
+)
+
+# Rotation in one statement (primary-key lookup, insert, join for the
+# subject): mark the presented token used if it is still live, issue its
+# successor in the same family and return the owner. No row means the
+# token was unknown, expired, revoked or already used. Bind names in the
+# UPDATEs must not match column names, or they are taken as SET values.
+_used = (
+    update(_tokens)
+    .where(
+        _tokens.c.token_hash == bindparam("presented_hash"),
+        _tokens.c.used_at.is_(None),
+        _tokens.c.revoked_at.is_(None),
+        _tokens.c.expires_at > func.now(),
+    )
+    .values(used_at=func.now())
+    .returning(_tokens.c.family_id, _tokens.c.user_id)
+    .cte("used")
+)
+_issued = (
+    insert(_tokens)
+    .from_select(
+        ["token_hash", "family_id", "user_id", "expires_at"],
+        select(
+            bindparam("new_token_hash", type_=LargeBinary),
+            _used.c.family_id,
+            _used.c.user_id,
+            func.now() + bindparam("ttl", type_=Interval),
+        ),
+    )
+    .returning(_tokens.c.user_id)
+    .cte("issued")
+)
+_ROTATE_TOKEN = select(_issued.c.user_id, _users.c.email).join(
+    _users, _users.c.id == _issued.c.user_id
+)
+
+_GET_TOKEN_STATE = select(
+    _tokens.c.family_id,
+    _tokens.c.used_at.is_not(None).label("used"),
+    _tokens.c.revoked_at.is_not(None).label("revoked"),
+    (_tokens.c.expires_at <= func.now()).label("expired"),
+).where(_tokens.c.token_hash == bindparam("token_hash"))
+
+_REVOKE_FAMILY = (
+    update(_tokens)
+    .where(
+        _tokens.c.family_id == bindparam("revoked_family"),
+        _tokens.c.revoked_at.is_(None),
+    )
+    .values(revoked_at=func.now())
+    .returning(literal_column("1"))
+)
+
+
+class RefreshTokenRepository(BaseRepository):
+    def __init__(
+        self, session_factory: Callable[..., AbstractContextManager[Session]]
+    ) -> None:
+        super().__init__(session_factory, RefreshTokenModel)
+        logger.info("RefreshTokenRepository initialized")
+
+    def create(
+        self,
+        token_hash: bytes,
+        family_id: uuid.UUID,
+        user_id: uuid.UUID,
+        ttl_seconds: int,
+    ) -> Error | None:
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    _INSERT_TOKEN,
+                    {
+                        "token_hash": token_hash,
+                        "family_id": family_id,
+                        "user_id": user_id,
+                        "ttl": timedelta(seconds=ttl_seconds),
+                    },
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while storing refresh token for user {user_id}: {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def rotate(
+        self, token_hash: bytes, new_token_hash: bytes, ttl_seconds: int
+    ) -> tuple[RefreshTokenOwner | None, Error | None]:
+        """Replace a live token by ``new_token_hash``.
+
+        Returns ``(None, None)`` when the token cannot be used; see
+        ``get_state`` for why.
+        """
+        try:
+            with self.session_factory() as session:
+                row = session.execute(
+                    _ROTATE_TOKEN,
+                    {
+                        "presented_hash": token_hash,
+                        "new_token_hash": new_token_hash,
+                        "ttl": timedelta(seconds=ttl_seconds),
+                    },
+                ).first()
+                session.commit()
+                return (RefreshTokenOwner(*row) if row else None), None
+        except Exception as e:
+            logger.error(
+                f"Database error while rotating refresh token: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def get_state(self, token_hash: bytes) -> tuple[dict | None, Error | None]:
+        """``family_id`` and the ``used``/``revoked``/``expired`` flags, or None."""
+        try:
+            with self.session_factory() as session:
+                row = (
+                    session.execute(_GET_TOKEN_STATE, {"token_hash": token_hash})
+                    .mappings()
+                    .first()
+                )
+                return (dict(row) if row else None), None
+        except Exception as e:
+            logger.error(
+                f"Database error while reading refresh token: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def revoke_family(self, family_id: uuid.UUID) -> tuple[int, Error | None]:
+        try:
+            with self.session_factory() as session:
+                revoked = len(
+                    session.execute(_REVOKE_FAMILY, {"revoked_family": family_id}).all()
+                )
+                session.commit()
+                return revoked, None
+        except Exception as e:
+            logger.error(
+                f"Database error while revoking refresh tokens of family {family_id}: {str(e)}",
+                exc_info=True,
+            )
+            return 0, self._database_error(e)
+
+    def purge_expired(self, limit: int) -> tuple[int, Error | None]:
+        try:
+            with self.session_factory() as session:
+                expired = (
+                    select(self.model.token_hash)
+                    .where(self.model.expires_at < func.now())
+                    .limit(limit)
+                )
+                result = session.execute(
+                    delete(self.model).where(self.model.token_hash.in_(expired))
+                )
+                session.commit()
+                return result.rowcount, None
+        except Exception as e:
+            logger.error(
+                f"Database error while purging refresh tokens: {str(e)}",
+                exc_info=True,
+            )
+            return 0, self._database_error(e)
@@ -0,0 +1,205 @@
+import logging
+import re
+from contextlib import AbstractContextManager
+from datetime import date
+from typing import Callable
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.ecode import Error
+from app.model import FaceRetentionCheckpointModel, UserFaceModel
+from app.model.user_face_model import (
+    LOGIN_MONTH_PARTITION_PREFIX,
+    LOGIN_PARTITION,
+    add_months,
+    login_partition_ddl,
+)
+from app.repository.base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME_RE = re.compile(rf"^{LOGIN_MONTH_PARTITION_PREFIX}\d{{6}}$")
+
+
+def _checked_name(name: str) -> str:
+    # Partition names are interpolated into DDL, so only accept our own format.
+    if not _PARTITION_NAME_RE.match(name):
+        raise ValueError(f"Not a login face partition: {name!r}")
+    return name
+
+
+class UserFacePartitionRepository(BaseRepository):
+    """Manages the monthly login partitions of ``tb_user_faces``."""
+
+    def __init__(
+        self, session_factory: Callable[..., AbstractContextManager[Session]]
+    ) -> None:
+        super().__init__(session_factory, UserFaceModel)
+        logger.info("UserFacePartitionRepository initialized")
+
+    def ensure_login_partitions(self, start: date, months: int) -> Error | None:
+        """Create the monthly login partitions from ``start`` for ``months`` months."""
+        try:
+            with self.session_factory() as session:
+                partitioned = session.execute(
+                    text("SELECT to_regclass(:name) IS NOT NULL"),
+                    {"name": LOGIN_PARTITION},
+                ).scalar()
+                if not partitioned:
+                    logger.warning(
+                        "tb_user_faces is not partitioned yet; run migrations first"
+                    )
+                    return None
+                for offset in range(months):
+                    session.execute(
+                        text(login_partition_ddl(add_months(start, offset)))
+                    )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while creating login face partitions: {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def list_login_partitions(
+        self, attached: bool
+    ) -> tuple[list[str] | None, Error | None]:
+        """List monthly login partitions, either attached or already detached."""
+        try:
+            with self.session_factory() as session:
+                names = session.execute(
+                    text(
+                        "SELECT relname FROM pg_class "
+                        "WHERE relkind = 'r' AND relname LIKE :pattern "
+                        "AND relispartition = :attached "
+                        "ORDER BY relname"
+                    ),
+                    {
+                        "pattern": f"{LOGIN_MONTH_PARTITION_PREFIX}%",
+                        "attached": attached,
+                    },
+                ).scalars()
+                return [name for name in names if _PARTITION_NAME_RE.match(name)], None
+        except Exception as e:
+            logger.error(
+                f"Database error while listing login face partitions: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def detach_login_partition(self, name: str) -> Error | None:
+        logger.info(f"Detaching login face partition {name}")
+        try:
+            with self.session_factory() as session:
+                # DETACH needs an exclusive lock on the parent; don't queue behind
+                # long-running queries and block inserts meanwhile.
+                session.execute(text("SET LOCAL lock_timeout = '5s'"))
+                session.execute(
+                    text(
+                        f"ALTER TABLE {LOGIN_PARTITION} "
+                        f"DETACH PARTITION {_checked_name(name)}"
+                    )
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while detaching partition {name}: {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def fetch_source_images(
+        self, name: str, after_id: int, limit: int
+    ) -> tuple[list | None, Error | None]:
+        """Read ``(id, source_images)`` rows of a detached partition in id order."""
+        try:
+            with self.session_factory() as session:
+                rows = session.execute(
+                    text(
+                        f"SELECT id, source_images FROM {_checked_name(name)} "
+                        "WHERE id > :after_id ORDER BY id LIMIT :limit"
+                    ),
+                    {"after_id": after_id, "limit": limit},
+                ).all()
+                return rows, None
+        except Exception as e:
+            logger.error(
+                f"Database error while reading partition {name}: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def get_checkpoint(
+        self, name: str
+    ) -> tuple[FaceRetentionCheckpointModel | None, Error | None]:
+        try:
+            with self.session_factory() as session:
+                checkpoint = session.execute(
+                    select(FaceRetentionCheckpointModel).where(
+                        FaceRetentionCheckpointModel.partition_name == name
+                    )
+                ).scalar_one_or_none()
+                if checkpoint is not None:
+                    session.expunge(checkpoint)
+                return checkpoint, None
+        except Exception as e:
+            logger.error(
+                f"Database error while reading checkpoint for {name}: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def save_checkpoint(
+        self, name: str, last_id: int, objects_deleted: int
+    ) -> Error | None:
+        try:
+            with self.session_factory() as session:
+                stmt = pg_insert(FaceRetentionCheckpointModel).values(
+                    partition_name=name,
+                    last_id=last_id,
+                    objects_deleted=objects_deleted,
+                )
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[FaceRetentionCheckpointModel.partition_name],
+                        set_={
+                            "last_id": stmt.excluded.last_id,
+                            "objects_deleted": stmt.excluded.objects_deleted,
+                            "updated_at": text("now()"),
+                        },
+                    )
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while saving checkpoint for {name}: {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
+
+    def drop_detached_partition(self, name: str) -> Error | None:
+        logger.info(f"Dropping detached login face partition {name}")
+        try:
+            with self.session_factory() as session:
+                session.execute(text(f"DROP TABLE IF EXISTS {_checked_name(name)}"))
+                session.execute(
+                    text(
+                        "DELETE FROM tb_face_retention_checkpoints "
+                        "WHERE partition_name = :name"
+                    ),
+                    {"name": name},
+                )
+                session.commit()
+                return None
+        except Exception as e:
+            logger.error(
+                f"Database error while dropping partition {name}: {str(e)}",
+                exc_info=True,
+            )
+            return self._database_error(e)
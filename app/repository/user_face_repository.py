@@ -1,23 +1,89 @@
 import logging
 import uuid
 from contextlib import AbstractContextManager
-from typing import Callable
+from datetime import datetime
+from typing import Callable, Iterator, Optional
 
+from sqlalchemy import (
+    ARRAY,
+    DateTime,
+    Text,
+    Uuid,
+    bindparam,
+    column,
+    insert,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlmodel import func
 
 from app.core.ecode import Error
-from app.core.exceptions import ErrDatabaseError
 from app.model import UserFaceModel
+from app.model.user_face_model import (
+    ENROLLMENT_PARTITION,
+    ENROLLMENT_POSES,
+    LOGIN_POSE,
+)
 from app.repository.base_repository import BaseRepository
 
 logger = logging.getLogger(__name__)
 
+_REFERENCED_URLS = text(
+    'SELECT DISTINCT url COLLATE "C" AS url '
+    "FROM (SELECT unnest(source_images) AS url FROM tb_user_faces) AS refs "
+    "WHERE starts_with(url, :url_prefix) "
+    "ORDER BY 1"
+)
+
+_faces = UserFaceModel.__table__
+
+# Core DML: writes skip the ORM unit of work and reuse cached compilations.
+_INSERT_FACES = insert(_faces)
+
+# Enrollment poses are replaced in place. The unique (user_id, pose) index
+# lives on the enrollment partition (a unique index on tb_user_faces would
+# have to include the login partitions' created_at key), so the upsert
+# targets that partition directly.
+_enrollment = table(
+    ENROLLMENT_PARTITION,
+    column("user_id", Uuid),
+    column("pose", Text),
+    column("source_images", ARRAY(Text)),
+    column("updated_at", DateTime(timezone=True)),
+)
+_LOCK_ENROLLMENT_FACES = (
+    select(_faces.c.pose, _faces.c.source_images)
+    .where(
+        _faces.c.user_id == bindparam("user_id"),
+        _faces.c.pose.in_(ENROLLMENT_POSES),
+    )
+    .with_for_update()
+)
+_upsert = pg_insert(_enrollment)
+_UPSERT_ENROLLMENT_FACES = _upsert.on_conflict_do_update(
+    index_elements=[_enrollment.c.user_id, _enrollment.c.pose],
+    set_={
+        "source_images": _upsert.excluded.source_images,
+        "updated_at": func.now(),
+    },
+)
+
+# Keyset order; matches ix_tb_user_faces_user_pose_created_id (scanned backwards).
+_HISTORY_KEY = (UserFaceModel.pose, UserFaceModel.created_at, UserFaceModel.id)
+
 
 class UserFaceRepository(BaseRepository):
     def __init__(
-        self, session_factory: Callable[..., AbstractContextManager[Session]]
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Callable[..., AbstractContextManager[Session]]
+        | None = None,
     ) -> None:
-        super().__init__(session_factory, UserFaceModel)
+        super().__init__(session_factory, UserFaceModel, read_session_factory)
         logger.info("UserFaceRepository initialized")
 
     def save_ekyc_faces(
@@ -26,37 +92,45 @@ class UserFaceRepository(BaseRepository):
         left_face_urls: list[str],
         right_face_urls: list[str],
         front_face_urls: list[str],
-    ) -> Error | None:
+    ) -> tuple[dict[str, list[str]] | None, Error | None]:
+        """Replace the user's enrollment poses.
+
+        Returns the ``source_images`` each replaced pose held before, so
+        their objects can be deleted. The rows are locked while they are
+        read, so a concurrent re-upload cannot report the same images.
+        """
         logger.info(f"Saving eKYC face upload info for user_id: {user_id}")
         try:
             with self.session_factory() as session:
-                session.query(UserFaceModel).filter(
-                    UserFaceModel.user_id == user_id,
-                    UserFaceModel.pose.in_(["left", "right", "straight"]),
-                ).delete(synchronize_session=False)
-
-                session.add_all(
+                previous = {
+                    pose: list(source_images or [])
+                    for pose, source_images in session.execute(
+                        _LOCK_ENROLLMENT_FACES, {"user_id": user_id}
+                    )
+                }
+                session.execute(
+                    _UPSERT_ENROLLMENT_FACES,
                     [
-                        UserFaceModel(user_id=user_id, pose=pose, source_images=urls)
+                        {"user_id": user_id, "pose": pose, "source_images": urls}
                         for pose, urls in [
                             ("left", left_face_urls),
                             ("right", right_face_urls),
                             ("straight", front_face_urls),
                         ]
-                    ]
+                    ],
                 )
-
                 session.commit()
+                self._mark_written(session, str(user_id))
                 logger.info(
                     f"Saved eKYC face upload info successfully for user_id: {user_id}"
                 )
-                return None
+                return previous, None
         except Exception as e:
             logger.error(
                 f"Database error while saving eKYC faces for user_id '{user_id}': {str(e)}",
                 exc_info=True,
             )
-            return Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+            return None, self._database_error(e)
 
     def save_login_faces(
         self, user_id: uuid.UUID, face_urls: list[str]
@@ -64,12 +138,16 @@ class UserFaceRepository(BaseRepository):
         logger.info(f"Saving login faces for user_id: {user_id}")
         try:
             with self.session_factory() as session:
-                session.add(
-                    UserFaceModel(
-                        user_id=user_id, pose="login", source_images=face_urls
-                    )
+                session.execute(
+                    _INSERT_FACES,
+                    {
+                        "user_id": user_id,
+                        "pose": LOGIN_POSE,
+                        "source_images": face_urls,
+                    },
                 )
                 session.commit()
+                self._mark_written(session, str(user_id))
                 logger.info(f"Saved login faces successfully for user_id: {user_id}")
                 return None
         except Exception as e:
@@ -77,4 +155,67 @@ class UserFaceRepository(BaseRepository):
                 f"Database error while saving login faces for user_id '{user_id}': {str(e)}",
                 exc_info=True,
             )
-            return Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+            return self._database_error(e)
+
+    def list_faces(
+        self,
+        user_id: uuid.UUID,
+        limit: int,
+        pose: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        after: Optional[tuple[str, datetime, int]] = None,
+    ) -> tuple[list | None, Error | None]:
+        """Page through a user's face rows, newest first within each pose.
+
+        ``after`` is the ``(pose, created_at, id)`` key of the last row of the
+        previous page. Only the columns served by the history API are selected,
+        so the covering index answers the query without heap lookups.
+        """
+        logger.debug(f"Listing faces for user_id: {user_id}")
+        stmt = select(
+            UserFaceModel.id,
+            UserFaceModel.pose,
+            UserFaceModel.source_images,
+            UserFaceModel.created_at,
+        ).where(UserFaceModel.user_id == user_id)
+        if pose is not None:
+            stmt = stmt.where(UserFaceModel.pose == pose)
+        if created_from is not None:
+            stmt = stmt.where(UserFaceModel.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(UserFaceModel.created_at < created_to)
+        if after is not None:
+            stmt = stmt.where(tuple_(*_HISTORY_KEY) < tuple_(*after))
+        stmt = stmt.order_by(*(column.desc() for column in _HISTORY_KEY)).limit(limit)
+
+        try:
+            with self.read_session_factory(str(user_id)) as session:
+                rows = session.execute(stmt).mappings().all()
+                return rows, None
+        except Exception as e:
+            logger.error(
+                f"Database error while listing faces for user_id '{user_id}': {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def iter_referenced_urls(
+        self, url_prefix: str, batch_size: int = 1000
+    ) -> Iterator[str]:
+        """Yield distinct ``source_images`` URLs under ``url_prefix`` in byte order.
+
+        Rows are streamed through a server-side cursor so memory stays bounded
+        however many faces are stored. Unlike the other methods, database
+        errors are raised to the consumer of the iterator.
+        """
+        with self.session_factory() as session:
+            # The sort runs once up front; don't let the 30s default cut it off.
+            session.execute(text("SET LOCAL statement_timeout = 0"))
+            result = session.execute(
+                _REFERENCED_URLS.execution_options(
+                    stream_results=True, yield_per=batch_size
+                ),
+                {"url_prefix": url_prefix},
+            )
+            yield from result.scalars()
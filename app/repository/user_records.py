@@ -0,0 +1,32 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+# Plain rows returned by the hot UserRepository lookups instead of ORM
+# entities. Field order matches the selected columns, so rows map
+# positionally (``UserProfile(*row)``).
+
+
+@dataclass(frozen=True, slots=True)
+class UserCredentials:
+    id: uuid.UUID
+    email: Optional[str]
+    password_hashed: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class UserProfile:
+    id: uuid.UUID
+    email: Optional[str]
+    phone_number: Optional[str]
+    full_name: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class RefreshTokenOwner:
+    user_id: uuid.UUID
+    email: Optional[str]
@@ -1,46 +1,168 @@
+import csv
+import io
 import logging
 import uuid
 from contextlib import AbstractContextManager
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
+from sqlalchemy import String, any_, bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.ecode import Error
-from app.core.exceptions import ErrDatabaseError, ErrUserNotFound, ErrUserAlreadyExists
+from app.core.exceptions import ErrUserNotFound, ErrUserAlreadyExists
 from app.model import UserModel
 from app.repository.base_repository import BaseRepository
+from app.repository.user_records import UserCredentials, UserProfile
+from app.util.email_address import normalize_email
 
 logger = logging.getLogger(__name__)
 
+# Hot paths run these prebuilt Core statements against the table rather
+# than ORM queries: no entity construction or identity map, and SQLAlchemy
+# compiles each one once per engine and reuses it from the compiled cache.
+_users = UserModel.__table__
+
+# Columns exposed by GetUserResponse, in UserProfile field order.
+_PROFILE_COLUMNS = (
+    _users.c.id,
+    _users.c.email,
+    _users.c.phone_number,
+    _users.c.full_name,
+    _users.c.created_at,
+    _users.c.updated_at,
+)
+# Emails are matched on lower(email) (ux_tb_users_email_lower) with
+# normalized parameters, so rows stored before normalization still match.
+_EMAIL_KEY = func.lower(_users.c.email)
+_GET_PROFILE_BY_EMAIL = select(*_PROFILE_COLUMNS).where(
+    _EMAIL_KEY == bindparam("email")
+)
+_GET_CREDENTIALS_BY_EMAIL = select(
+    _users.c.id, _users.c.email, _users.c.password_hashed
+).where(_EMAIL_KEY == bindparam("email"))
+_GET_MANY_BY_EMAILS = select(*_PROFILE_COLUMNS).where(
+    _EMAIL_KEY == any_(bindparam("keys", type_=ARRAY(String)))
+)
+_GET_MANY_BY_IDS = select(*_PROFILE_COLUMNS).where(
+    _users.c.id == any_(bindparam("keys", type_=ARRAY(UUID(as_uuid=True))))
+)
+_MARK_EKYC_UPLOADED = (
+    update(_users)
+    .where(_users.c.id == bindparam("user_id"))
+    .values(is_ekyc_uploaded=True)
+    .returning(_users.c.email)
+)
+
+# One backfill batch: the next ``batch_size`` ids after ``after_id``, of
+# which the mixed-case ones not locked by a request are lower-cased unless
+# that would collide with another user's email.
+_NORMALIZE_EMAILS_BATCH = text(
+    "WITH batch AS ("
+    " SELECT id FROM tb_users"
+    " WHERE id > coalesce(CAST(:after_id AS uuid), '00000000-0000-0000-0000-000000000000')"
+    " ORDER BY id LIMIT :batch_size), "
+    "targets AS ("
+    " SELECT u.id FROM tb_users AS u JOIN batch USING (id)"
+    " WHERE u.email <> lower(u.email)"
+    " FOR UPDATE OF u SKIP LOCKED), "
+    "updated AS ("
+    " UPDATE tb_users AS u SET email = lower(u.email) FROM targets"
+    " WHERE u.id = targets.id AND NOT EXISTS ("
+    "  SELECT 1 FROM tb_users AS other"
+    "  WHERE lower(other.email) = lower(u.email) AND other.id <> u.id)"
+    " RETURNING u.id) "
+    "SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1), "
+    "(SELECT count(*) FROM updated)"
+)
+_CASE_DUPLICATES = text(
+    "SELECT lower(email) AS email, array_agg(id ORDER BY created_at) AS user_ids "
+    "FROM tb_users WHERE email IS NOT NULL "
+    "GROUP BY lower(email) HAVING count(*) > 1 "
+    "ORDER BY 1 LIMIT :limit"
+)
+
 
 class UserRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]]):
-        self.session_factory = session_factory
-        super().__init__(session_factory, UserModel)
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Callable[..., AbstractContextManager[Session]]
+        | None = None,
+    ):
+        super().__init__(session_factory, UserModel, read_session_factory)
         logger.info("UserRepository initialized")
 
-    def get_by_email(self, email: str) -> tuple[UserModel | None, Error | None]:
+    def get_by_email(self, email: str) -> tuple[UserProfile | None, Error | None]:
         logger.debug(f"Querying database for user with email: {email}")
+        return self._get_one(_GET_PROFILE_BY_EMAIL, UserProfile, normalize_email(email))
+
+    def get_credentials_by_email(
+        self, email: str
+    ) -> tuple[UserCredentials | None, Error | None]:
+        """Fetch only what login needs: ``id``, ``email`` and ``password_hashed``."""
+        logger.debug(f"Querying credentials for user with email: {email}")
+        return self._get_one(
+            _GET_CREDENTIALS_BY_EMAIL, UserCredentials, normalize_email(email)
+        )
+
+    def _get_one(self, statement, record, email: str):
         try:
-            with self.session_factory() as session:
-                user = (
-                    session.query(self.model).filter(self.model.email == email).first()
+            with self.read_session_factory(email) as session:
+                row = session.execute(statement, {"email": email}).first()
+                recheck = row is None and self._from_replica(session)
+            if recheck:
+                # The user may have signed up through another worker and the
+                # replica not replayed it yet; only the primary can say no.
+                with self.session_factory() as session:
+                    row = session.execute(statement, {"email": email}).first()
+            if row is None:
+                logger.warning(f"User not found: {email}")
+                return None, Error(
+                    ErrUserNotFound.code,
+                    f"User with email '{email}' not found",
                 )
-                if user is None:
-                    logger.warning(f"User not found: {email}")
-                    return None, Error(
-                        ErrUserNotFound.code,
-                        f"User with email '{email}' not found",
-                    )
-                logger.info(f"User found in database: {email}")
-                return user, None
+            logger.info(f"User found in database: {email}")
+            return record(*row), None
         except Exception as e:
             logger.error(
                 f"Database error while querying user '{email}': {str(e)}",
                 exc_info=True,
             )
-            return None, Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+            return None, self._database_error(e)
+
+    def get_many_by_emails(self, emails: list[str]) -> tuple[list | None, Error | None]:
+        """Fetch profile rows for ``emails`` with a single ``= ANY(:keys)`` query."""
+        emails = [normalize_email(email) for email in emails]
+        return self._get_many(_GET_MANY_BY_EMAILS, emails, emails)
+
+    def get_many_by_ids(
+        self, user_ids: list[uuid.UUID]
+    ) -> tuple[list | None, Error | None]:
+        """Fetch profile rows for ``user_ids`` with a single ``= ANY(:keys)`` query."""
+        return self._get_many(_GET_MANY_BY_IDS, user_ids, map(str, user_ids))
+
+    def _get_many(
+        self, statement, keys: list, consistency_keys: Iterable[str]
+    ) -> tuple[list | None, Error | None]:
+        logger.debug(f"Batch querying {len(keys)} users")
+        try:
+            with self.read_session_factory(*consistency_keys) as session:
+                rows = session.execute(statement, {"keys": keys}).mappings().all()
+                recheck = len(rows) < len(set(keys)) and self._from_replica(session)
+            if recheck:
+                # Same as _get_one: misses on a replica are confirmed on the primary.
+                with self.session_factory() as session:
+                    rows = session.execute(statement, {"keys": keys}).mappings().all()
+            logger.info(f"Batch lookup matched {len(rows)}/{len(keys)} users")
+            return rows, None
+        except Exception as e:
+            logger.error(
+                f"Database error while batch querying {len(keys)} users: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
 
     def create(
         self,
@@ -49,6 +171,7 @@ class UserRepository(BaseRepository):
         full_name: Optional[str] = None,
         phone_number: Optional[str] = None,
     ) -> tuple[UserModel | None, Error | None]:
+        email = normalize_email(email)
         logger.debug(f"Creating user: {email}")
         try:
             with self.session_factory() as session:
@@ -61,6 +184,7 @@ class UserRepository(BaseRepository):
                     )
                     session.add(user)
                     session.commit()
+                    self._mark_written(session, email)
                     session.refresh(user)
                     logger.info(f"User created: {email}")
                     return user, None
@@ -76,23 +200,22 @@ class UserRepository(BaseRepository):
                 f"Database error while creating user '{email}': {str(e)}",
                 exc_info=True,
             )
-            return None, Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+            return None, self._database_error(e)
 
     def mark_ekyc_uploaded(self, user_id: uuid.UUID) -> Error | None:
         logger.info(f"Marking eKYC as uploaded for user_id: {user_id}")
         try:
             with self.session_factory() as session:
-                updated = (
-                    session.query(self.model)
-                    .filter(self.model.id == user_id)
-                    .update({"is_ekyc_uploaded": True})
-                )
-                if updated == 0:
+                email = session.execute(
+                    _MARK_EKYC_UPLOADED, {"user_id": user_id}
+                ).scalar_one_or_none()
+                if email is None:
                     logger.warning(
                         f"User not found while marking eKYC uploaded: {user_id}"
                     )
                     return Error(ErrUserNotFound.code, f"User '{user_id}' not found")
                 session.commit()
+                self._mark_written(session, normalize_email(email), str(user_id))
                 logger.info(f"Marked eKYC as uploaded for user_id: {user_id}")
                 return None
         except Exception as e:
@@ -100,4 +223,110 @@ class UserRepository(BaseRepository):
                 f"Database error while marking eKYC uploaded for '{user_id}': {str(e)}",
                 exc_info=True,
             )
-            return Error(ErrDatabaseError.code, f"Database error: {str(e)}")
+            return self._database_error(e)
+
+    def bulk_insert(self, rows: list[dict]) -> tuple[set[str] | None, Error | None]:
+        """COPY ``rows`` into a staging table and merge them into ``tb_users``.
+
+        Rows whose email or phone number already exists (in the table or earlier
+        in the batch) are skipped. Returns the emails that were inserted.
+        """
+        logger.debug(f"Bulk inserting {len(rows)} users")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(
+                (
+                    row["line_no"],
+                    row["email"],
+                    row.get("phone_number"),
+                    row.get("full_name"),
+                    row["password_hashed"],
+                )
+            )
+        buffer.seek(0)
+
+        try:
+            with self.session_factory() as session:
+                cursor = session.connection().connection.cursor()
+                cursor.execute(
+                    """
+                    CREATE TEMP TABLE tb_users_import_stage (
+                        line_no bigint,
+                        email text,
+                        phone_number text,
+                        full_name text,
+                        password_hashed text
+                    ) ON COMMIT DROP
+                    """
+                )
+                cursor.copy_expert(
+                    "COPY tb_users_import_stage "
+                    "(line_no, email, phone_number, full_name, password_hashed) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+                cursor.execute(
+                    """
+                    INSERT INTO tb_users
+                        (email, phone_number, full_name, password_hashed, is_ekyc_uploaded)
+                    SELECT DISTINCT ON (lower(email))
+                        lower(email), phone_number, full_name, password_hashed, false
+                    FROM tb_users_import_stage
+                    ORDER BY lower(email), line_no
+                    ON CONFLICT DO NOTHING
+                    RETURNING email
+                    """
+                )
+                inserted = {email for (email,) in cursor.fetchall()}
+                session.commit()
+                logger.info(f"Bulk inserted {len(inserted)}/{len(rows)} users")
+                return inserted, None
+        except Exception as e:
+            logger.error(
+                f"Database error while bulk inserting {len(rows)} users: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def normalize_emails_batch(
+        self, after_id: uuid.UUID | None, batch_size: int
+    ) -> tuple[tuple[int, uuid.UUID | None] | None, Error | None]:
+        """Lower-case up to ``batch_size`` stored emails after ``after_id``.
+
+        Walks the primary key so each batch is one short transaction that
+        locks only the rows it rewrites (rows locked by a request are
+        skipped and picked up by the next run). Rows whose lower-cased
+        email belongs to another user are left alone; see
+        ``find_case_duplicates``. Returns ``(updated, last_id)``;
+        ``last_id`` is ``None`` once the table has been walked.
+        """
+        try:
+            with self.session_factory() as session:
+                last_id, updated = session.execute(
+                    _NORMALIZE_EMAILS_BATCH,
+                    {"after_id": after_id, "batch_size": batch_size},
+                ).one()
+                session.commit()
+                return (updated, last_id), None
+        except Exception as e:
+            logger.error(
+                f"Database error while normalizing emails after {after_id}: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
+
+    def find_case_duplicates(self, limit: int) -> tuple[list | None, Error | None]:
+        """Emails stored in several letter cases, with the ids sharing each."""
+        try:
+            with self.session_factory() as session:
+                rows = (
+                    session.execute(_CASE_DUPLICATES, {"limit": limit}).mappings().all()
+                )
+                return rows, None
+        except Exception as e:
+            logger.error(
+                f"Database error while listing duplicate emails: {str(e)}",
+                exc_info=True,
+            )
+            return None, self._database_error(e)
@@ -2,3 +2,6 @@ from app.service.user.user_service import UserService as UserService
 from app.service.base.base_service import BaseService as BaseService
 from app.service.ekyc.ekyc_service import EkycService as EkycService
 from app.service.pubsub.pubsub_service import PubsubService as PubsubService
+from app.service.idempotency.idempotency_service import (
+    IdempotencyService as IdempotencyService,
+)
@@ -5,3 +5,14 @@ from app.service.ekyc.ekyc_service_login_result import (
 from app.service.ekyc.ekyc_service_upload_result import (
     EkycServiceUploadResult as EkycServiceUploadResult,
 )
+from app.service.ekyc.ekyc_service_face_history_result import (
+    EkycServiceFaceHistoryResult as EkycServiceFaceHistoryResult,
+)
+from app.service.ekyc.face_quality_checker import (
+    FaceQualityChecker as FaceQualityChecker,
+)
+from app.service.ekyc.session_event_hub import (
+    InMemorySessionSource as InMemorySessionSource,
+    RtdbSessionSource as RtdbSessionSource,
+    SessionEventHub as SessionEventHub,
+)
@@ -1,47 +1,55 @@
 import asyncio
+import base64
+import binascii
+import hashlib
+import json
 import logging
 import mimetypes
 import time
 import uuid
+from dataclasses import asdict
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-import firebase_admin
-from firebase_admin import credentials, db, storage
+from firebase_admin import db
 from fastapi import UploadFile
-from fastapi.concurrency import run_in_threadpool
 
+from app.core.circuit_breaker import CircuitOpenError, breakers
 from app.core.config import configs
+from app.core.constants import CircuitState, UploadPriority
 from app.core.ecode import Error
-from app.core.exceptions import ErrInternalError
+from app.core.executors import ExecutorRejectedError, executors
+from app.core.exceptions import (
+    ErrInternalError,
+    ErrInvalidCursor,
+    ErrStorageUnavailable,
+)
+from app.core.firebase import get_bucket, get_firebase_app
+from app.service.ekyc.face_quality_checker import FaceQualityChecker
+from app.service.ekyc.ekyc_service_face_history_result import (
+    EkycServiceFaceHistoryResult,
+)
 from app.service.ekyc.ekyc_service_login_result import EkycServiceLoginResult
 from app.service.ekyc.ekyc_service_upload_result import EkycServiceUploadResult
 from app.repository import UserFaceRepository, UserRepository
 from app.service.base.base_service import BaseService
+from app.service.idempotency.idempotency_service import IdempotencyService
 from app.service.pubsub.pubsub_service import PubsubService
+from app.service.storage.hedged_uploader import HedgedUploader, UploadedObject
+from app.service.storage.object_storage import ObjectStorage
+from app.service.storage.upload_scheduler import UploadScheduler
 
 logger = logging.getLogger(__name__)
 
-_firebase_app: firebase_admin.App | None = None
-
-
-def _get_firebase_app() -> firebase_admin.App:
-    global _firebase_app
-    if _firebase_app is None:
-        cred_path = Path(configs.FIREBASE_CREDENTIALS_PATH)
-        if not cred_path.is_absolute():
-            # Resolve relative path from project root (3 levels up from this file)
-            cred_path = Path(__file__).resolve().parents[3] / cred_path
-        cred = credentials.Certificate(str(cred_path))
-        _firebase_app = firebase_admin.initialize_app(
-            cred,
-            {
-                "storageBucket": configs.GCS_BUCKET_NAME,
-                "databaseURL": configs.FIREBASE_RTDB_URL,
-            },
-        )
-        logger.info("Firebase Admin app initialized")
-    return _firebase_app
+
+def _sha256_files(files: list) -> list[str]:
+    digests = []
+    for file in files:
+        file.seek(0)
+        digests.append(hashlib.file_digest(file, "sha256").hexdigest())
+        file.seek(0)
+    return digests
 
 
 class EkycService(BaseService):
@@ -50,35 +58,76 @@ class EkycService(BaseService):
         user_repository: UserRepository,
         user_face_repository: UserFaceRepository,
         pubsub_service: PubsubService,
+        idempotency_service: Optional[IdempotencyService] = None,
+        upload_scheduler: Optional[UploadScheduler] = None,
+        uploader: Optional[HedgedUploader] = None,
+        face_quality_checker: Optional[FaceQualityChecker] = None,
+        object_storage: Optional[ObjectStorage] = None,
     ) -> None:
         self._user_repository = user_repository
         self._user_face_repository = user_face_repository
         self._pubsub_service = pubsub_service
+        self._idempotency_service = idempotency_service
+        self._upload_scheduler = upload_scheduler or UploadScheduler()
+        self._uploader = uploader or HedgedUploader(self._upload_scheduler)
+        self._face_quality_checker = face_quality_checker
+        self._object_storage = object_storage
         super().__init__(user_repository)
-        self._bucket_name = configs.GCS_BUCKET_NAME
         self._upload_prefix = (configs.GCS_UPLOAD_PREFIX or "uploads").strip("/")
-        self._upload_max_concurrency = max(1, configs.FIREBASE_UPLOAD_MAX_CONCURRENCY)
         logger.info("EkycService initialized")
 
     def _get_bucket(self):
-        if not self._bucket_name:
-            raise ValueError("Firebase Storage bucket is not configured")
-        _get_firebase_app()
-        return storage.bucket()
+        return get_bucket()
 
     @staticmethod
     def _save_fcm_token(session_id: str, fcm_token: str) -> None:
-        """Save FCM registration token to Firebase Realtime Database."""
+        """Save FCM registration token to Firebase Realtime Database.
+
+        Best effort: skipped while the RTDB breaker is open.
+        """
         try:
-            _get_firebase_app()
+            get_firebase_app()
             ref = db.reference(f"/sessions/{session_id}")
-            ref.set({"fcm_token": fcm_token})
+            breakers.rtdb.call(ref.set, {"fcm_token": fcm_token})
             logger.info(f"Saved FCM token to RTDB for session: {session_id}")
+        except CircuitOpenError:
+            logger.warning(f"RTDB unavailable, skipped FCM token for {session_id}")
         except Exception as e:
             logger.error(
                 f"Failed to save FCM token to RTDB for session {session_id}: {e}"
             )
 
+    def _discard_superseded(self, previous_faces: dict[str, list[str]]) -> None:
+        """Queue deletion of the photos a re-upload replaced.
+
+        Best effort: objects left behind are removed by ``storage-gc``.
+        """
+        if self._object_storage is None:
+            return
+        names = [
+            name
+            for urls in previous_faces.values()
+            for url in urls
+            if (name := self._object_storage.object_name_from_url(url))
+        ]
+        if not names:
+            return
+        try:
+            executors.storage.submit(self._delete_superseded, names)
+        except ExecutorRejectedError:
+            logger.warning(f"Storage pool full, left {len(names)} replaced photos")
+
+    def _delete_superseded(self, names: list[str]) -> None:
+        try:
+            failed = self._object_storage.delete_objects(names)
+        except Exception as e:
+            logger.warning(f"Failed to delete {len(names)} replaced photos: {e}")
+            return
+        if failed:
+            logger.warning(f"Failed to delete {len(failed)} replaced photos")
+        else:
+            logger.info(f"Deleted {len(names)} replaced photos")
+
     @staticmethod
     def _resolve_extension(upload_file: UploadFile) -> str:
         suffix = Path(upload_file.filename or "").suffix.lower()
@@ -92,38 +141,79 @@ class EkycService(BaseService):
                 return guessed
         return ".jpg"
 
+    @staticmethod
+    async def _describe_files(files: List[UploadFile]) -> list[str]:
+        """Name and content digest of each upload, for idempotency fingerprints."""
+        digests = await executors.cpu.run(
+            _sha256_files, [upload_file.file for upload_file in files]
+        )
+        return [
+            f"{upload_file.filename}:{digest}"
+            for upload_file, digest in zip(files, digests)
+        ]
+
+    @staticmethod
+    async def _read_files(files: List[UploadFile]) -> list[bytes]:
+        # Read once so the precheck, retries and hedged copies share the bytes.
+        contents = []
+        for upload_file in files:
+            await upload_file.seek(0)
+            contents.append(await upload_file.read())
+            # The bytes are held in ``contents`` from here on; free the spool
+            # (memory or temporary file) instead of keeping a second copy.
+            upload_file.file.truncate(0)
+        return contents
+
+    async def _precheck(self, groups: list[tuple[str, list[bytes]]]) -> Error | None:
+        """Reject blurry, dark or undersized photos before anything is uploaded."""
+        if self._face_quality_checker is None:
+            return None
+        return await self._face_quality_checker.check(
+            [
+                (f"{face_prefix} {index}", data)
+                for face_prefix, contents in groups
+                for index, data in enumerate(contents, start=1)
+            ]
+        )
+
     async def _upload_group(
         self,
         *,
         bucket,
         session_id: str,
-        semaphore: asyncio.Semaphore,
+        priority: UploadPriority,
         face_prefix: str,
         files: List[UploadFile],
-    ) -> list[str]:
-        async def upload_one(index: int, upload_file: UploadFile) -> str:
+        contents: list[bytes],
+    ) -> list[UploadedObject]:
+        async def upload_one(
+            index: int, upload_file: UploadFile, data: bytes
+        ) -> UploadedObject:
             extension = self._resolve_extension(upload_file)
             base_path = (
                 f"{self._upload_prefix}/{session_id}"
                 if self._upload_prefix
                 else session_id
             )
-            object_name = (
-                f"{base_path}/{face_prefix}_{index}_{uuid.uuid4().hex}{extension}"
-            )
-            blob = bucket.blob(object_name)
-            async with semaphore:
-                await run_in_threadpool(
-                    blob.upload_from_file,
-                    upload_file.file,
-                    content_type=upload_file.content_type,
-                    rewind=True,
+
+            def object_name() -> str:
+                # Unique per call: retries and hedges never share a name.
+                return (
+                    f"{base_path}/{face_prefix}_{index}_{uuid.uuid4().hex}{extension}"
                 )
-            return blob.public_url
+
+            return await self._uploader.upload(
+                priority,
+                session_id,
+                bucket,
+                object_name,
+                data,
+                content_type=upload_file.content_type,
+            )
 
         tasks = [
-            upload_one(index, upload_file)
-            for index, upload_file in enumerate(files, start=1)
+            upload_one(index, upload_file, data)
+            for index, (upload_file, data) in enumerate(zip(files, contents), start=1)
         ]
         return list(await asyncio.gather(*tasks))
 
@@ -134,41 +224,88 @@ class EkycService(BaseService):
         right_faces: List[UploadFile],
         front_faces: List[UploadFile],
         fcm_token: str,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[EkycServiceUploadResult | None, Error | None]:
+        if idempotency_key is None or self._idempotency_service is None:
+            return await self._upload_photos(
+                user_email, left_faces, right_faces, front_faces, fcm_token
+            )
+
+        # Replays return the original session_id without re-uploading.
+        return await self._idempotency_service.run_async(
+            scope=f"ekyc.upload-photos:{user_email}",
+            key=idempotency_key,
+            fingerprint=IdempotencyService.fingerprint(
+                fcm_token,
+                *await self._describe_files(left_faces),
+                *await self._describe_files(right_faces),
+                *await self._describe_files(front_faces),
+            ),
+            operation=lambda: self._upload_photos(
+                user_email, left_faces, right_faces, front_faces, fcm_token
+            ),
+            encode=asdict,
+            decode=lambda data: EkycServiceUploadResult(**data),
+        )
+
+    async def _upload_photos(
+        self,
+        user_email: str,
+        left_faces: List[UploadFile],
+        right_faces: List[UploadFile],
+        front_faces: List[UploadFile],
+        fcm_token: str,
     ) -> tuple[EkycServiceUploadResult | None, Error | None]:
         logger.info(f"Uploading eKYC face photos for user: {user_email}")
+        if breakers.storage.state == CircuitState.OPEN:
+            return None, ErrStorageUnavailable
 
         try:
             started_at = time.perf_counter()
+            left_contents = await self._read_files(left_faces)
+            right_contents = await self._read_files(right_faces)
+            front_contents = await self._read_files(front_faces)
+            quality_error = await self._precheck(
+                [
+                    ("left_face", left_contents),
+                    ("right_face", right_contents),
+                    ("front_face", front_contents),
+                ]
+            )
+            if quality_error:
+                return None, quality_error
+
             session_id = str(uuid.uuid4())
 
             # Save FCM token to Firebase Realtime Database
-            await run_in_threadpool(self._save_fcm_token, session_id, fcm_token)
+            await executors.rtdb.run(self._save_fcm_token, session_id, fcm_token)
 
             bucket = self._get_bucket()
-            semaphore = asyncio.Semaphore(self._upload_max_concurrency)
-
             left_task = self._upload_group(
                 bucket=bucket,
                 session_id=session_id,
-                semaphore=semaphore,
+                priority=UploadPriority.SIGNUP,
                 face_prefix="left_face",
                 files=left_faces,
+                contents=left_contents,
             )
             right_task = self._upload_group(
                 bucket=bucket,
                 session_id=session_id,
-                semaphore=semaphore,
+                priority=UploadPriority.SIGNUP,
                 face_prefix="right_face",
                 files=right_faces,
+                contents=right_contents,
             )
             front_task = self._upload_group(
                 bucket=bucket,
                 session_id=session_id,
-                semaphore=semaphore,
+                priority=UploadPriority.SIGNUP,
                 face_prefix="front_face",
                 files=front_faces,
+                contents=front_contents,
             )
-            left_face_urls, right_face_urls, front_face_urls = await asyncio.gather(
+            left_uploads, right_uploads, front_uploads = await asyncio.gather(
                 left_task, right_task, front_task
             )
 
@@ -176,16 +313,19 @@ class EkycService(BaseService):
                 session_id=session_id,
             )
 
-            user, user_err = self._user_repository.get_by_email(user_email)
+            user, user_err = await executors.db.run(
+                self._user_repository.get_by_email, user_email
+            )
             if user_err:
                 logger.error(f"User not found during eKYC upload: {user_email}")
                 return None, user_err
 
-            save_error = self._user_face_repository.save_ekyc_faces(
+            previous_faces, save_error = await executors.db.run(
+                self._user_face_repository.save_ekyc_faces,
                 user_id=user.id,
-                left_face_urls=left_face_urls,
-                right_face_urls=right_face_urls,
-                front_face_urls=front_face_urls,
+                left_face_urls=[uploaded.url for uploaded in left_uploads],
+                right_face_urls=[uploaded.url for uploaded in right_uploads],
+                front_face_urls=[uploaded.url for uploaded in front_uploads],
             )
             if save_error:
                 logger.error(
@@ -193,8 +333,11 @@ class EkycService(BaseService):
                     f"{user_email}: {save_error.message}"
                 )
                 return None, save_error
+            self._discard_superseded(previous_faces)
 
-            mark_error = self._user_repository.mark_ekyc_uploaded(user.id)
+            mark_error = await executors.db.run(
+                self._user_repository.mark_ekyc_uploaded, user.id
+            )
             if mark_error:
                 logger.warning(
                     f"Faces saved but failed to mark eKYC as uploaded for {user_email}: "
@@ -205,16 +348,26 @@ class EkycService(BaseService):
             elapsed_seconds = time.perf_counter() - started_at
             logger.info(
                 f"{total_uploaded} face photos uploaded successfully for session: "
-                f"{session_id} in {elapsed_seconds:.2f}s (max_concurrency={self._upload_max_concurrency})"
+                f"{session_id} in {elapsed_seconds:.2f}s "
+                f"(upload_limit={self._upload_scheduler.limit})"
             )
 
             # Fire-and-forget: publish sign-up event to Pub/Sub
             self._pubsub_service.publish_signup_event(
-                user_id=str(user.id), session_id=session_id
+                user_id=str(user.id),
+                session_id=session_id,
+                faces={
+                    "left_face": left_uploads,
+                    "right_face": right_uploads,
+                    "front_face": front_uploads,
+                },
             )
 
             return response_data, None
 
+        except CircuitOpenError:
+            logger.warning(f"Storage unavailable, aborted eKYC upload: {user_email}")
+            return None, ErrStorageUnavailable
         except (RuntimeError, ValueError) as e:
             logger.error(f"Failed to upload photos to Firebase Storage: {str(e)}")
             return None, Error(ErrInternalError.code, "Photo upload failed")
@@ -229,40 +382,73 @@ class EkycService(BaseService):
         user_email: str,
         faces: List[UploadFile],
         fcm_token: str,
+        idempotency_key: Optional[str] = None,
     ) -> tuple[EkycServiceLoginResult | None, Error | None]:
         logger.info(f"Processing eKYC login for user: {user_email}")
 
         if len(faces) != 3:
             return None, Error(400, "Exactly 3 face photos are required for login")
 
+        if idempotency_key is None or self._idempotency_service is None:
+            return await self._login(user_email, faces, fcm_token)
+
+        # Replays return the original session_id without re-uploading.
+        return await self._idempotency_service.run_async(
+            scope=f"ekyc.login:{user_email}",
+            key=idempotency_key,
+            fingerprint=IdempotencyService.fingerprint(
+                fcm_token, *await self._describe_files(faces)
+            ),
+            operation=lambda: self._login(user_email, faces, fcm_token),
+            encode=asdict,
+            decode=lambda data: EkycServiceLoginResult(**data),
+        )
+
+    async def _login(
+        self,
+        user_email: str,
+        faces: List[UploadFile],
+        fcm_token: str,
+    ) -> tuple[EkycServiceLoginResult | None, Error | None]:
+        if breakers.storage.state == CircuitState.OPEN:
+            return None, ErrStorageUnavailable
+
         try:
             started_at = time.perf_counter()
+            contents = await self._read_files(faces)
+            quality_error = await self._precheck([("login_face", contents)])
+            if quality_error:
+                return None, quality_error
+
             session_id = str(uuid.uuid4())
 
             # Save FCM token to Firebase Realtime Database
-            await run_in_threadpool(self._save_fcm_token, session_id, fcm_token)
+            await executors.rtdb.run(self._save_fcm_token, session_id, fcm_token)
 
             bucket = self._get_bucket()
-            semaphore = asyncio.Semaphore(self._upload_max_concurrency)
-
             # Upload faces
-            face_urls = await self._upload_group(
+            uploads = await self._upload_group(
                 bucket=bucket,
                 session_id=session_id,
-                semaphore=semaphore,
+                priority=UploadPriority.LOGIN,
                 face_prefix="login_face",
                 files=faces,
+                contents=contents,
             )
 
             # Verify user exists and get user_id
-            user, user_err = self._user_repository.get_by_email(user_email)
+            user, user_err = await executors.db.run(
+                self._user_repository.get_by_email, user_email
+            )
             if user_err:
                 logger.error(f"User not found during eKYC login: {user_email}")
                 return None, user_err
 
             # Save to database
-            save_error = self._user_face_repository.save_login_faces(
-                user_id=user.id, face_urls=face_urls
+            save_error = await executors.db.run(
+                self._user_face_repository.save_login_faces,
+                user_id=user.id,
+                face_urls=[uploaded.url for uploaded in uploads],
             )
             if save_error:
                 logger.error(
@@ -279,7 +465,9 @@ class EkycService(BaseService):
 
             # Fire-and-forget: publish sign-in event
             self._pubsub_service.publish_signin_event(
-                user_id=str(user.id), session_id=session_id
+                user_id=str(user.id),
+                session_id=session_id,
+                faces={"login_face": uploads},
             )
 
             return (
@@ -287,6 +475,9 @@ class EkycService(BaseService):
                 None,
             )
 
+        except CircuitOpenError:
+            logger.warning(f"Storage unavailable, aborted eKYC login: {user_email}")
+            return None, ErrStorageUnavailable
         except (RuntimeError, ValueError) as e:
             logger.error(f"Failed to upload login photos to Firebase Storage: {str(e)}")
             return None, Error(ErrInternalError.code, "Photo upload failed")
@@ -295,3 +486,56 @@ class EkycService(BaseService):
             return None, Error(
                 ErrInternalError.code, "Internal server error during login photo upload"
             )
+
+    @staticmethod
+    def _encode_cursor(row) -> str:
+        key = [row["pose"], row["created_at"].isoformat(), row["id"]]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, datetime, int] | None:
+        try:
+            pose, created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor))
+            return str(pose), datetime.fromisoformat(created_at), int(row_id)
+        except (binascii.Error, ValueError, TypeError):
+            return None
+
+    async def get_face_history(
+        self,
+        user_email: str,
+        limit: int,
+        pose: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[EkycServiceFaceHistoryResult | None, Error | None]:
+        logger.info(f"Listing face history for user: {user_email}")
+
+        after = None
+        if cursor:
+            after = self._decode_cursor(cursor)
+            if after is None:
+                return None, ErrInvalidCursor
+
+        user, user_err = await executors.db.run(
+            self._user_repository.get_by_email, user_email
+        )
+        if user_err:
+            return None, user_err
+
+        # Fetch one extra row to learn whether another page exists.
+        rows, err = await executors.db.run(
+            self._user_face_repository.list_faces,
+            user_id=user.id,
+            limit=limit + 1,
+            pose=pose,
+            created_from=created_from,
+            created_to=created_to,
+            after=after,
+        )
+        if err:
+            return None, err
+
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = self._encode_cursor(items[-1]) if len(rows) > limit else None
+        return EkycServiceFaceHistoryResult(items=items, next_cursor=next_cursor), None
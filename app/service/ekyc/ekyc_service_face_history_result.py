@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class EkycServiceFaceHistoryResult:
+    items: list[dict]
+    next_cursor: str | None
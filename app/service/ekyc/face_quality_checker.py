@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Sequence
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import (
+    ErrFacePhotoBlurry,
+    ErrFacePhotoLowContrast,
+    ErrFacePhotoLowResolution,
+    ErrFacePhotoOverexposed,
+    ErrFacePhotoTooDark,
+    ErrFacePhotoUnreadable,
+)
+from app.core.metrics import registry
+from app.util import image_quality
+from app.util.fork import after_fork_in_child
+from app.util.image_quality import QualityThresholds
+
+logger = logging.getLogger(__name__)
+
+_ERRORS = {
+    image_quality.UNREADABLE: ErrFacePhotoUnreadable,
+    image_quality.LOW_RESOLUTION: ErrFacePhotoLowResolution,
+    image_quality.BLURRY: ErrFacePhotoBlurry,
+    image_quality.TOO_DARK: ErrFacePhotoTooDark,
+    image_quality.OVEREXPOSED: ErrFacePhotoOverexposed,
+    image_quality.LOW_CONTRAST: ErrFacePhotoLowContrast,
+}
+
+_photos = registry.counter(
+    "face_quality_photos_total", "Face photos checked, by issue found", ["issue"]
+)
+_skipped = registry.counter(
+    "face_quality_skipped_total", "Requests uploaded without a precheck", ["reason"]
+)
+_seconds = registry.histogram(
+    "face_quality_check_seconds", "Time to precheck one request's photos"
+)
+
+_checkers: "weakref.WeakSet[FaceQualityChecker]" = weakref.WeakSet()
+
+
+class FaceQualityChecker:
+    """Rejects unusable face photos before they are uploaded.
+
+    All photos of a request are measured in one task on a process pool
+    (decoding and NumPy work hold the GIL). The precheck fails open: when
+    the pool is saturated or broken, photos go through unchecked and the
+    downstream verifier still judges them.
+
+    ``check`` must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = configs.FACE_QUALITY_ENABLED,
+        workers: int = configs.FACE_QUALITY_WORKERS,
+        max_queue: int = configs.FACE_QUALITY_QUEUE,
+        thresholds: QualityThresholds | None = None,
+    ) -> None:
+        self._enabled = enabled
+        self._workers = max(1, workers)
+        self._max_queue = max(0, max_queue)
+        self._thresholds = thresholds or QualityThresholds(
+            min_short_side=configs.FACE_QUALITY_MIN_SHORT_SIDE,
+            analysis_max_side=configs.FACE_QUALITY_ANALYSIS_MAX_SIDE,
+            min_sharpness=configs.FACE_QUALITY_MIN_SHARPNESS,
+            min_brightness=configs.FACE_QUALITY_MIN_BRIGHTNESS,
+            max_brightness=configs.FACE_QUALITY_MAX_BRIGHTNESS,
+            min_contrast=configs.FACE_QUALITY_MIN_CONTRAST,
+            max_clipped_fraction=configs.FACE_QUALITY_MAX_CLIPPED_FRACTION,
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        _checkers.add(self)
+        logger.info(
+            f"FaceQualityChecker initialized (enabled={self._enabled}, "
+            f"workers={self._workers})"
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    async def check(self, photos: Sequence[tuple[str, bytes]]) -> Error | None:
+        """Return the error for the first ``(label, data)`` photo that fails."""
+        if not self._enabled or not photos:
+            return None
+        if self._pending >= self._workers + self._max_queue:
+            _skipped.inc(reason="saturated")
+            return None
+
+        started_at = time.perf_counter()
+        self._pending += 1
+        try:
+            reports = await asyncio.wrap_future(
+                self._get_pool().submit(
+                    image_quality.measure_batch,
+                    [data for _, data in photos],
+                    self._thresholds,
+                )
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a hostile image); start a new pool.
+            self._pool = None
+            _skipped.inc(reason="pool_broken")
+            logger.error("Face quality pool broke, photos uploaded unchecked")
+            return None
+        finally:
+            self._pending -= 1
+        _seconds.observe(time.perf_counter() - started_at)
+
+        failure = None
+        for (label, _), report in zip(photos, reports):
+            _photos.inc(issue=report.issue or "ok")
+            if report.issue is not None and failure is None:
+                failure = label, report
+        if failure is None:
+            return None
+
+        label, report = failure
+        logger.info(
+            f"Rejected {label}: {report.issue} ({report.width}x{report.height}, "
+            f"sharpness={report.sharpness:.0f}, brightness={report.brightness:.0f}, "
+            f"contrast={report.contrast:.0f})"
+        )
+        err = _ERRORS[report.issue]
+        return Error(err.code, f"{err.message}: {label}")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # The server process runs threads, so workers come from a clean
+            # fork server rather than a fork of this process.
+            context = multiprocessing.get_context(
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            if context.get_start_method() == "forkserver":
+                context.set_forkserver_preload([image_quality.__name__])
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers, mp_context=context
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+@after_fork_in_child
+def _reset_after_fork() -> None:
+    # The pool's processes and pipes belong to the parent.
+    for checker in list(_checkers):
+        checker._pool = None
+        checker._pending = 0
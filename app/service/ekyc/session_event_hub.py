@@ -0,0 +1,352 @@
+"""Server-Sent Events for eKYC session results.
+
+The verifier writes its outcome under ``/sessions/{session_id}`` in the
+Realtime Database (next to the FCM token saved at upload). Instead of
+polling, clients hold one SSE connection per session. Every subscriber of
+a session in this process shares a single RTDB listener; each change is
+encoded once and fanned out to all of them. The stream ends once the
+session has a ``result``, when the connection timeout is reached, or when
+the client goes away, and the listener is closed with its last subscriber.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Callable, Protocol
+
+from firebase_admin import db
+
+from app.core.circuit_breaker import breakers
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import ErrServiceOverloaded, ErrSessionEventsUnavailable
+from app.core.executors import ExecutorRejectedError, executors
+from app.core.firebase import get_firebase_app
+from app.core.metrics import registry
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Keys under /sessions/{id} that are never sent to clients.
+_PRIVATE_KEYS = frozenset({"fcm_token"})
+# A session is finished once the verifier has written this key.
+_RESULT_KEY = "result"
+# Reconnect delay suggested to EventSource clients, in milliseconds.
+_RETRY_MS = 3000
+
+_sessions_gauge = registry.gauge(
+    "session_events_listened_sessions", "Sessions with an open change listener"
+)
+_subscribers_gauge = registry.gauge(
+    "session_events_subscribers", "Open session event streams"
+)
+_events = registry.counter(
+    "session_events_sent_total", "Frames written to session event streams", ["kind"]
+)
+_rejected = registry.counter(
+    "session_events_rejected_total", "Session event streams refused", ["reason"]
+)
+
+# callback(event_type, path, data) with Firebase "put"/"patch" semantics.
+ChangeCallback = Callable[[str, str, object], None]
+
+
+class SessionListener(Protocol):
+    def close(self) -> None: ...
+
+
+class SessionSource(Protocol):
+    def listen(self, session_id: str, callback: ChangeCallback) -> SessionListener:
+        """Start following a session; blocking, called on a worker thread."""
+        ...
+
+
+class RtdbSessionSource:
+    """Follows ``/sessions/{id}`` with the Admin SDK's streaming listener."""
+
+    def listen(self, session_id: str, callback: ChangeCallback) -> SessionListener:
+        get_firebase_app()
+        ref = db.reference(f"/sessions/{session_id}")
+        return breakers.rtdb.call(
+            ref.listen, lambda event: callback(event.event_type, event.path, event.data)
+        )
+
+
+class _MemoryListener:
+    def __init__(self, source: "InMemorySessionSource", session_id: str, callback):
+        self._source = source
+        self._session_id = session_id
+        self.callback = callback
+
+    def close(self) -> None:
+        with self._source._lock:
+            listeners = self._source._listeners.get(self._session_id, [])
+            if self in listeners:
+                listeners.remove(self)
+
+
+class InMemorySessionSource:
+    """Process-local result store for development and tests."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, dict] = {}
+        self._listeners: dict[str, list[_MemoryListener]] = {}
+
+    def listen(self, session_id: str, callback: ChangeCallback) -> SessionListener:
+        listener = _MemoryListener(self, session_id, callback)
+        with self._lock:
+            self._listeners.setdefault(session_id, []).append(listener)
+            value = self._values.get(session_id)
+        callback("put", "/", dict(value) if value is not None else None)
+        return listener
+
+    def update(self, session_id: str, values: dict) -> None:
+        with self._lock:
+            self._values.setdefault(session_id, {}).update(values)
+            listeners = list(self._listeners.get(session_id, []))
+        for listener in listeners:
+            listener.callback("patch", "/", dict(values))
+
+
+def _apply(snapshot, event_type: str, path: str, data):
+    """Return ``snapshot`` after a Firebase put/patch event at ``path``."""
+    if event_type == "patch":
+        for key, value in (data or {}).items():
+            snapshot = _apply(snapshot, "put", f"{path.rstrip('/')}/{key}", value)
+        return snapshot
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return data
+    root = snapshot if isinstance(snapshot, dict) else {}
+    node = root
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = node[part] = {}
+        node = child
+    if data is None:
+        node.pop(parts[-1], None)
+    else:
+        node[parts[-1]] = data
+    return root
+
+
+class _Session:
+    __slots__ = (
+        "listener",
+        "starting",
+        "snapshot",
+        "body",
+        "frame",
+        "version",
+        "finished",
+    )
+
+    def __init__(self) -> None:
+        self.listener: SessionListener | None = None
+        self.starting: asyncio.Future | None = None
+        self.snapshot = None
+        self.body: bytes | None = None
+        self.frame: bytes | None = None
+        self.version = 0
+        self.finished = False
+
+
+class SessionSubscription:
+    """One client's stream; ``close`` is idempotent."""
+
+    def __init__(self, hub: "SessionEventHub", session_id: str, session: _Session):
+        self._hub = hub
+        self._session_id = session_id
+        self._session = session
+        self._changed = asyncio.Event()
+        self._closed = False
+
+    def notify(self) -> None:
+        self._changed.set()
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """SSE frames: session snapshots, heartbeats and a final timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._hub.timeout_seconds
+        seen = 0
+        try:
+            yield f"retry: {_RETRY_MS}\n\n".encode()
+            while True:
+                self._changed.clear()
+                session = self._session
+                if session.version > seen:
+                    seen = session.version
+                    _events.inc(kind="session")
+                    yield session.frame
+                    if session.finished:
+                        return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    _events.inc(kind="timeout")
+                    yield b"event: timeout\ndata: {}\n\n"
+                    return
+                try:
+                    async with asyncio.timeout(
+                        min(self._hub.heartbeat_seconds, remaining)
+                    ):
+                        await self._changed.wait()
+                except TimeoutError:
+                    if deadline - loop.time() > 0:
+                        _events.inc(kind="heartbeat")
+                        yield b": keep-alive\n\n"
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._hub._leave(self._session_id, self._session, self)
+
+
+class SessionEventHub:
+    """Shares one change listener per session among all local subscribers.
+
+    Must be used from the event loop thread; listener callbacks arriving on
+    SDK threads are handed over with ``call_soon_threadsafe``.
+    """
+
+    def __init__(
+        self,
+        source: SessionSource | None = None,
+        heartbeat_seconds: float = configs.SESSION_EVENTS_HEARTBEAT_SECONDS,
+        timeout_seconds: float = configs.SESSION_EVENTS_TIMEOUT_SECONDS,
+        max_sessions: int = configs.SESSION_EVENTS_MAX_SESSIONS,
+        max_subscribers: int = configs.SESSION_EVENTS_MAX_SUBSCRIBERS,
+    ) -> None:
+        if source is None:
+            source = (
+                InMemorySessionSource()
+                if configs.SESSION_EVENTS_SOURCE == "memory"
+                else RtdbSessionSource()
+            )
+        self._source = source
+        self.heartbeat_seconds = heartbeat_seconds
+        self.timeout_seconds = timeout_seconds
+        self._max_sessions = max_sessions
+        self._max_subscribers = max_subscribers
+        self._sessions: dict[str, _Session] = {}
+        self._subscribers: dict[_Session, set[SessionSubscription]] = {}
+
+    @property
+    def source(self) -> SessionSource:
+        return self._source
+
+    async def subscribe(
+        self, session_id: str
+    ) -> tuple[SessionSubscription | None, Error | None]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            if len(self._sessions) >= self._max_sessions:
+                _rejected.inc(reason="max_sessions")
+                return None, ErrServiceOverloaded
+            session = _Session()
+            self._sessions[session_id] = session
+            self._subscribers[session] = set()
+            session.starting = asyncio.ensure_future(self._start(session_id, session))
+            _sessions_gauge.set(len(self._sessions))
+        elif len(self._subscribers[session]) >= self._max_subscribers:
+            _rejected.inc(reason="max_subscribers")
+            return None, ErrServiceOverloaded
+
+        subscription = SessionSubscription(self, session_id, session)
+        self._subscribers[session].add(subscription)
+        _subscribers_gauge.inc()
+        try:
+            await asyncio.shield(session.starting)
+        except Exception as e:
+            subscription.close()
+            _rejected.inc(reason="unavailable")
+            logger.warning(f"Cannot follow session {session_id}: {e}")
+            return None, ErrSessionEventsUnavailable
+        except BaseException:
+            subscription.close()
+            raise
+        return subscription, None
+
+    async def _start(self, session_id: str, session: _Session) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_change(event_type: str, path: str, data) -> None:
+            loop.call_soon_threadsafe(self._on_change, session, event_type, path, data)
+
+        try:
+            listener = await executors.rtdb.run(
+                self._source.listen, session_id, on_change
+            )
+        except BaseException:
+            self._forget(session_id, session)
+            raise
+        if session in self._subscribers:
+            session.listener = listener
+        else:
+            # Every subscriber left while the listener was starting.
+            self._close_listener(listener)
+
+    def _on_change(self, session: _Session, event_type: str, path: str, data) -> None:
+        subscribers = self._subscribers.get(session)
+        if subscribers is None:
+            return
+        session.snapshot = _apply(session.snapshot, event_type, path, data)
+        snapshot = session.snapshot if isinstance(session.snapshot, dict) else {}
+        public = {k: v for k, v in snapshot.items() if k not in _PRIVATE_KEYS}
+        if not public:
+            return
+        body = dumps(public)
+        if body == session.body:
+            return
+        session.body = body
+        session.version += 1
+        session.frame = (
+            f"id: {session.version}\nevent: session\ndata: ".encode() + body + b"\n\n"
+        )
+        session.finished = public.get(_RESULT_KEY) is not None
+        for subscription in subscribers:
+            subscription.notify()
+
+    def _leave(
+        self, session_id: str, session: _Session, subscription: SessionSubscription
+    ) -> None:
+        subscribers = self._subscribers.get(session)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        _subscribers_gauge.dec()
+        if not subscribers:
+            self._forget(session_id, session)
+            if session.listener is not None:
+                self._close_listener(session.listener)
+                session.listener = None
+
+    def _forget(self, session_id: str, session: _Session) -> None:
+        if self._sessions.get(session_id) is session:
+            del self._sessions[session_id]
+        removed = self._subscribers.pop(session, set())
+        if removed:
+            _subscribers_gauge.dec(len(removed))
+        _sessions_gauge.set(len(self._sessions))
+
+    @staticmethod
+    def _close_listener(listener: SessionListener) -> None:
+        # Closing joins the SDK's streaming thread; keep it off the loop.
+        try:
+            executors.rtdb.submit(listener.close)
+        except ExecutorRejectedError:
+            threading.Thread(target=listener.close, daemon=True).start()
+
+    def shutdown(self) -> None:
+        """Close every listener; the SDK's listener threads block exit."""
+        for session in list(self._subscribers):
+            if session.listener is not None:
+                session.listener.close()
+                session.listener = None
+        self._sessions.clear()
+        self._subscribers.clear()
+        _sessions_gauge.set(0)
+        _subscribers_gauge.set(0)
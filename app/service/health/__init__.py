@@ -0,0 +1,4 @@
+from app.service.health.readiness_service import (
+    ProbeResult as ProbeResult,
+    ReadinessService as ReadinessService,
+)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from sqlalchemy import text
+
+from app.core.config import configs
+from app.core.database import Database
+from app.core.executors import BoundedExecutor, executors
+from app.core.firebase import ensure_access_token, get_bucket
+from app.core.metrics import registry
+from app.service.pubsub.pubsub_service import PubsubService
+
+logger = logging.getLogger(__name__)
+
+_SELECT_ONE = text("SELECT 1")
+
+_probe_up = registry.gauge(
+    "readiness_probe_up", "Last probe result per dependency (1 ok)", ["dependency"]
+)
+_probe_seconds = registry.histogram(
+    "readiness_probe_seconds", "Dependency probe latency", ["dependency"]
+)
+_ready = registry.gauge("readiness_ready", "Whether this process reports ready")
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeResult:
+    ok: bool
+    latency_seconds: float
+    error: str | None = None
+
+
+class ReadinessService:
+    """Warms external clients at startup and answers readiness from cached probes.
+
+    Every probe is idempotent and doubles as initialization: the database
+    probe opens a connection, ``firebase`` initializes the app and fetches
+    an access token, ``storage`` builds the bucket handle and ``pubsub``
+    the publisher. ``warm_up`` runs them all in parallel within the startup
+    budget; ``check`` re-runs them at most every ``cache_seconds``, so a
+    dependency that failed at startup is retried by the readiness checks.
+
+    The process is ready once warm-up has finished and every ``required``
+    probe last succeeded. A probe still running from an earlier check is
+    awaited rather than started again.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        pubsub_service: PubsubService,
+        required: Sequence[str] = configs.READINESS_REQUIRED,
+        warmup_budget_seconds: float = configs.READINESS_WARMUP_BUDGET_SECONDS,
+        probe_timeout_seconds: float = configs.READINESS_PROBE_TIMEOUT_SECONDS,
+        cache_seconds: float = configs.READINESS_CACHE_SECONDS,
+    ) -> None:
+        self._db = db
+        self._probes: dict[str, tuple[BoundedExecutor, Callable[[], object]]] = {
+            "database": (executors.db, self._probe_database),
+            "firebase": (executors.storage, ensure_access_token),
+            "storage": (executors.storage, get_bucket),
+            "pubsub": (executors.storage, pubsub_service.warm_up),
+        }
+        unknown = set(required) - set(self._probes)
+        if unknown:
+            logger.warning(f"Ignoring unknown readiness dependencies: {unknown}")
+        self._required = [name for name in required if name in self._probes]
+        self._warmup_budget_seconds = warmup_budget_seconds
+        self._probe_timeout_seconds = probe_timeout_seconds
+        self._cache_seconds = cache_seconds
+        self._results: dict[str, ProbeResult] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._refresh: asyncio.Future | None = None
+        self._checked_at = float("-inf")
+        self._warmed_up = False
+        logger.info(f"ReadinessService initialized (required={self._required})")
+
+    @property
+    def ready(self) -> bool:
+        return self._warmed_up and all(
+            name in self._results and self._results[name].ok for name in self._required
+        )
+
+    async def warm_up(self) -> bool:
+        """Initialize every dependency in parallel; never raises."""
+        started_at = time.perf_counter()
+        await self._run_probes(self._warmup_budget_seconds)
+        self._warmed_up = True
+        _ready.set(1 if self.ready else 0)
+        failed = {n: r.error for n, r in self._results.items() if not r.ok}
+        elapsed = time.perf_counter() - started_at
+        if failed:
+            logger.warning(f"Warm-up finished in {elapsed:.2f}s with errors: {failed}")
+        else:
+            logger.info(f"Warm-up finished in {elapsed:.2f}s")
+        return self.ready
+
+    async def check(self) -> tuple[bool, dict[str, ProbeResult]]:
+        """Return readiness and the latest probe results, refreshing stale ones."""
+        if self._warmed_up and (
+            time.monotonic() - self._checked_at >= self._cache_seconds
+        ):
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.ensure_future(
+                    self._run_probes(self._probe_timeout_seconds)
+                )
+            await asyncio.shield(self._refresh)
+            _ready.set(1 if self.ready else 0)
+        return self.ready, dict(self._results)
+
+    def required(self, name: str) -> bool:
+        return name in self._required
+
+    async def _run_probes(self, timeout: float) -> None:
+        tasks = {}
+        for name in self._probes:
+            task = self._in_flight.get(name)
+            if task is None or task.done():
+                task = self._in_flight[name] = asyncio.ensure_future(self._probe(name))
+            tasks[name] = task
+        done, _ = await asyncio.wait(tasks.values(), timeout=timeout)
+        for name, task in tasks.items():
+            if task in done:
+                result = task.result()
+            else:
+                result = ProbeResult(False, timeout, "timed out")
+            previous = self._results.get(name)
+            if self._warmed_up and previous and previous.ok != result.ok:
+                if result.ok:
+                    logger.info(f"Readiness probe {name} recovered")
+                else:
+                    logger.warning(f"Readiness probe {name} failing: {result.error}")
+            self._results[name] = result
+            _probe_up.set(1 if result.ok else 0, dependency=name)
+        self._checked_at = time.monotonic()
+
+    async def _probe(self, name: str) -> ProbeResult:
+        executor, probe = self._probes[name]
+        started_at = time.perf_counter()
+        try:
+            await executor.run(probe)
+            error = None
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency = time.perf_counter() - started_at
+        _probe_seconds.observe(latency, dependency=name)
+        return ProbeResult(error is None, latency, error)
+
+    def _probe_database(self) -> None:
+        with self._db.session() as session:
+            session.execute(_SELECT_ONE)
@@ -0,0 +1,6 @@
+from app.service.idempotency.idempotency_claim import (
+    IdempotencyClaim as IdempotencyClaim,
+)
+from app.service.idempotency.idempotency_service import (
+    IdempotencyService as IdempotencyService,
+)
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class IdempotencyClaim:
+    scope: str
+    key: str
+    fingerprint: str
+    # Stored result of the original request; set when this claim is a replay.
+    response: dict | None = None
+
+    @property
+    def is_replay(self) -> bool:
+        return self.response is not None
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, TypeVar
+
+from app.core.config import configs
+from app.core.constants import IdempotencyStatus
+from app.core.ecode import Error
+from app.core.executors import ExecutorRejectedError, executors
+from app.core.exceptions import ErrIdempotencyKeyInProgress, ErrIdempotencyKeyReused
+from app.repository import IdempotencyRepository
+from app.service.base.base_service import BaseService
+from app.service.idempotency.idempotency_claim import IdempotencyClaim
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_POLL_INITIAL_SECONDS = 0.1
+_POLL_MAX_SECONDS = 1.0
+_PURGE_INTERVAL_SECONDS = 600
+_PURGE_BATCH_SIZE = 1000
+
+
+class IdempotencyService(BaseService):
+    """Deduplicates retried requests that carry an ``Idempotency-Key`` header.
+
+    Completed results are kept in an in-process LRU and in
+    ``tb_idempotency_keys`` so replays on any replica skip the work. Duplicates
+    arriving while the original is still running wait for its result on the
+    event loop: on the same process via an event, across replicas by polling
+    the stored record. Only the queries themselves run on the db pool, so
+    waiting duplicates do not hold its threads.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, idempotency_repository: IdempotencyRepository) -> None:
+        self._idempotency_repository = idempotency_repository
+        super().__init__(idempotency_repository)
+        self._ttl_seconds = configs.IDEMPOTENCY_TTL_SECONDS
+        self._lock_seconds = configs.IDEMPOTENCY_LOCK_SECONDS
+        self._wait_timeout_seconds = configs.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+        self._cache_size = max(0, configs.IDEMPOTENCY_CACHE_SIZE)
+
+        # (scope, key) -> (fingerprint, response, monotonic expiry)
+        self._completed: OrderedDict[tuple[str, str], tuple[str, dict, float]] = (
+            OrderedDict()
+        )
+        self._in_flight: dict[tuple[str, str], asyncio.Event] = {}
+        self._last_purge = time.monotonic()
+        logger.info("IdempotencyService initialized")
+
+    @staticmethod
+    def fingerprint(*parts: object) -> str:
+        """Keyed digest of the request fields a replay must match.
+
+        HMAC keeps sensitive inputs such as passwords out of the table in a form
+        that could be brute-forced offline.
+        """
+        payload = "\x1f".join("" if part is None else str(part) for part in parts)
+        return hmac.new(
+            configs.JWT_SECRET_KEY.encode("utf-8"),
+            payload.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    async def begin(
+        self, scope: str, key: str, fingerprint: str
+    ) -> tuple[IdempotencyClaim | None, Error | None]:
+        """Claim ``key`` or obtain the stored result of the request that did.
+
+        Waits while another request with the same key is in flight, up to the
+        configured wait timeout. The caller owns a non-replay claim and must hand
+        it back through :meth:`complete` or :meth:`abandon`.
+        """
+        cache_key = (scope, key)
+        deadline = asyncio.get_running_loop().time() + self._wait_timeout_seconds
+
+        while True:
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return self._replay(scope, key, fingerprint, *cached)
+            event = self._in_flight.get(cache_key)
+            if event is None:
+                self._in_flight[cache_key] = asyncio.Event()
+                break
+
+            # Same key in flight on this process: wait for it, then re-check.
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await event.wait()
+            except TimeoutError:
+                logger.warning(f"Timed out waiting on idempotency key {scope}/{key}")
+                return None, ErrIdempotencyKeyInProgress
+
+        try:
+            return await self._claim_remote(scope, key, fingerprint, deadline)
+        except BaseException:
+            self._release_local(cache_key)
+            raise
+
+    async def _claim_remote(
+        self, scope: str, key: str, fingerprint: str, deadline: float
+    ) -> tuple[IdempotencyClaim | None, Error | None]:
+        cache_key = (scope, key)
+        loop = asyncio.get_running_loop()
+        poll_interval = _POLL_INITIAL_SECONDS
+
+        while True:
+            record, err = await executors.db.run(
+                self._idempotency_repository.claim,
+                scope=scope,
+                key=key,
+                fingerprint=fingerprint,
+                ttl_seconds=self._ttl_seconds,
+                lock_seconds=self._lock_seconds,
+            )
+            if err:
+                self._release_local(cache_key)
+                return None, err
+            if record is None:
+                logger.info(f"Claimed idempotency key {scope}/{key}")
+                return IdempotencyClaim(
+                    scope=scope, key=key, fingerprint=fingerprint
+                ), None
+
+            if record.fingerprint != fingerprint:
+                self._release_local(cache_key)
+                return None, ErrIdempotencyKeyReused
+
+            if record.status == IdempotencyStatus.COMPLETED:
+                self._put_cached(cache_key, record.fingerprint, record.response)
+                self._release_local(cache_key)
+                logger.info(
+                    f"Replaying stored result for idempotency key {scope}/{key}"
+                )
+                return self._replay(
+                    scope, key, fingerprint, record.fingerprint, record.response
+                )
+
+            # Another replica is still working on it.
+            if loop.time() + poll_interval > deadline:
+                self._release_local(cache_key)
+                logger.warning(f"Idempotency key {scope}/{key} still in progress")
+                return None, ErrIdempotencyKeyInProgress
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, _POLL_MAX_SECONDS)
+
+    async def complete(self, claim: IdempotencyClaim, response: dict) -> None:
+        """Persist the result of an owned claim so that retries replay it."""
+        cache_key = (claim.scope, claim.key)
+        try:
+            err = await executors.db.run(
+                self._idempotency_repository.complete, claim.scope, claim.key, response
+            )
+            if err:
+                # The local cache still serves replays; other replicas re-run
+                # the request once the lock lapses.
+                logger.warning(
+                    f"Failed to persist idempotency result for "
+                    f"{claim.scope}/{claim.key}: {err.message}"
+                )
+        finally:
+            self._put_cached(cache_key, claim.fingerprint, response)
+            self._release_local(cache_key)
+        self._maybe_purge()
+
+    async def abandon(self, claim: IdempotencyClaim) -> None:
+        """Give up an owned claim after a failure so that a retry runs again."""
+        try:
+            await executors.db.run(self._release_stored, claim)
+        finally:
+            self._release_local((claim.scope, claim.key))
+
+    async def run_async(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[tuple[T | None, Error | None]]],
+        encode: Callable[[T], dict],
+        decode: Callable[[dict], T],
+    ) -> tuple[T | None, Error | None]:
+        claim, err = await self.begin(scope, key, fingerprint)
+        if err:
+            return None, err
+        if claim.is_replay:
+            return decode(claim.response), None
+
+        try:
+            result, err = await operation()
+        except BaseException:
+            # Don't await here: the task may be cancelled. Local waiters are
+            # freed now; the stored lock lapses on its own if the release
+            # cannot be queued.
+            self._release_local((claim.scope, claim.key))
+            try:
+                executors.db.submit(self._release_stored, claim)
+            except ExecutorRejectedError:
+                pass
+            raise
+        if err:
+            await self.abandon(claim)
+        else:
+            await self.complete(claim, encode(result))
+        return result, err
+
+    @staticmethod
+    def _replay(
+        scope: str,
+        key: str,
+        fingerprint: str,
+        stored_fingerprint: str,
+        response: dict,
+    ) -> tuple[IdempotencyClaim | None, Error | None]:
+        if stored_fingerprint != fingerprint:
+            return None, ErrIdempotencyKeyReused
+        return (
+            IdempotencyClaim(
+                scope=scope, key=key, fingerprint=fingerprint, response=response
+            ),
+            None,
+        )
+
+    def _get_cached(self, cache_key: tuple[str, str]) -> tuple[str, dict] | None:
+        entry = self._completed.get(cache_key)
+        if entry is None:
+            return None
+        stored_fingerprint, response, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._completed[cache_key]
+            return None
+        self._completed.move_to_end(cache_key)
+        return stored_fingerprint, response
+
+    def _put_cached(
+        self, cache_key: tuple[str, str], fingerprint: str, response: dict
+    ) -> None:
+        if self._cache_size == 0:
+            return
+        self._completed[cache_key] = (
+            fingerprint,
+            response,
+            time.monotonic() + self._ttl_seconds,
+        )
+        self._completed.move_to_end(cache_key)
+        while len(self._completed) > self._cache_size:
+            self._completed.popitem(last=False)
+
+    def _release_local(self, cache_key: tuple[str, str]) -> None:
+        event = self._in_flight.pop(cache_key, None)
+        if event is not None:
+            event.set()
+
+    def _release_stored(self, claim: IdempotencyClaim) -> None:
+        err = self._idempotency_repository.release(claim.scope, claim.key)
+        if err:
+            logger.warning(
+                f"Failed to release idempotency key {claim.scope}/{claim.key}: "
+                f"{err.message}"
+            )
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        try:
+            executors.db.submit(self._purge)
+        except ExecutorRejectedError:
+            return  # Try again on a later completion.
+        self._last_purge = now
+
+    def _purge(self) -> None:
+        purged, err = self._idempotency_repository.purge_expired(_PURGE_BATCH_SIZE)
+        if err:
+            logger.warning(f"Failed to purge expired idempotency keys: {err.message}")
+        elif purged:
+            logger.info(f"Purged {purged} expired idempotency keys")
@@ -1,12 +1,27 @@
 import json
 import logging
+import time
+import weakref
 from datetime import datetime, timezone
+from typing import Mapping, Sequence
 
+import msgpack
+
+from app.core.circuit_breaker import breakers
 from app.core.config import configs
 from app.core.constants import Event
+from app.service.storage.hedged_uploader import UploadedObject
+from app.util.fork import after_fork_in_child
 
 logger = logging.getLogger(__name__)
 
+# Version 1 events carried only user_id, session_id and timestamp as JSON.
+EVENT_SCHEMA_VERSION = 2
+
+_CONTENT_TYPES = {"msgpack": "application/msgpack", "json": "application/json"}
+
+_services: "weakref.WeakSet[PubsubService]" = weakref.WeakSet()
+
 
 class PubsubService:
     """Publishes messages to Google Cloud Pub/Sub.
@@ -15,13 +30,24 @@ class PubsubService:
     GCP credentials are not available (e.g. local development).
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        encoding: str = configs.PUBSUB_EVENT_ENCODING,
+        ordering_enabled: bool = configs.PUBSUB_ORDERING_ENABLED,
+    ) -> None:
         self._project_id = configs.GCP_PROJECT_ID
         self._signup_topic = configs.PUBSUB_SIGNUP_TOPIC
         self._signin_topic = configs.PUBSUB_SIGNIN_TOPIC
+        self._bucket_name = configs.GCS_BUCKET_NAME
+        if encoding not in _CONTENT_TYPES:
+            logger.warning(f"Unknown event encoding {encoding!r}, using JSON")
+            encoding = "json"
+        self._encoding = encoding
+        self._ordering_enabled = ordering_enabled
         self._publisher = None
         self._signup_topic_path: str | None = None
         self._signin_topic_path: str | None = None
+        _services.add(self)
         logger.info("PubsubService created (publisher will be initialised lazily)")
 
     def _get_publisher(self):
@@ -29,7 +55,11 @@ class PubsubService:
         if self._publisher is None:
             from google.cloud import pubsub_v1
 
-            self._publisher = pubsub_v1.PublisherClient()
+            self._publisher = pubsub_v1.PublisherClient(
+                publisher_options=pubsub_v1.types.PublisherOptions(
+                    enable_message_ordering=self._ordering_enabled
+                )
+            )
             self._signup_topic_path = self._publisher.topic_path(
                 self._project_id, self._signup_topic
             )
@@ -41,58 +71,162 @@ class PubsubService:
             )
         return self._publisher
 
-    def publish_signup_event(self, user_id: str, session_id: str) -> None:
+    @property
+    def ready(self) -> bool:
+        return self._publisher is not None
+
+    def warm_up(self) -> None:
+        """Create the publisher now rather than on the first event."""
+        self._get_publisher()
+
+    def publish_signup_event(
+        self,
+        user_id: str,
+        session_id: str,
+        faces: Mapping[str, Sequence[UploadedObject]],
+    ) -> None:
         """Fire-and-forget publish of a sign-up event."""
-        try:
-            publisher = self._get_publisher()
-        except Exception as exc:
-            logger.warning(
-                f"Pub/Sub unavailable, skipping publish for user_id={user_id}: {exc}"
-            )
-            return
+        self._publish(Event.SIGN_UP, user_id, session_id, faces)
+
+    def publish_signin_event(
+        self,
+        user_id: str,
+        session_id: str,
+        faces: Mapping[str, Sequence[UploadedObject]],
+    ) -> None:
+        """Fire-and-forget publish of a sign-in event."""
+        self._publish(Event.SIGN_IN, user_id, session_id, faces)
+
+    def build_event(
+        self,
+        event_type: str,
+        user_id: str,
+        session_id: str,
+        faces: Mapping[str, Sequence[UploadedObject]],
+    ) -> dict:
+        """The event body; consumers find every photo without a DB lookup.
 
-        message = {
-            "event": Event.SIGN_UP,
+        ``faces`` maps the pose (``left_face``, ``login_face``, ...) to the
+        stored objects in upload order.
+        """
+        return {
+            "schema_version": EVENT_SCHEMA_VERSION,
+            "event": str(event_type),
             "user_id": str(user_id),
             "session_id": session_id,
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "bucket": self._bucket_name,
+            "faces": {
+                pose: [
+                    {
+                        "key": uploaded.name,
+                        "size": uploaded.size,
+                        "content_type": uploaded.content_type,
+                        "md5_hash": uploaded.md5_hash,
+                        "crc32c": uploaded.crc32c,
+                    }
+                    for uploaded in objects
+                ]
+                for pose, objects in faces.items()
+            },
         }
-        data = json.dumps(message).encode("utf-8")
-        future = publisher.publish(self._signup_topic_path, data=data)
-        future.add_done_callback(
-            lambda f: self._on_publish_done(f, user_id, Event.SIGN_UP)
-        )
 
-    def publish_signin_event(self, user_id: str, session_id: str) -> None:
-        """Fire-and-forget publish of a sign-in event."""
+    def encode_event(self, message: dict) -> tuple[bytes, str]:
+        """Serialize ``message``; returns the payload and its content type."""
+        if self._encoding == "msgpack":
+            data = msgpack.packb(message, use_bin_type=True)
+        else:
+            data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        return data, _CONTENT_TYPES[self._encoding]
+
+    def _publish(
+        self,
+        event_type: str,
+        user_id: str,
+        session_id: str,
+        faces: Mapping[str, Sequence[UploadedObject]],
+    ) -> None:
+        # Events are best effort: while Pub/Sub is failing they are dropped
+        # instead of piling up in the publisher's retry queue.
+        if not breakers.pubsub.allow():
+            logger.warning(
+                f"Pub/Sub circuit open, dropping {event_type} event "
+                f"for user_id={user_id}"
+            )
+            return
         try:
             publisher = self._get_publisher()
         except Exception as exc:
+            breakers.pubsub.cancel()
             logger.warning(
                 f"Pub/Sub unavailable, skipping publish for user_id={user_id}: {exc}"
             )
             return
 
-        message = {
-            "event": Event.SIGN_IN,
-            "user_id": str(user_id),
-            "session_id": session_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        data = json.dumps(message).encode("utf-8")
-        future = publisher.publish(self._signin_topic_path, data=data)
+        data, content_type = self.encode_event(
+            self.build_event(event_type, user_id, session_id, faces)
+        )
+        topic_path = (
+            self._signup_topic_path
+            if event_type == Event.SIGN_UP
+            else self._signin_topic_path
+        )
+        ordering_key = str(user_id) if self._ordering_enabled else ""
+        started_at = time.perf_counter()
+        try:
+            # Attributes let subscriptions filter and route without decoding.
+            future = publisher.publish(
+                topic_path,
+                data=data,
+                ordering_key=ordering_key,
+                event=str(event_type),
+                schema_version=str(EVENT_SCHEMA_VERSION),
+                content_type=content_type,
+            )
+        except Exception as exc:
+            breakers.pubsub.record(time.perf_counter() - started_at, True)
+            logger.error(
+                f"Failed to publish {event_type} event for user_id={user_id}: {exc}"
+            )
+            return
         future.add_done_callback(
-            lambda f: self._on_publish_done(f, user_id, Event.SIGN_IN)
+            lambda f: self._on_publish_done(
+                f, user_id, event_type, started_at, topic_path, ordering_key
+            )
         )
 
-    @staticmethod
-    def _on_publish_done(future, user_id: str, event_type: str) -> None:
+    def _on_publish_done(
+        self,
+        future,
+        user_id: str,
+        event_type: str,
+        started_at: float,
+        topic_path: str,
+        ordering_key: str,
+    ) -> None:
+        latency = time.perf_counter() - started_at
         try:
             message_id = future.result()
+            breakers.pubsub.record(latency, False)
             logger.info(
                 f"Published {event_type} event for user_id={user_id}, message_id={message_id}"
             )
         except Exception as exc:
+            breakers.pubsub.record(latency, True)
             logger.error(
                 f"Failed to publish {event_type} event for user_id={user_id}: {exc}"
             )
+            if ordering_key and self._publisher is not None:
+                # A failed publish pauses its ordering key; later events for
+                # the user would otherwise be rejected.
+                self._publisher.resume_publish(topic_path, ordering_key)
+
+
+@after_fork_in_child
+def _reset_after_fork() -> None:
+    # gRPC channels do not survive fork(); each worker creates its own
+    # publisher lazily.
+    for service in list(_services):
+        service._publisher = None
+        service._signup_topic_path = None
+        service._signin_topic_path = None
@@ -0,0 +1,4 @@
+from app.service.retention.face_retention_service import (
+    FaceRetentionResult as FaceRetentionResult,
+    FaceRetentionService as FaceRetentionService,
+)
@@ -0,0 +1,187 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import ErrStorageError
+from app.model.user_face_model import LOGIN_MONTH_PARTITION_PREFIX, add_months
+from app.repository import UserFacePartitionRepository
+from app.service.base.base_service import BaseService
+from app.service.storage import ObjectStorage
+from app.util.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# GCS batch requests accept at most 100 sub-requests.
+_DELETE_CHUNK_SIZE = 100
+
+_MONTH_RE = re.compile(rf"^{LOGIN_MONTH_PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+
+@dataclass
+class FaceRetentionResult:
+    partitions_created_until: date | None = None
+    partitions_detached: list[str] = field(default_factory=list)
+    partitions_dropped: list[str] = field(default_factory=list)
+    partitions_failed: list[str] = field(default_factory=list)
+    objects_deleted: int = 0
+
+
+def _partition_month(name: str) -> date | None:
+    match = _MONTH_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class FaceRetentionService(BaseService):
+    """Expires login face captures a month at a time.
+
+    Each run creates upcoming login partitions, detaches months that are
+    entirely past the retention window, deletes the storage objects their
+    rows reference (rate-limited, checkpointed so an interrupted run resumes
+    where it stopped) and finally drops the detached table.
+    """
+
+    def __init__(
+        self,
+        partition_repository: UserFacePartitionRepository,
+        object_storage: ObjectStorage,
+        retention_days: int = configs.FACE_RETENTION_DAYS,
+        months_ahead: int = configs.FACE_PARTITION_MONTHS_AHEAD,
+        batch_size: int = configs.FACE_RETENTION_BATCH_SIZE,
+        delete_workers: int = configs.FACE_RETENTION_DELETE_WORKERS,
+        delete_rate: float = configs.FACE_RETENTION_DELETE_RATE,
+    ) -> None:
+        self._partition_repository = partition_repository
+        self._object_storage = object_storage
+        self._retention_days = retention_days
+        self._months_ahead = months_ahead
+        self._batch_size = batch_size
+        self._delete_workers = max(1, delete_workers)
+        self._rate_limiter = TokenBucket(delete_rate)
+        super().__init__(partition_repository)
+        logger.info("FaceRetentionService initialized")
+
+    def ensure_partitions(self, today: date | None = None) -> Error | None:
+        """Create this month's login partition and the next ``months_ahead``."""
+        current = (today or date.today()).replace(day=1)
+        return self._partition_repository.ensure_login_partitions(
+            current, self._months_ahead + 1
+        )
+
+    def run(self, now: datetime | None = None) -> FaceRetentionResult:
+        now = now or datetime.now(timezone.utc)
+        result = FaceRetentionResult()
+
+        err = self.ensure_partitions(now.date())
+        if err:
+            logger.error(f"Failed to create login face partitions: {err.message}")
+        else:
+            result.partitions_created_until = add_months(
+                now.date().replace(day=1), self._months_ahead
+            )
+
+        cutoff = (now - timedelta(days=self._retention_days)).date()
+        attached, err = self._partition_repository.list_login_partitions(attached=True)
+        if err:
+            logger.error(f"Failed to list login face partitions: {err.message}")
+            return result
+        for name in attached:
+            month = _partition_month(name)
+            # Only detach months whose whole range is past the cutoff.
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            err = self._partition_repository.detach_login_partition(name)
+            if err:
+                logger.error(f"Failed to detach {name}: {err.message}")
+                result.partitions_failed.append(name)
+            else:
+                result.partitions_detached.append(name)
+
+        # Includes partitions detached by earlier runs that did not finish.
+        detached, err = self._partition_repository.list_login_partitions(attached=False)
+        if err:
+            logger.error(f"Failed to list detached face partitions: {err.message}")
+            return result
+        with ThreadPoolExecutor(
+            max_workers=self._delete_workers, thread_name_prefix="face-retention"
+        ) as executor:
+            for name in detached:
+                deleted, err = self._purge_partition(name, executor)
+                result.objects_deleted += deleted
+                if err:
+                    logger.error(f"Failed to purge {name}: {err.message}")
+                    result.partitions_failed.append(name)
+                    continue
+                err = self._partition_repository.drop_detached_partition(name)
+                if err:
+                    logger.error(f"Failed to drop {name}: {err.message}")
+                    result.partitions_failed.append(name)
+                else:
+                    result.partitions_dropped.append(name)
+
+        logger.info(
+            f"Face retention finished: detached={len(result.partitions_detached)} "
+            f"dropped={len(result.partitions_dropped)} "
+            f"failed={len(result.partitions_failed)} "
+            f"objects_deleted={result.objects_deleted}"
+        )
+        return result
+
+    def _purge_partition(
+        self, name: str, executor: ThreadPoolExecutor
+    ) -> tuple[int, Error | None]:
+        checkpoint, err = self._partition_repository.get_checkpoint(name)
+        if err:
+            return 0, err
+        last_id = checkpoint.last_id if checkpoint else 0
+        total = checkpoint.objects_deleted if checkpoint else 0
+        deleted_now = 0
+        if last_id:
+            logger.info(f"Resuming purge of {name} after id {last_id}")
+
+        while True:
+            rows, err = self._partition_repository.fetch_source_images(
+                name, last_id, self._batch_size
+            )
+            if err:
+                return deleted_now, err
+            if not rows:
+                return deleted_now, None
+
+            names = []
+            for _, urls in rows:
+                for url in urls or []:
+                    object_name = self._object_storage.object_name_from_url(url)
+                    if object_name:
+                        names.append(object_name)
+
+            failed = []
+            chunks = [
+                names[i : i + _DELETE_CHUNK_SIZE]
+                for i in range(0, len(names), _DELETE_CHUNK_SIZE)
+            ]
+            for chunk_failed in executor.map(self._delete_chunk, chunks):
+                failed.extend(chunk_failed)
+            if failed:
+                # Keep the checkpoint before this batch; deletes are idempotent
+                # so the next run simply retries it.
+                return deleted_now, Error(
+                    ErrStorageError.code,
+                    f"{len(failed)} storage objects could not be deleted",
+                )
+
+            last_id = rows[-1][0]
+            deleted_now += len(names)
+            total += len(names)
+            err = self._partition_repository.save_checkpoint(name, last_id, total)
+            if err:
+                return deleted_now, err
+
+    def _delete_chunk(self, names: list[str]) -> list[str]:
+        self._rate_limiter.acquire(len(names))
+        return self._object_storage.delete_objects(names)
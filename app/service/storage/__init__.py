@@ -0,0 +1,15 @@
+from app.service.storage.hedged_uploader import (
+    HedgedUploader as HedgedUploader,
+    UploadedObject as UploadedObject,
+)
+from app.service.storage.object_storage import (
+    FirebaseObjectStorage as FirebaseObjectStorage,
+    InMemoryObjectStorage as InMemoryObjectStorage,
+    ObjectStorage as ObjectStorage,
+    StorageObject as StorageObject,
+)
+from app.service.storage.storage_gc_service import (
+    StorageGcResult as StorageGcResult,
+    StorageGcService as StorageGcService,
+)
+from app.service.storage.upload_scheduler import UploadScheduler as UploadScheduler
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import configs
+from app.core.constants import UploadPriority
+from app.core.executors import ExecutorRejectedError, executors
+from app.core.metrics import registry
+from app.service.storage.upload_scheduler import UploadScheduler
+
+logger = logging.getLogger(__name__)
+
+# Recent attempt latencies the hedge delay is computed from.
+_LATENCY_SAMPLES = 256
+# No hedging until this many samples exist; early percentiles are noise.
+_MIN_LATENCY_SAMPLES = 20
+# Unused hedge budget is capped so a quiet period cannot fund a burst.
+_MAX_HEDGE_CREDITS = 10.0
+
+_attempts = registry.counter(
+    "storage_upload_attempts_total", "Storage upload attempts", ["outcome"]
+)
+_retries = registry.counter(
+    "storage_upload_retries_total", "Storage uploads retried after an error"
+)
+_hedges = registry.counter(
+    "storage_upload_hedges_total",
+    "Hedged uploads started, by result (won, lost, failed)",
+    ["result"],
+)
+_hedges_skipped = registry.counter(
+    "storage_upload_hedges_skipped_total",
+    "Slow uploads that were not hedged",
+    ["reason"],
+)
+_hedge_delay = registry.gauge(
+    "storage_upload_hedge_delay_seconds", "Current delay before an upload is hedged"
+)
+_cleanups = registry.counter(
+    "storage_upload_cleanup_total",
+    "Objects written by losing hedges, by cleanup outcome",
+    ["outcome"],
+)
+
+
+@dataclass(frozen=True, slots=True)
+class UploadedObject:
+    """The stored copy of an upload. Digests are base64, as Cloud Storage
+    reports them, and ``None`` when the response did not include them."""
+
+    name: str
+    url: str
+    size: int
+    content_type: str | None
+    md5_hash: str | None
+    crc32c: str | None
+
+
+class _Upload:
+    """One attempt to write ``data`` under ``name``.
+
+    ``put`` runs on a storage thread. ``abandon`` tells whether the write
+    already started; if not, ``put`` becomes a no-op.
+    """
+
+    def __init__(self, bucket, name: str, data: bytes, content_type: str | None):
+        self.blob = bucket.blob(name)
+        self._data = data
+        self._content_type = content_type
+        self._lock = threading.Lock()
+        self._started = False
+        self._abandoned = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def put(self) -> bool:
+        with self._lock:
+            if self._abandoned:
+                return False
+            self._started = True
+        self.blob.upload_from_string(self._data, content_type=self._content_type)
+        return True
+
+    def abandon(self) -> bool:
+        """Stop the write if it has not started; returns whether it had."""
+        with self._lock:
+            self._abandoned = True
+            return self._started
+
+
+class HedgedUploader:
+    """Retried, hedged storage uploads on top of ``UploadScheduler``.
+
+    Failed attempts are retried under a new object name with full-jitter
+    exponential backoff; an open storage circuit is never retried. An
+    attempt still running after the hedge delay (a percentile of recent
+    attempt latencies) gets a duplicate upload under a distinct name, and
+    whichever copy finishes first wins. The losing copy is skipped if it
+    has not started yet, or deleted once it finishes.
+
+    Hedges are paid from a budget that earns ``hedge_budget_percent / 100``
+    of a hedge per attempt, so they never add more than that share of
+    extra uploads.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        scheduler: UploadScheduler,
+        max_attempts: int = configs.UPLOAD_MAX_ATTEMPTS,
+        retry_base_seconds: float = configs.UPLOAD_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = configs.UPLOAD_RETRY_MAX_SECONDS,
+        hedge_percentile: float = configs.UPLOAD_HEDGE_PERCENTILE,
+        hedge_min_delay_seconds: float = configs.UPLOAD_HEDGE_MIN_DELAY_SECONDS,
+        hedge_budget_percent: float = configs.UPLOAD_HEDGE_BUDGET_PERCENT,
+    ) -> None:
+        self._scheduler = scheduler
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self._hedge_percentile = min(max(hedge_percentile, 0.0), 100.0)
+        self._hedge_min_delay_seconds = hedge_min_delay_seconds
+        self._hedge_credit_per_attempt = max(hedge_budget_percent, 0.0) / 100
+        self._hedge_credits = 0.0
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        logger.info(
+            f"HedgedUploader initialized (attempts={self._max_attempts}, "
+            f"hedge p{self._hedge_percentile:g}, "
+            f"budget={hedge_budget_percent:g}%)"
+        )
+
+    def hedge_delay(self) -> float | None:
+        """Seconds before an attempt is hedged, or ``None`` while hedging is off."""
+        if (
+            self._hedge_credit_per_attempt <= 0
+            or len(self._latencies) < _MIN_LATENCY_SAMPLES
+        ):
+            return None
+        ordered = sorted(self._latencies)
+        index = round(self._hedge_percentile / 100 * (len(ordered) - 1))
+        return max(self._hedge_min_delay_seconds, ordered[index])
+
+    async def upload(
+        self,
+        priority: UploadPriority,
+        request_id: Hashable,
+        bucket,
+        object_name: Callable[[], str],
+        data: bytes,
+        content_type: str | None = None,
+    ) -> UploadedObject:
+        """Upload ``data`` and describe the copy that was kept.
+
+        ``object_name`` is called for every copy and must return a new name
+        each time, so copies never overwrite each other.
+        """
+        attempt = 1
+        while True:
+            try:
+                return await self._attempt(
+                    priority, request_id, bucket, object_name, data, content_type
+                )
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if attempt >= self._max_attempts:
+                    raise
+                backoff = random.uniform(
+                    0,
+                    min(
+                        self._retry_max_seconds,
+                        self._retry_base_seconds * 2 ** (attempt - 1),
+                    ),
+                )
+                _retries.inc()
+                logger.warning(
+                    f"Storage upload attempt {attempt} failed for {request_id}, "
+                    f"retrying in {backoff:.2f}s: {e}"
+                )
+                await asyncio.sleep(backoff)
+                attempt += 1
+
+    async def _attempt(
+        self,
+        priority: UploadPriority,
+        request_id: Hashable,
+        bucket,
+        object_name: Callable[[], str],
+        data: bytes,
+        content_type: str | None,
+    ) -> UploadedObject:
+        started_at = time.perf_counter()
+        self._hedge_credits = min(
+            _MAX_HEDGE_CREDITS, self._hedge_credits + self._hedge_credit_per_attempt
+        )
+        primary = _Upload(bucket, object_name(), data, content_type)
+        tasks = {self._start(priority, request_id, primary): primary}
+        winner: _Upload | None = None
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                _hedge_delay.set(delay)
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    hedge = self._hedge(
+                        bucket, object_name, data, content_type, primary
+                    )
+                    if hedge is not None:
+                        tasks[self._start(priority, request_id, hedge)] = hedge
+
+            error: BaseException | None = None
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        winner = winner or tasks[task]
+                        continue
+                    error = error or task.exception()
+                    if tasks[task] is not primary:
+                        _hedges.inc(result="failed")
+
+            if winner is None:
+                _attempts.inc(outcome="error")
+                raise error or asyncio.CancelledError()
+            _attempts.inc(outcome="ok")
+            self._latencies.append(time.perf_counter() - started_at)
+            if len(tasks) > 1:
+                _hedges.inc(result="lost" if winner is primary else "won")
+            blob = winner.blob
+            return UploadedObject(
+                name=blob.name,
+                url=blob.public_url,
+                size=len(data),
+                content_type=content_type,
+                md5_hash=blob.md5_hash,
+                crc32c=blob.crc32c,
+            )
+        finally:
+            for task, upload in tasks.items():
+                if upload is not winner:
+                    self._discard(task, upload)
+
+    def _hedge(
+        self,
+        bucket,
+        object_name: Callable[[], str],
+        data: bytes,
+        content_type: str | None,
+        primary: _Upload,
+    ) -> _Upload | None:
+        if not primary.started:
+            # Still waiting for a slot; a copy would queue right behind it.
+            _hedges_skipped.inc(reason="queued")
+            return None
+        if self._hedge_credits < 1:
+            _hedges_skipped.inc(reason="budget")
+            return None
+        self._hedge_credits -= 1
+        return _Upload(bucket, object_name(), data, content_type)
+
+    def _start(
+        self, priority: UploadPriority, request_id: Hashable, upload: _Upload
+    ) -> asyncio.Task:
+        return asyncio.ensure_future(
+            self._scheduler.run(priority, request_id, upload.put)
+        )
+
+    def _discard(self, task: asyncio.Task, upload: _Upload) -> None:
+        if not upload.abandon():
+            # Queued for a slot or a storage thread; the scheduler gives
+            # the slot back without counting it against storage.
+            task.cancel()
+            return
+        # Already writing: let it finish, then delete what it wrote.
+        if task.done():
+            self._cleanup(task, upload)
+        else:
+            task.add_done_callback(lambda t: self._cleanup(t, upload))
+
+    @staticmethod
+    def _cleanup(task: asyncio.Task, upload: _Upload) -> None:
+        if task.cancelled() or task.exception() is not None or not task.result():
+            return
+        try:
+            executors.storage.submit(_delete_blob, upload.blob)
+        except ExecutorRejectedError:
+            # storage-gc removes it once the grace period has passed.
+            _cleanups.inc(outcome="skipped")
+            logger.warning(f"Storage pool full, left hedge copy {upload.blob.name}")
+
+
+def _delete_blob(blob) -> None:
+    try:
+        blob.delete()
+        _cleanups.inc(outcome="deleted")
+    except Exception as e:
+        _cleanups.inc(outcome="failed")
+        logger.warning(f"Failed to delete losing upload copy {blob.name}: {e}")
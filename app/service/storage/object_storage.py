@@ -0,0 +1,134 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+from urllib.parse import quote, unquote
+
+from google.api_core.exceptions import NotFound
+
+from app.core.firebase import get_bucket
+
+logger = logging.getLogger(__name__)
+
+_PUBLIC_URL_PREFIX = "https://storage.googleapis.com/"
+
+
+@dataclass(frozen=True)
+class StorageObject:
+    name: str
+    updated: datetime
+    size: int
+
+
+class ObjectStorage(ABC):
+    """Minimal object-store interface used by the cleanup workers."""
+
+    def __init__(self, bucket_name: str) -> None:
+        self._bucket_name = bucket_name
+
+    def url_for(self, name: str) -> str:
+        """Public URL of ``name``, matching what uploads store in the DB."""
+        return f"{_PUBLIC_URL_PREFIX}{self._bucket_name}/{quote(name, safe='/~')}"
+
+    def object_name_from_url(self, url: str) -> str | None:
+        """Map a stored ``blob.public_url`` back to its object name.
+
+        Returns ``None`` for URLs that don't point into this bucket.
+        """
+        prefix = f"{_PUBLIC_URL_PREFIX}{self._bucket_name}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return unquote(url[len(prefix) :])
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> Iterator[StorageObject]:
+        """Yield objects under ``prefix`` in ascending (byte-wise) name order."""
+
+    @abstractmethod
+    def delete_objects(self, names: list[str]) -> list[str]:
+        """Delete ``names``; missing objects count as deleted.
+
+        Returns the names that could not be deleted.
+        """
+
+
+class FirebaseObjectStorage(ObjectStorage):
+    def __init__(self, bucket_name: str) -> None:
+        super().__init__(bucket_name)
+        self._bucket = None
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            self._bucket = get_bucket()
+        return self._bucket
+
+    def list_objects(self, prefix: str) -> Iterator[StorageObject]:
+        # GCS lists in lexicographic order and pages lazily.
+        for blob in self._get_bucket().list_blobs(
+            prefix=prefix, fields="items(name,updated,size),nextPageToken"
+        ):
+            yield StorageObject(name=blob.name, updated=blob.updated, size=blob.size)
+
+    def delete_objects(self, names: list[str]) -> list[str]:
+        if not names:
+            return []
+        bucket = self._get_bucket()
+        try:
+            # One HTTP round trip for up to 100 deletes.
+            with bucket.client.batch():
+                for name in names:
+                    bucket.delete_blob(name)
+            return []
+        except Exception as e:
+            # The batch doesn't say which sub-request failed (an already
+            # deleted object is enough), so fall back to one call per object.
+            logger.info(f"Batch delete failed, retrying individually: {e}")
+
+        failed = []
+        for name in names:
+            try:
+                bucket.delete_blob(name)
+            except NotFound:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to delete storage object {name}: {e}")
+                failed.append(name)
+        return failed
+
+
+class InMemoryObjectStorage(ObjectStorage):
+    """Local stand-in for tests and development without a bucket."""
+
+    def __init__(self, bucket_name: str = "local") -> None:
+        super().__init__(bucket_name)
+        self._lock = threading.Lock()
+        self._objects: dict[str, StorageObject] = {}
+
+    def put(self, name: str, size: int = 0, updated: datetime | None = None) -> str:
+        with self._lock:
+            self._objects[name] = StorageObject(
+                name=name,
+                updated=updated or datetime.now(timezone.utc),
+                size=size,
+            )
+        return self.url_for(name)
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return sorted(self._objects)
+
+    def list_objects(self, prefix: str) -> Iterator[StorageObject]:
+        with self._lock:
+            matching = sorted(
+                (obj for name, obj in self._objects.items() if name.startswith(prefix)),
+                key=lambda obj: obj.name.encode("utf-8"),
+            )
+        yield from matching
+
+    def delete_objects(self, names: list[str]) -> list[str]:
+        with self._lock:
+            for name in names:
+                self._objects.pop(name, None)
+        return []
@@ -0,0 +1,123 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+from urllib.parse import quote
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import ErrInternalError
+from app.repository import UserFaceRepository
+from app.service.base.base_service import BaseService
+from app.service.storage.object_storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+# GCS batch requests accept at most 100 sub-requests.
+_DELETE_BATCH_SIZE = 100
+
+
+def _needs_escaping(name: str) -> bool:
+    # URL byte order only matches object name order for names that appear
+    # unescaped in the URL; uploads only generate such names.
+    return quote(name, safe="/~") != name
+
+
+@dataclass
+class StorageGcResult:
+    scanned: int = 0
+    referenced: int = 0
+    too_recent: int = 0
+    deleted: int = 0
+    bytes_deleted: int = 0
+    failed: int = 0
+
+
+class StorageGcService(BaseService):
+    """Deletes uploaded face images that no ``tb_user_faces`` row references.
+
+    Uploads land in storage before their DB row is written, so a failed
+    save (or a superseded enrollment pose) leaves objects behind. The bucket
+    listing and the referenced URLs are both streamed in byte order and
+    merge-joined, so memory stays bounded regardless of bucket size. Objects
+    younger than the grace period are skipped because their row may not be
+    committed yet.
+    """
+
+    def __init__(
+        self,
+        user_face_repository: UserFaceRepository,
+        object_storage: ObjectStorage,
+        grace_period: timedelta = timedelta(hours=configs.STORAGE_GC_GRACE_HOURS),
+    ) -> None:
+        self._user_face_repository = user_face_repository
+        self._object_storage = object_storage
+        self._grace_period = grace_period
+        super().__init__(user_face_repository)
+        logger.info("StorageGcService initialized")
+
+    def _referenced_names(self, prefix: str) -> Iterator[str]:
+        storage = self._object_storage
+        for url in self._user_face_repository.iter_referenced_urls(
+            storage.url_for(prefix)
+        ):
+            name = storage.object_name_from_url(url)
+            if name is not None and not _needs_escaping(name):
+                yield name
+
+    def collect(
+        self,
+        prefix: str = configs.GCS_UPLOAD_PREFIX,
+        now: datetime | None = None,
+        dry_run: bool = False,
+    ) -> tuple[StorageGcResult, Error | None]:
+        prefix = prefix.strip("/")
+        prefix = f"{prefix}/" if prefix else ""
+        cutoff = (now or datetime.now(timezone.utc)) - self._grace_period
+        result = StorageGcResult()
+        batch: list[tuple[str, int]] = []
+
+        def flush() -> None:
+            failed = (
+                set()
+                if dry_run
+                else set(self._object_storage.delete_objects([n for n, _ in batch]))
+            )
+            for name, size in batch:
+                if name in failed:
+                    result.failed += 1
+                else:
+                    result.deleted += 1
+                    result.bytes_deleted += size
+            batch.clear()
+
+        try:
+            references = self._referenced_names(prefix)
+            reference = next(references, None)
+            for obj in self._object_storage.list_objects(prefix):
+                result.scanned += 1
+                while reference is not None and reference < obj.name:
+                    reference = next(references, None)
+                if obj.name == reference or _needs_escaping(obj.name):
+                    # Escaped names can't be merge-joined; never delete them.
+                    result.referenced += 1
+                    continue
+                if obj.updated > cutoff:
+                    result.too_recent += 1
+                    continue
+                batch.append((obj.name, obj.size or 0))
+                if len(batch) >= _DELETE_BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+        except Exception as e:
+            logger.error(f"Storage GC aborted: {str(e)}", exc_info=True)
+            return result, Error(ErrInternalError.code, f"Storage GC aborted: {str(e)}")
+
+        logger.info(
+            f"Storage GC finished{' (dry run)' if dry_run else ''}: "
+            f"scanned={result.scanned} referenced={result.referenced} "
+            f"too_recent={result.too_recent} deleted={result.deleted} "
+            f"bytes={result.bytes_deleted} failed={result.failed}"
+        )
+        return result, None
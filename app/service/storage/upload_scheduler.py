@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Hashable, TypeVar
+
+from app.core.circuit_breaker import CircuitBreaker, breakers
+from app.core.config import configs
+from app.core.constants import UploadPriority
+from app.core.executors import executors
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# While sign-up uploads are waiting, at most this many login uploads are
+# started in a row so sign-ups cannot starve.
+_MAX_CONSECUTIVE_PRIORITY_GRANTS = 4
+# Multiplicative decrease on errors and on latency above the tolerance.
+_ERROR_BACKOFF = 0.7
+_LATENCY_BACKOFF = 0.9
+# How quickly the latency baseline follows slower uploads (faster ones reset it).
+_BASELINE_DRIFT = 0.01
+
+_limit_gauge = registry.gauge(
+    "upload_scheduler_limit", "Current adaptive storage upload concurrency limit"
+)
+_in_flight_gauge = registry.gauge(
+    "upload_scheduler_in_flight", "Storage uploads currently running"
+)
+_queued_gauge = registry.gauge(
+    "upload_scheduler_queued", "Storage uploads waiting for a slot", ["priority"]
+)
+_wait_histogram = registry.histogram(
+    "upload_scheduler_wait_seconds",
+    "Time uploads waited for a slot",
+    ["priority"],
+)
+_latency_histogram = registry.histogram(
+    "upload_scheduler_upload_seconds", "Storage upload latency", ["outcome"]
+)
+_limit_changes = registry.counter(
+    "upload_scheduler_limit_decreases_total",
+    "Times the limit was reduced",
+    ["reason"],
+)
+
+
+class UploadScheduler:
+    """Process-wide, adaptive limit on concurrent storage uploads.
+
+    The limit grows additively while uploads are saturating it at healthy
+    latency and shrinks multiplicatively on errors or when latency rises
+    well above the observed baseline (AIMD). Waiting uploads are served by
+    priority (login before sign-up) and round-robin across requests within
+    a priority, so one large request cannot hold every slot.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = configs.UPLOAD_CONCURRENCY_INITIAL,
+        min_limit: int = configs.UPLOAD_CONCURRENCY_MIN,
+        max_limit: int = configs.UPLOAD_CONCURRENCY_MAX,
+        latency_tolerance: float = configs.UPLOAD_LATENCY_TOLERANCE,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self._breaker = breaker or breakers.storage
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self._min_limit), self._max_limit))
+        self._latency_tolerance = latency_tolerance
+        self._baseline: float | None = None
+        self._in_flight = 0
+        self._consecutive_priority_grants = 0
+        # priority -> request id -> waiters of that request, FIFO
+        self._waiters: dict[
+            UploadPriority, OrderedDict[Hashable, deque[asyncio.Future]]
+        ] = {priority: OrderedDict() for priority in UploadPriority}
+        _limit_gauge.set(self._limit)
+        _in_flight_gauge.set(0)
+        logger.info(
+            f"UploadScheduler initialized (limit={self._limit:.0f}, "
+            f"min={self._min_limit}, max={self._max_limit})"
+        )
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queued(self, priority: UploadPriority | None = None) -> int:
+        priorities = [priority] if priority is not None else list(UploadPriority)
+        return sum(
+            len(waiters) for p in priorities for waiters in self._waiters[p].values()
+        )
+
+    async def run(
+        self,
+        priority: UploadPriority,
+        request_id: Hashable,
+        fn: Callable[..., T],
+        *args,
+        **kwargs,
+    ) -> T:
+        """Run the blocking upload ``fn`` on the storage pool once a slot is free.
+
+        Raises ``CircuitOpenError`` without queueing while storage is failing.
+        """
+        self._breaker.check()
+        try:
+            await self._acquire(priority, request_id)
+        except BaseException:
+            self._breaker.cancel()
+            raise
+        started_at = time.perf_counter()
+        try:
+            result = await executors.storage.run(fn, *args, **kwargs)
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. a losing hedge); that says nothing
+            # about storage health, so neither the breaker nor the limit
+            # learns from it.
+            self._breaker.cancel()
+            self._in_flight -= 1
+            self._dispatch()
+            raise
+        except BaseException:
+            self._finish(started_at, failed=True)
+            raise
+        self._finish(started_at, failed=False)
+        return result
+
+    def _finish(self, started_at: float, failed: bool) -> None:
+        latency = time.perf_counter() - started_at
+        self._breaker.record(latency, failed)
+        self._release(latency, failed)
+
+    async def _acquire(self, priority: UploadPriority, request_id: Hashable) -> None:
+        queued_at = time.perf_counter()
+        if self._in_flight < self.limit and self.queued() == 0:
+            self._in_flight += 1
+            _in_flight_gauge.set(self._in_flight)
+            _wait_histogram.observe(0.0, priority=priority.name.lower())
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[priority].setdefault(request_id, deque()).append(future)
+        self._update_queued_gauge(priority)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted and cancelled in the same tick: hand the slot on.
+                self._in_flight -= 1
+                self._dispatch()
+            else:
+                self._discard(priority, request_id, future)
+            raise
+        _wait_histogram.observe(
+            time.perf_counter() - queued_at, priority=priority.name.lower()
+        )
+
+    def _release(self, latency: float, failed: bool) -> None:
+        self._in_flight -= 1
+        self._adapt(latency, failed)
+        self._dispatch()
+
+    def _adapt(self, latency: float, failed: bool) -> None:
+        _latency_histogram.observe(latency, outcome="error" if failed else "ok")
+        if failed:
+            self._decrease(_ERROR_BACKOFF, "error")
+            return
+
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline += (latency - self._baseline) * _BASELINE_DRIFT
+
+        if latency > self._baseline * self._latency_tolerance:
+            self._decrease(_LATENCY_BACKOFF, "latency")
+        elif self._in_flight + 1 >= self.limit:
+            # Only grow while the limit is actually the bottleneck:
+            # roughly +1 per limit's worth of completed uploads.
+            self._limit = min(self._max_limit, self._limit + 1.0 / self._limit)
+            _limit_gauge.set(self._limit)
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        new_limit = max(self._min_limit, self._limit * factor)
+        if new_limit < self._limit:
+            _limit_changes.inc(reason=reason)
+            if int(new_limit) < int(self._limit):
+                logger.info(
+                    f"Upload concurrency limit {int(self._limit)} -> "
+                    f"{int(new_limit)} ({reason})"
+                )
+            self._limit = new_limit
+            _limit_gauge.set(self._limit)
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.limit:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self._in_flight += 1
+            future.set_result(None)
+        _in_flight_gauge.set(self._in_flight)
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        for priority in self._grant_order():
+            requests = self._waiters[priority]
+            while requests:
+                request_id, waiters = next(iter(requests.items()))
+                future = waiters.popleft()
+                if waiters:
+                    # Round-robin: this request goes to the back of its class.
+                    requests.move_to_end(request_id)
+                else:
+                    del requests[request_id]
+                self._update_queued_gauge(priority)
+                if future.cancelled():
+                    continue
+                if priority == UploadPriority.LOGIN:
+                    self._consecutive_priority_grants += 1
+                else:
+                    self._consecutive_priority_grants = 0
+                return future
+        return None
+
+    def _grant_order(self) -> list[UploadPriority]:
+        order = sorted(UploadPriority)
+        if (
+            self._consecutive_priority_grants >= _MAX_CONSECUTIVE_PRIORITY_GRANTS
+            and self._waiters[UploadPriority.SIGNUP]
+        ):
+            order.remove(UploadPriority.SIGNUP)
+            order.insert(0, UploadPriority.SIGNUP)
+        return order
+
+    def _discard(
+        self, priority: UploadPriority, request_id: Hashable, future: asyncio.Future
+    ) -> None:
+        waiters = self._waiters[priority].get(request_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[priority][request_id]
+        self._update_queued_gauge(priority)
+
+    def _update_queued_gauge(self, priority: UploadPriority) -> None:
+        _queued_gauge.set(self.queued(priority), priority=priority.name.lower())
@@ -1 +1,10 @@
 from app.service.user.user_service import UserService as UserService
+from app.service.user.user_import_service import (
+    UserImportService as UserImportService,
+)
+from app.service.user.refresh_token_service import (
+    RefreshTokenService as RefreshTokenService,
+)
+from app.service.user.login_rate_limiter import (
+    LoginRateLimiter as LoginRateLimiter,
+)
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+import weakref
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.exceptions import ErrTooManyRequests
+from app.core.executors import executors
+from app.core.metrics import registry
+from app.repository import RateLimitRepository
+from app.util.email_address import normalize_email
+from app.util.rate_limiter import SlidingWindowLimiter
+
+logger = logging.getLogger(__name__)
+
+_rejected = registry.counter(
+    "login_rate_limited_total", "Login attempts refused by throttling", ["scope"]
+)
+_instances: "weakref.WeakSet[LoginRateLimiter]" = weakref.WeakSet()
+
+
+def _collect_keys():
+    counts: dict[str, int] = {}
+    for instance in list(_instances):
+        for scope, limiter in instance._local.items():
+            counts[scope] = counts.get(scope, 0) + len(limiter)
+    return [
+        ("login_rate_limiter_keys", {"scope": scope}, count)
+        for scope, count in counts.items()
+    ]
+
+
+registry.register_collector(
+    "login_rate_limiter_keys",
+    "Keys tracked by the in-process login limiter",
+    "gauge",
+    _collect_keys,
+)
+
+
+class LoginRateLimiter:
+    """Throttles login attempts per client IP and per account.
+
+    Runs before the credentials lookup and the PBKDF2 check, so an attempt
+    over the limit costs a dictionary lookup instead of a password hash.
+    With the "postgres" backend the counters are shared by all replicas;
+    if the database cannot be reached the in-process counters are used.
+    """
+
+    def __init__(
+        self,
+        rate_limit_repository: RateLimitRepository,
+        backend: str = configs.LOGIN_RATE_LIMIT_BACKEND,
+        per_email: int = configs.LOGIN_RATE_LIMIT_PER_EMAIL,
+        per_ip: int = configs.LOGIN_RATE_LIMIT_PER_IP,
+        window_seconds: float = configs.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+        max_keys: int = configs.LOGIN_RATE_LIMIT_MAX_KEYS,
+    ) -> None:
+        self._rate_limit_repository = rate_limit_repository
+        self._shared = backend == "postgres"
+        self._limits = {"ip": per_ip, "email": per_email}
+        self._window_seconds = window_seconds
+        self._local = {
+            scope: SlidingWindowLimiter(limit, window_seconds, max_keys=max_keys)
+            for scope, limit in self._limits.items()
+        }
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        _instances.add(self)
+        logger.info(f"LoginRateLimiter initialized (backend: {backend})")
+
+    async def check(
+        self, email: str, client_ip: str | None
+    ) -> tuple[float, Error | None]:
+        """Count one attempt; returns the seconds to wait when refused."""
+        # IP first, so a flood from one address does not use up the
+        # budget of the accounts it targets.
+        attempts = [("email", normalize_email(email))]
+        if client_ip:
+            attempts.insert(0, ("ip", client_ip))
+        for scope, value in attempts:
+            if self._limits[scope] <= 0:
+                continue
+            retry_after = await self._hit(scope, value)
+            if retry_after > 0:
+                _rejected.inc(scope=scope)
+                # Counted by the metric; a warning per refusal would flood logs.
+                logger.debug(f"Login throttled by {scope}: {value}")
+                return retry_after, ErrTooManyRequests
+        return 0.0, None
+
+    async def _hit(self, scope: str, value: str) -> float:
+        if not self._shared:
+            return self._local[scope].hit(value)
+        retry_after, err = await executors.db.run(
+            self._rate_limit_repository.hit,
+            f"login:{scope}:{value}",
+            self._limits[scope],
+            self._window_seconds,
+        )
+        if err:
+            return self._local[scope].hit(value)
+        if self._purge_due():
+            await executors.db.run(self._purge)
+        return retry_after
+
+    def _purge_due(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_purge < self._window_seconds:
+                return False
+            self._last_purge = now
+            return True
+
+    def _purge(self) -> None:
+        purged, err = self._rate_limit_repository.purge_stale(self._window_seconds)
+        if err:
+            logger.warning(f"Failed to purge login rate limits: {err.message}")
+        elif purged:
+            logger.info(f"Purged {purged} stale login rate limit keys")
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import secrets
+import threading
+import time
+import uuid
+
+from app.core.config import configs
+from app.core.ecode import Error
+from app.core.executors import executors
+from app.core.exceptions import ErrInvalidRefreshToken, ErrRefreshTokenReused
+from app.core.metrics import registry
+from app.repository import RefreshTokenOwner, RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+# secrets.token_urlsafe(32) yields 43 characters.
+_TOKEN_BYTES = 32
+_MAX_TOKEN_LENGTH = 128
+_PURGE_INTERVAL_SECONDS = 300
+_PURGE_BATCH_SIZE = 1000
+
+_refreshes = registry.counter(
+    "refresh_token_refreshes_total", "Refresh token exchanges, by outcome", ["outcome"]
+)
+
+
+def _hash(token: str) -> bytes:
+    # Tokens are 256-bit random values, so a plain digest is enough: there
+    # is nothing to brute-force that a slow password hash would protect.
+    return hashlib.sha256(token.encode("ascii", "replace")).digest()
+
+
+class RefreshTokenService:
+    """Issues and rotates opaque refresh tokens.
+
+    Every exchange marks the presented token used and issues a successor
+    in the same family. Presenting a used token again means it leaked (or
+    a client raced itself), so the whole family is revoked and the user
+    has to log in again.
+    """
+
+    def __init__(
+        self,
+        refresh_token_repository: RefreshTokenRepository,
+        ttl_seconds: int = configs.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    ) -> None:
+        self._refresh_token_repository = refresh_token_repository
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        logger.info("RefreshTokenService initialized")
+
+    async def issue(self, user_id: uuid.UUID) -> tuple[str | None, Error | None]:
+        """Start a new token family for a fresh login."""
+        token = secrets.token_urlsafe(_TOKEN_BYTES)
+        err = await executors.db.run(
+            self._refresh_token_repository.create,
+            _hash(token),
+            uuid.uuid4(),
+            user_id,
+            self._ttl_seconds,
+        )
+        if err:
+            logger.warning(
+                f"Failed to issue refresh token for {user_id}: {err.message}"
+            )
+            return None, err
+        if self._purge_due():
+            await executors.db.run(self._purge)
+        return token, None
+
+    async def refresh(
+        self, token: str
+    ) -> tuple[tuple[RefreshTokenOwner, str] | None, Error | None]:
+        """Exchange ``token`` for its successor; returns the owner and new token."""
+        if not token or len(token) > _MAX_TOKEN_LENGTH:
+            _refreshes.inc(outcome="invalid")
+            return None, ErrInvalidRefreshToken
+
+        token_hash = _hash(token)
+        new_token = secrets.token_urlsafe(_TOKEN_BYTES)
+        owner, err = await executors.db.run(
+            self._refresh_token_repository.rotate,
+            token_hash,
+            _hash(new_token),
+            self._ttl_seconds,
+        )
+        if err:
+            _refreshes.inc(outcome="error")
+            return None, err
+        if owner is not None:
+            _refreshes.inc(outcome="ok")
+            return (owner, new_token), None
+        return None, await executors.db.run(self._reject, token_hash)
+
+    def _reject(self, token_hash: bytes) -> Error:
+        state, err = self._refresh_token_repository.get_state(token_hash)
+        if err:
+            _refreshes.inc(outcome="error")
+            return err
+        if state is None or state["revoked"] or state["expired"] or not state["used"]:
+            _refreshes.inc(outcome="invalid")
+            return ErrInvalidRefreshToken
+
+        revoked, err = self._refresh_token_repository.revoke_family(state["family_id"])
+        _refreshes.inc(outcome="reused")
+        if err:
+            logger.error(
+                f"Refresh token reuse in family {state['family_id']}, "
+                f"revocation failed: {err.message}"
+            )
+        else:
+            logger.warning(
+                f"Refresh token reuse in family {state['family_id']}, "
+                f"revoked {revoked} tokens"
+            )
+        return ErrRefreshTokenReused
+
+    def _purge_due(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+                return False
+            self._last_purge = now
+            return True
+
+    def _purge(self) -> None:
+        purged, err = self._refresh_token_repository.purge_expired(_PURGE_BATCH_SIZE)
+        if err:
+            logger.warning(f"Failed to purge expired refresh tokens: {err.message}")
+        elif purged:
+            logger.info(f"Purged {purged} expired refresh tokens")
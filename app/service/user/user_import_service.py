@@ -0,0 +1,207 @@
+import csv
+import json
+import logging
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Iterable, Iterator, Optional
+
+from app.repository import UserRepository
+from app.service.base.base_service import BaseService
+from app.util.email_address import normalize_email
+from app.util.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+_PASSWORD_HASH_RE = re.compile(r"^[0-9a-f]{32}\$[0-9a-f]{64}$")
+# Fields that must be text (or absent); ``password`` may be any scalar.
+_TEXT_FIELDS = ("email", "password_hashed", "full_name", "phone_number")
+
+
+@dataclass
+class UserImportResult:
+    processed: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.processed / self.elapsed_seconds
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield ``(line_no, record)`` pairs from a CSV (with header) or NDJSON stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = {"__error__": f"invalid JSON: {e.msg}"}
+            if not isinstance(record, dict):
+                record = {"__error__": "record is not a JSON object"}
+            yield line_no, record
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _hash_row(row: dict) -> dict:
+    # Top-level so it can be pickled into the process pool.
+    if row.get("password_hashed") is None:
+        row["password_hashed"] = hash_password(row.pop("password"))
+    else:
+        row.pop("password", None)
+    return row
+
+
+class UserImportService(BaseService):
+    """Bulk-loads users from legacy exports.
+
+    Passwords are hashed across a process pool (pre-hashed values are taken
+    as-is) while the previous batch is COPY-loaded, and rejected rows are
+    written to ``error_out`` as NDJSON instead of aborting the import.
+    """
+
+    def __init__(self, user_repository: UserRepository) -> None:
+        self._user_repository = user_repository
+        super().__init__(user_repository)
+        logger.info("UserImportService initialized")
+
+    @staticmethod
+    def _validate(line_no: int, record: dict) -> tuple[dict | None, str | None]:
+        if "__error__" in record:
+            return None, record["__error__"]
+
+        for field in _TEXT_FIELDS:
+            if not isinstance(record.get(field), (str, type(None))):
+                return None, f"invalid {field} type"
+
+        email = normalize_email(record.get("email") or "")
+        if not email or "@" not in email:
+            return None, "invalid email"
+
+        password = record.get("password")
+        password = str(password) if password not in (None, "") else None
+        password_hashed = (record.get("password_hashed") or "").strip() or None
+        if password_hashed is not None:
+            if not _PASSWORD_HASH_RE.match(password_hashed):
+                return None, "invalid password_hashed format"
+        elif password is None:
+            return None, "missing password or password_hashed"
+
+        return {
+            "line_no": line_no,
+            "email": email,
+            "password": password,
+            "password_hashed": password_hashed,
+            "full_name": (record.get("full_name") or "").strip() or None,
+            "phone_number": (record.get("phone_number") or "").strip() or None,
+        }, None
+
+    @staticmethod
+    def _write_error(
+        error_out: IO[str], line_no: int, email: Optional[str], reason: str
+    ) -> None:
+        error_out.write(
+            json.dumps({"line": line_no, "email": email, "reason": reason}) + "\n"
+        )
+
+    def _load_batch(
+        self, rows: list[dict], error_out: IO[str], result: UserImportResult
+    ) -> None:
+        inserted, err = self._user_repository.bulk_insert(rows)
+        if err:
+            for row in rows:
+                self._write_error(error_out, row["line_no"], row["email"], err.message)
+            result.failed += len(rows)
+            return
+
+        for row in rows:
+            if row["email"] in inserted:
+                # Only the first line for an email can have been inserted.
+                inserted.discard(row["email"])
+                result.inserted += 1
+            else:
+                self._write_error(error_out, row["line_no"], row["email"], "duplicate")
+                result.duplicates += 1
+
+    def import_users(
+        self,
+        records: Iterable[tuple[int, dict]],
+        error_out: IO[str],
+        batch_size: int = 5000,
+        workers: int = 1,
+    ) -> UserImportResult:
+        result = UserImportResult()
+        started_at = time.perf_counter()
+        executor: Executor | None = (
+            ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        )
+        chunksize = max(1, batch_size // max(1, workers * 4))
+
+        def hashed(rows: list[dict]) -> Iterator[dict]:
+            if executor is None:
+                return map(_hash_row, rows)
+            return executor.map(_hash_row, rows, chunksize=chunksize)
+
+        try:
+            records = iter(records)
+            pending: Iterator[dict] | None = None
+            while True:
+                chunk = list(islice(records, batch_size))
+                batch = []
+                for line_no, record in chunk:
+                    result.processed += 1
+                    row, reason = self._validate(line_no, record)
+                    if reason:
+                        self._write_error(
+                            error_out, line_no, record.get("email"), reason
+                        )
+                        result.invalid += 1
+                    else:
+                        batch.append(row)
+
+                # Start hashing this batch before loading the previous one so
+                # the pool stays busy while COPY runs.
+                current = hashed(batch) if batch else None
+                if pending is not None:
+                    self._load_batch(list(pending), error_out, result)
+                    self._log_progress(result, started_at)
+                pending = current
+
+                if not chunk:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        result.elapsed_seconds = time.perf_counter() - started_at
+        logger.info(
+            f"User import finished: processed={result.processed} "
+            f"inserted={result.inserted} duplicates={result.duplicates} "
+            f"invalid={result.invalid} failed={result.failed} "
+            f"in {result.elapsed_seconds:.1f}s ({result.rows_per_second:.0f} rows/s)"
+        )
+        return result
+
+    @staticmethod
+    def _log_progress(result: UserImportResult, started_at: float) -> None:
+        elapsed = time.perf_counter() - started_at
+        rate = result.processed / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"User import progress: processed={result.processed} "
+            f"inserted={result.inserted} duplicates={result.duplicates} "
+            f"invalid={result.invalid} failed={result.failed} ({rate:.0f} rows/s)"
+        )
@@ -1,41 +1,115 @@
 import logging
+import uuid
 from typing import Optional
 
 from app.core.ecode import Error
+from app.core.executors import executors
 from app.core.exceptions import ErrInvalidCredentials
+from app.util.email_address import normalize_email
 from app.util.security import hash_password, verify_password
 from app.model import UserModel
-from app.repository import UserRepository
+from app.repository import UserCredentials, UserProfile, UserRepository
 from app.service.base.base_service import BaseService
+from app.service.idempotency.idempotency_service import IdempotencyService
 
 logger = logging.getLogger(__name__)
 
 
+def _identity(key):
+    return key
+
+
 class UserService(BaseService):
-    def __init__(self, user_repository: UserRepository) -> None:
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        idempotency_service: Optional[IdempotencyService] = None,
+    ) -> None:
         self._user_repository = user_repository
+        self._idempotency_service = idempotency_service
         super().__init__(user_repository)
         logger.info("UserService initialized")
 
-    def get_user_by_email(self, email: str) -> tuple[UserModel | None, Error | None]:
+    async def get_user_by_email(
+        self, email: str
+    ) -> tuple[UserProfile | None, Error | None]:
+        email = normalize_email(email)
         logger.info(f"Getting user by email: {email}")
-        user, error = self._user_repository.get_by_email(email)
+        user, error = await executors.db.run(self._user_repository.get_by_email, email)
         if error:
             logger.warning(f"Failed to get user '{email}': {error.message}")
         else:
             logger.info(f"Successfully retrieved user '{email}'")
         return user, error
 
-    def register_user(
+    async def get_users_batch(
+        self,
+        emails: Optional[list[str]] = None,
+        user_ids: Optional[list[uuid.UUID]] = None,
+    ) -> tuple[list[tuple[str, dict | None]] | None, Error | None]:
+        """Resolve many users at once.
+
+        Returns one ``(key, row)`` pair per requested key, in request order, with
+        ``row`` set to ``None`` for keys that matched no user.
+        """
+        if emails is not None:
+            keys, field, normalize = emails, "email", normalize_email
+            lookup = self._user_repository.get_many_by_emails
+        else:
+            keys, field, normalize = user_ids or [], "id", _identity
+            lookup = self._user_repository.get_many_by_ids
+
+        logger.info(f"Batch lookup of {len(keys)} users by {field}")
+        rows, error = await executors.db.run(
+            lookup, list(dict.fromkeys(normalize(key) for key in keys))
+        )
+        if error:
+            logger.warning(f"Batch lookup failed: {error.message}")
+            return None, error
+
+        # Rows stored before normalization may still hold mixed-case emails.
+        by_key = {normalize(row[field]): row for row in rows}
+        return [(str(key), by_key.get(normalize(key))) for key in keys], None
+
+    async def register_user(
         self,
         email: str,
         password: str,
         full_name: Optional[str] = None,
         phone_number: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[UserModel | None, Error | None]:
+        email = normalize_email(email)
+        if idempotency_key is None or self._idempotency_service is None:
+            return await self._register_user(email, password, full_name, phone_number)
+
+        # Replays return the originally created user without re-hashing.
+        return await self._idempotency_service.run_async(
+            scope="user.register",
+            key=idempotency_key,
+            fingerprint=IdempotencyService.fingerprint(
+                email, password, full_name, phone_number
+            ),
+            operation=lambda: self._register_user(
+                email, password, full_name, phone_number
+            ),
+            encode=lambda user: {"id": str(user.id), "email": user.email},
+            decode=lambda data: UserModel(
+                id=uuid.UUID(data["id"]), email=data["email"]
+            ),
+        )
+
+    async def _register_user(
+        self,
+        email: str,
+        password: str,
+        full_name: Optional[str],
+        phone_number: Optional[str],
     ) -> tuple[UserModel | None, Error | None]:
         logger.info(f"Registering user: {email}")
-        pwd_hash = hash_password(password)
-        user, error = self._user_repository.create(
+        pwd_hash = await executors.cpu.run(hash_password, password)
+        user, error = await executors.db.run(
+            self._user_repository.create,
             email=email,
             password_hashed=pwd_hash,
             full_name=full_name,
@@ -47,13 +121,18 @@ class UserService(BaseService):
             logger.info(f"Registered '{email}' successfully")
         return user, error
 
-    def login(self, email: str, password: str) -> tuple[UserModel | None, Error | None]:
+    async def login(
+        self, email: str, password: str
+    ) -> tuple[UserCredentials | None, Error | None]:
+        email = normalize_email(email)
         logger.info(f"Login attempt: {email}")
-        user, error = self._user_repository.get_by_email(email)
+        user, error = await executors.db.run(
+            self._user_repository.get_credentials_by_email, email
+        )
         if error:
             logger.warning(f"Login failed, user not found: {email}")
             return None, error
-        if not verify_password(password, user.password_hashed):
+        if not await executors.cpu.run(verify_password, password, user.password_hashed):
             logger.warning(f"Login failed, invalid credentials: {email}")
             return None, Error(ErrInvalidCredentials.code, "invalid email or password")
         logger.info(f"Login successful: {email}")
@@ -0,0 +1,9 @@
+def normalize_email(email: str) -> str:
+    """Canonical form used to store and look up emails.
+
+    Lookups compare against ``lower(email)`` (unique index
+    ``ux_tb_users_email_lower``), so this must stay in step with Postgres
+    ``lower()``: surrounding whitespace is dropped and the whole address,
+    local part included, is lower-cased.
+    """
+    return email.strip().lower()
@@ -0,0 +1,14 @@
+import os
+from typing import Callable
+
+
+def after_fork_in_child(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register ``callback`` to run in the child process after ``os.fork()``.
+
+    Meant as a decorator for module-level functions that drop state a forked
+    worker must not share with its parent (connections, threads, clients).
+    A no-op on platforms without ``os.register_at_fork``.
+    """
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=callback)
+    return callback
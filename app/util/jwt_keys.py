@@ -0,0 +1,165 @@
+"""Keys that sign and verify access tokens.
+
+Private keys are PEM files named ``<kid>.pem`` in ``jwt.signing_keys_dir``.
+The active key signs new tokens with its ``kid`` in the header. Every key in
+the directory verifies and is published as a JWKS, so other services can
+check tokens locally instead of calling back. Rotation: add the new key
+file and deploy (it is published but not used), switch ``active_kid`` once
+consumers have had ``jwks_max_age_seconds`` to refetch, and delete the old
+file after the last token it signed has expired.
+
+Keys are parsed once; verification looks the public key up by ``kid``.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt import InvalidTokenError
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from app.core.config import configs
+from app.core.metrics import registry
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+_verified = registry.counter(
+    "jwt_verified_total", "Access tokens verified, by signing algorithm", ["alg"]
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+    public_key: ec.EllipticCurvePublicKey | ed25519.Ed25519PublicKey
+
+    @classmethod
+    def from_private_key(cls, kid: str, private_key) -> "SigningKey":
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            algorithm = "EdDSA"
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(
+            private_key.curve, ec.SECP256R1
+        ):
+            algorithm = "ES256"
+        else:
+            raise ValueError(f"JWT key {kid}: only P-256 and Ed25519 are supported")
+        return cls(kid, algorithm, private_key, private_key.public_key())
+
+    def jwk(self) -> dict:
+        encoder = OKPAlgorithm if self.algorithm == "EdDSA" else ECAlgorithm
+        jwk = encoder.to_jwk(self.public_key, as_dict=True)
+        jwk.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return jwk
+
+
+class KeyRing:
+    """Signs with the active key; verifies by ``kid`` or, if allowed, HS256."""
+
+    def __init__(
+        self,
+        keys: Mapping[str, SigningKey],
+        active_kid: str = "",
+        secret_key: str = configs.JWT_SECRET_KEY,
+        secret_algorithm: str = configs.JWT_ALGORITHM,
+        accept_secret: bool = configs.JWT_ACCEPT_HS256,
+    ) -> None:
+        if keys and not active_kid:
+            active_kid = max(keys)
+        if keys and active_kid not in keys:
+            raise ValueError(f"JWT active kid {active_kid!r} has no key file")
+        self._keys = dict(keys)
+        self._active = self._keys.get(active_kid)
+        self._secret_key = secret_key
+        self._secret_algorithm = secret_algorithm
+        # Without asymmetric keys the secret is the only way to verify.
+        self._accept_secret = accept_secret or not keys
+
+        self.jwks = dumps(
+            {"keys": [self._keys[kid].jwk() for kid in sorted(self._keys)]}
+        )
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_directory(cls, path: str | Path, **kwargs) -> "KeyRing":
+        keys = {}
+        for pem in sorted(Path(path).glob("*.pem")):
+            private_key = load_pem_private_key(pem.read_bytes(), password=None)
+            keys[pem.stem] = SigningKey.from_private_key(pem.stem, private_key)
+        if not keys:
+            raise ValueError(f"No JWT signing keys (*.pem) in {path}")
+        return cls(keys, **kwargs)
+
+    @property
+    def active_kid(self) -> str | None:
+        return self._active.kid if self._active else None
+
+    @property
+    def kids(self) -> list[str]:
+        return sorted(self._keys)
+
+    def sign(self, payload: dict) -> str:
+        if self._active is None:
+            return jwt.encode(
+                payload, self._secret_key, algorithm=self._secret_algorithm
+            )
+        return jwt.encode(
+            payload,
+            self._active.private_key,
+            algorithm=self._active.algorithm,
+            headers={"kid": self._active.kid},
+        )
+
+    def decode(self, token: str) -> dict:
+        """Verified claims; raises ``InvalidTokenError``."""
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if kid is not None:
+            key = self._keys.get(kid)
+            if key is None:
+                raise InvalidTokenError(f"unknown key id {kid!r}")
+            payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+            _verified.inc(alg=key.algorithm)
+            return payload
+        if not self._accept_secret:
+            raise InvalidTokenError("token has no key id")
+        payload = jwt.decode(
+            token, self._secret_key, algorithms=[self._secret_algorithm]
+        )
+        _verified.inc(alg=self._secret_algorithm)
+        return payload
+
+    def jwks_not_modified(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.jwks_etag in tags
+
+
+_key_ring: KeyRing | None = None
+
+
+def get_key_ring() -> KeyRing:
+    global _key_ring
+    if _key_ring is None:
+        if configs.JWT_SIGNING_KEYS_DIR:
+            path = Path(configs.JWT_SIGNING_KEYS_DIR)
+            if not path.is_absolute():
+                # Resolve relative path from project root, like the Firebase key.
+                path = Path(__file__).resolve().parents[2] / path
+            _key_ring = KeyRing.from_directory(path, active_kid=configs.JWT_ACTIVE_KID)
+            logger.info(
+                f"JWT signing with {_key_ring.active_kid} "
+                f"(published: {', '.join(_key_ring.kids)})"
+            )
+        else:
+            _key_ring = KeyRing({})
+            logger.info(f"JWT signing with {configs.JWT_ALGORITHM} shared secret")
+    return _key_ring
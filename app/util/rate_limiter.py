@@ -0,0 +1,129 @@
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until tokens are available."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if self._rate <= 0:
+            return
+        # Requests larger than the bucket are allowed once it is full.
+        tokens = min(tokens, self._capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+def sliding_window_retry_after(
+    limit: int, window_seconds: float, previous: int, current: int, elapsed: float
+) -> float:
+    """Seconds until a rejected key drops back under ``limit`` without new hits.
+
+    ``previous``/``current`` are the counts of the previous and current fixed
+    windows and ``elapsed`` the time since the current window started.
+    """
+    if current >= limit:
+        # The current count carries over as next window's previous count.
+        return (window_seconds - elapsed) + window_seconds * (1 - limit / current)
+    if previous <= 0:
+        # Nothing left to decay and the estimate is already under the limit;
+        # reachable when the shared counters rolled over since the refusal.
+        return 0.0
+    return max(0.0, window_seconds * (1 - (limit - current) / previous) - elapsed)
+
+
+class _Shard:
+    __slots__ = ("lock", "entries", "swept")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> [window index, previous window count, current window count]
+        self.entries: dict[str, list[int]] = {}
+        self.swept = 0
+
+
+class SlidingWindowLimiter:
+    """Thread-safe per-key limit of ``limit`` events per ``window_seconds``.
+
+    Approximates a sliding window from two fixed windows: the current count
+    plus the previous one weighted by its remaining overlap. That is three
+    ints per key. Keys are spread over independently locked shards; keys
+    idle for two windows are swept from a shard at most once per window.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        shards: int = 16,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limit = limit
+        self._window = window_seconds
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_keys_per_shard = max(1, max_keys // shards)
+        self._clock = clock
+
+    def hit(self, key: str) -> float:
+        """Count one event for ``key``: 0 if allowed, else seconds to wait.
+
+        Rejected events are not counted, so a key is admitted at ``limit``
+        per window however hard it is hammered.
+        """
+        if self._limit <= 0:
+            return 0.0
+        now = self._clock()
+        window = int(now // self._window)
+        elapsed = now - window * self._window
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            if window > shard.swept:
+                self._sweep(shard, window)
+            entry = shard.entries.get(key)
+            if entry is None:
+                if len(shard.entries) >= self._max_keys_per_shard:
+                    # Dicts keep insertion order: drop the oldest key.
+                    del shard.entries[next(iter(shard.entries))]
+                shard.entries[key] = [window, 0, 1]
+                return 0.0
+            start, previous, current = entry
+            if start != window:
+                previous = current if start == window - 1 else 0
+                current = 0
+            entry[0], entry[1] = window, previous
+            if previous * (1 - elapsed / self._window) + current >= self._limit:
+                entry[2] = current
+                return sliding_window_retry_after(
+                    self._limit, self._window, previous, current, elapsed
+                )
+            entry[2] = current + 1
+            return 0.0
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    @staticmethod
+    def _sweep(shard: _Shard, window: int) -> None:
+        stale = [k for k, entry in shard.entries.items() if entry[0] < window - 1]
+        for key in stale:
+            del shard.entries[key]
+        shard.swept = window
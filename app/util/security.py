@@ -4,12 +4,12 @@ import hashlib
 import hmac
 from datetime import datetime, timedelta, timezone
 
-import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt import InvalidTokenError
 
 from app.core.config import Configs
+from app.util.jwt_keys import get_key_ring
 
 _configs = Configs()
 _bearer_scheme = HTTPBearer()
@@ -21,9 +21,7 @@ def create_access_token(subject: str) -> str:
         minutes=_configs.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
     )
     payload = {"sub": subject, "exp": expire}
-    return jwt.encode(
-        payload, _configs.JWT_SECRET_KEY, algorithm=_configs.JWT_ALGORITHM
-    )
+    return get_key_ring().sign(payload)
 
 
 def verify_access_token(
@@ -31,11 +29,7 @@ def verify_access_token(
 ) -> str:
     token = credentials.credentials
     try:
-        payload = jwt.decode(
-            token,
-            _configs.JWT_SECRET_KEY,
-            algorithms=[_configs.JWT_ALGORITHM],
-        )
+        payload = get_key_ring().decode(token)
         subject = payload.get("sub")
         if not subject:
             raise HTTPException(
@@ -0,0 +1,101 @@
+"""Per-request dependency-injection overhead of the API endpoints.
+
+Usage:
+    uv run python -m benchmarks.di_overhead [--requests 20000]
+
+Measures resolving ``user_service``/``ekyc_service`` from the container and
+a full in-process request to a trivial endpoint wired the same way as the
+real ones (``@inject`` + ``Depends(Provide[...])``). The database engine is
+created lazily and never connected, so only DI and framework work is timed.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import Response
+
+from app.core.container import Container
+
+router = APIRouter()
+
+
+@router.get("/noop")
+@inject
+async def noop(
+    user_service=Depends(Provide[Container.user_service]),
+    ekyc_service=Depends(Provide[Container.ekyc_service]),
+) -> Response:
+    return Response(b"{}", media_type="application/json")
+
+
+async def _call(app: FastAPI) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/noop",
+        "raw_path": b"/noop",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+        "root_path": "",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def _per_second(fn, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+async def _requests_per_second(app: FastAPI, iterations: int) -> float:
+    for _ in range(200):
+        await _call(app)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await _call(app)
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    # Constructors log at INFO; keep them out of the timing.
+    logging.disable(logging.INFO)
+
+    container = Container()
+    container.wire(modules=[sys.modules[__name__]])
+    app = FastAPI()
+    app.include_router(router)
+
+    print(
+        f"resolve user_service   {_per_second(container.user_service, args.requests):>12.0f} /s"
+    )
+    print(
+        f"resolve ekyc_service   {_per_second(container.ekyc_service, args.requests):>12.0f} /s"
+    )
+    rps = asyncio.run(_requests_per_second(app, args.requests))
+    print(f"request via @inject    {rps:>12.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Face-photo quality precheck throughput in images per second.
+
+Usage:
+    uv run python -m benchmarks.face_quality [--images 300] [--workers 4]
+        [--width 1080] [--height 1440]
+
+Synthetic JPEG selfies are measured four ways: in-process at full
+resolution, in-process on the downsampled (draft) decode the precheck uses,
+and through ``FaceQualityChecker``'s process pool with requests of 3 (login)
+and 9 (sign-up) photos, keeping two requests per worker in flight.
+Requires numpy and pillow.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.service.ekyc.face_quality_checker import FaceQualityChecker
+from app.util.image_quality import QualityThresholds, measure
+
+
+def _selfie(width: int, height: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, size=(height // 8, width // 8, 3))
+    pixels = np.kron(noise, np.ones((8, 8, 1))) * 0.4 + 70
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype(np.uint8)).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _inline(images: list[bytes], thresholds: QualityThresholds) -> float:
+    started_at = time.perf_counter()
+    for data in images:
+        measure(data, thresholds)
+    return len(images) / (time.perf_counter() - started_at)
+
+
+async def _pooled(images: list[bytes], batch: int, workers: int) -> float:
+    checker = FaceQualityChecker(enabled=True, workers=workers, max_queue=10_000)
+    requests = [
+        [(f"face {i}", data) for i, data in enumerate(images[start : start + batch])]
+        for start in range(0, len(images) - batch + 1, batch)
+    ]
+    semaphore = asyncio.Semaphore(workers * 2)
+
+    async def one(photos):
+        async with semaphore:
+            await checker.check(photos)
+
+    try:
+        await checker.check(requests[0])  # start the pool
+        started_at = time.perf_counter()
+        await asyncio.gather(*(one(photos) for photos in requests))
+        elapsed = time.perf_counter() - started_at
+    finally:
+        checker.shutdown()
+    return len(requests) * batch / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--width", type=int, default=1080)
+    parser.add_argument("--height", type=int, default=1440)
+    args = parser.parse_args()
+
+    distinct = [_selfie(args.width, args.height, seed) for seed in range(9)]
+    images = [distinct[i % len(distinct)] for i in range(args.images)]
+    size_kb = sum(len(d) for d in distinct) / len(distinct) / 1024
+    print(f"{args.width}x{args.height} JPEG, ~{size_kb:.0f} KiB each")
+
+    full = _inline(images, QualityThresholds(analysis_max_side=100_000))
+    downsampled = _inline(images, QualityThresholds())
+    print(f"{'mode':<34} {'images/s':>10}")
+    print(f"{'inline, full-resolution decode':<34} {full:>10.0f}")
+    print(f"{'inline, downsampled decode':<34} {downsampled:>10.0f}")
+    for batch in (3, 9):
+        rate = asyncio.run(_pooled(images, batch, args.workers))
+        label = f"pool x{args.workers}, {batch} photos/request"
+        print(f"{label:<34} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cost of verifying one access token, per signing algorithm.
+
+Usage:
+    uv run python -m benchmarks.jwt_verify [--iterations 20000]
+
+"cached" is ``KeyRing.decode``: the public key is parsed once and looked up
+by ``kid``. "parse per call" rebuilds the key from its JWK on every token,
+as a verifier without a key cache would; HS256 is the shared-secret baseline.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.util.jwt_keys import KeyRing, SigningKey
+
+_SECRET = "benchmark-secret-with-enough-bytes-for-hs256"
+
+
+def _measure(fn, token: str, iterations: int) -> float:
+    for _ in range(min(100, iterations)):
+        fn(token)
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn(token)
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    payload = {
+        "sub": "bench@example.com",
+        "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+    hs256 = KeyRing({}, secret_key=_SECRET, secret_algorithm="HS256")
+    print(f"{'alg':<8} {'cached us':>10} {'parse per call us':>18}")
+    print(
+        f"{'HS256':<8} {_measure(hs256.decode, hs256.sign(payload), iterations):>10.1f}"
+    )
+    for kid, private_key in (
+        ("es256", ec.generate_private_key(ec.SECP256R1())),
+        ("eddsa", ed25519.Ed25519PrivateKey.generate()),
+    ):
+        key = SigningKey.from_private_key(kid, private_key)
+        ring = KeyRing({kid: key}, secret_key=_SECRET, secret_algorithm="HS256")
+        token = ring.sign(payload)
+        jwks = ring.jwks
+
+        def _uncached(token: str) -> dict:
+            jwk = json.loads(jwks)["keys"][0]
+            return jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[jwk["alg"]])
+
+        cached = _measure(ring.decode, token, iterations)
+        uncached = _measure(_uncached, token, iterations)
+        print(f"{key.algorithm:<8} {cached:>10.1f} {uncached:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,102 @@
+"""Cost of renewing an access token: password login vs. refresh token.
+
+Usage:
+    uv run python -m benchmarks.refresh_vs_login [--url URL] [--iterations 200]
+
+"login" is what ``/user/login`` does per call: the credentials lookup plus
+``verify_password`` (PBKDF2). "refresh" is what ``/user/refresh`` does: one
+SHA-256 and the rotation statement. Both run on one connection inside a
+transaction that is rolled back at the end, with a throwaway user.
+"""
+
+import argparse
+import hashlib
+import secrets
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import configs
+from app.model import UserModel
+from app.repository import refresh_token_repository, user_repository
+from app.util.security import hash_password, verify_password
+
+_PASSWORD = "correct horse battery staple"
+_TTL = timedelta(days=1)
+
+
+def _login(session: Session, email: str, state: dict) -> None:
+    row = session.execute(
+        user_repository._GET_CREDENTIALS_BY_EMAIL, {"email": email}
+    ).first()
+    assert verify_password(_PASSWORD, row.password_hashed)
+
+
+def _refresh(session: Session, email: str, state: dict) -> None:
+    new_token = secrets.token_urlsafe(32)
+    row = session.execute(
+        refresh_token_repository._ROTATE_TOKEN,
+        {
+            "presented_hash": hashlib.sha256(state["token"].encode()).digest(),
+            "new_token_hash": hashlib.sha256(new_token.encode()).digest(),
+            "ttl": _TTL,
+        },
+    ).first()
+    assert row is not None
+    state["token"] = new_token
+
+
+def _measure(fn, session: Session, email: str, state: dict, iterations: int) -> float:
+    for _ in range(min(10, iterations)):
+        fn(session, email, state)
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn(session, email, state)
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def main(url: str, iterations: int) -> None:
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, autoflush=False)
+        try:
+            user = UserModel(
+                email=f"bench-{uuid.uuid4().hex}@example.com",
+                password_hashed=hash_password(_PASSWORD),
+            )
+            session.add(user)
+            session.flush()
+            email = user.email
+            token = secrets.token_urlsafe(32)
+            session.execute(
+                refresh_token_repository._INSERT_TOKEN,
+                {
+                    "token_hash": hashlib.sha256(token.encode()).digest(),
+                    "family_id": uuid.uuid4(),
+                    "user_id": user.id,
+                    "ttl": _TTL,
+                },
+            )
+            state = {"token": token}
+
+            login = _measure(_login, session, email, state, iterations)
+            refresh = _measure(_refresh, session, email, state, iterations)
+            print(f"{'path':<10} {'us/call':>10}")
+            print(f"{'login':<10} {login:>10.1f}")
+            print(f"{'refresh':<10} {refresh:>10.1f}")
+            print(f"refresh is {login / refresh:.1f}x cheaper")
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=configs.DATABASE_URL)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    main(args.url, args.iterations)
@@ -0,0 +1,116 @@
+"""Per-query cost of the hot repository methods: legacy ORM vs. prebuilt Core.
+
+Usage:
+    uv run python -m benchmarks.repository_queries [--url URL] [--iterations 5000]
+
+Each query runs ``--iterations`` times on one connection inside a single
+transaction that is rolled back at the end, so connection setup is excluded
+and the database is left unchanged. A throwaway user is inserted first.
+The "before" column reproduces the ORM code the repositories used before;
+"after" is the statement the repositories run now.
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import configs
+from app.model import UserFaceModel, UserModel
+from app.repository import user_face_repository, user_repository
+from app.repository.user_records import UserCredentials, UserProfile
+
+
+def _orm_get_by_email(session: Session, email: str, user_id: uuid.UUID):
+    return session.query(UserModel).filter(UserModel.email == email).first()
+
+
+def _core_get_by_email(session: Session, email: str, user_id: uuid.UUID):
+    row = session.execute(
+        user_repository._GET_PROFILE_BY_EMAIL, {"email": email}
+    ).first()
+    return UserProfile(*row)
+
+
+def _core_get_credentials(session: Session, email: str, user_id: uuid.UUID):
+    row = session.execute(
+        user_repository._GET_CREDENTIALS_BY_EMAIL, {"email": email}
+    ).first()
+    return UserCredentials(*row)
+
+
+def _orm_mark_ekyc_uploaded(session: Session, email: str, user_id: uuid.UUID):
+    return (
+        session.query(UserModel)
+        .filter(UserModel.id == user_id)
+        .update({"is_ekyc_uploaded": True})
+    )
+
+
+def _core_mark_ekyc_uploaded(session: Session, email: str, user_id: uuid.UUID):
+    return session.execute(
+        user_repository._MARK_EKYC_UPLOADED, {"user_id": user_id}
+    ).scalar_one_or_none()
+
+
+def _orm_save_login_faces(session: Session, email: str, user_id: uuid.UUID):
+    session.add(UserFaceModel(user_id=user_id, pose="login", source_images=["u"]))
+    session.flush()
+
+
+def _core_save_login_faces(session: Session, email: str, user_id: uuid.UUID):
+    session.execute(
+        user_face_repository._INSERT_FACES,
+        {"user_id": user_id, "pose": "login", "source_images": ["u"]},
+    )
+
+
+CASES = [
+    ("get_by_email", _orm_get_by_email, _core_get_by_email),
+    ("get_credentials_by_email", _orm_get_by_email, _core_get_credentials),
+    ("mark_ekyc_uploaded", _orm_mark_ekyc_uploaded, _core_mark_ekyc_uploaded),
+    ("save_login_faces", _orm_save_login_faces, _core_save_login_faces),
+]
+
+
+def _measure(fn, session: Session, email: str, user_id, iterations: int) -> float:
+    for _ in range(min(100, iterations)):
+        fn(session, email, user_id)
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn(session, email, user_id)
+        # ORM identity-map state would otherwise grow across iterations.
+        session.expunge_all()
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def main(url: str, iterations: int) -> None:
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, autoflush=False)
+        try:
+            user = UserModel(email=f"bench-{uuid.uuid4().hex}@example.com")
+            session.add(user)
+            session.flush()
+            email, user_id = user.email, user.id
+            session.expunge_all()
+
+            print(f"{'query':<26} {'before us':>10} {'after us':>10} {'speedup':>8}")
+            for name, before, after in CASES:
+                old = _measure(before, session, email, user_id, iterations)
+                new = _measure(after, session, email, user_id, iterations)
+                print(f"{name:<26} {old:>10.1f} {new:>10.1f} {old / new:>7.2f}x")
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=configs.DATABASE_URL)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.url, args.iterations)
@@ -0,0 +1,164 @@
+"""Responses/sec for the BaseResponse envelope, before and after app.core.responses.
+
+Usage:
+    uv run python -m benchmarks.response_serialization [--requests 20000]
+
+Each endpoint shape is served twice from an in-process ASGI app: once the
+old way (return ``BaseResponse`` and let ``response_model`` validate and
+encode it; errors via ``model_dump`` + ``JSONResponse``) and once through
+``success_response``/``error_response``. No network or database is involved,
+so the numbers isolate the framework serialization path.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.exceptions import ErrUserNotFound
+from app.core.responses import error_response, success_response
+from app.dto.base_response import BaseResponse
+from app.dto.ekyc.response.face_history_response import (
+    FaceHistoryItem,
+    FaceHistoryResponse,
+)
+from app.dto.user.response.get_user_response import GetUserResponse
+from app.dto.user.response.login_response import LoginResponse
+
+NOW = datetime.now(timezone.utc)
+USER = {
+    "id": uuid.uuid4(),
+    "email": "user@example.com",
+    "phone_number": "+84900000000",
+    "full_name": "Example User",
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+HISTORY = [
+    {
+        "id": i,
+        "pose": "login",
+        "source_images": [
+            f"https://storage.googleapis.com/b/uploads/{i}/{n}.jpg" for n in range(3)
+        ],
+        "created_at": NOW,
+    }
+    for i in range(50)
+]
+
+
+def _before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/user", response_model=BaseResponse[GetUserResponse])
+    def user():
+        return BaseResponse.success_response(data=GetUserResponse(**USER))
+
+    @app.get("/login", response_model=BaseResponse[LoginResponse])
+    def login():
+        return BaseResponse.success_response(
+            data=LoginResponse(email=USER["email"], access_token="x" * 200)
+        )
+
+    @app.get("/history", response_model=BaseResponse[FaceHistoryResponse])
+    def history():
+        return BaseResponse.success_response(
+            data=FaceHistoryResponse(
+                items=[FaceHistoryItem(**item) for item in HISTORY], next_cursor="c"
+            )
+        )
+
+    @app.get("/error", response_model=BaseResponse[GetUserResponse])
+    def error():
+        err = ErrUserNotFound
+        return JSONResponse(
+            status_code=err.http_status,
+            content=BaseResponse.error_response(
+                code=err.code, message=err.message
+            ).model_dump(),
+        )
+
+    return app
+
+
+def _after_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/user", response_model=BaseResponse[GetUserResponse])
+    def user():
+        return success_response(data=GetUserResponse.model_construct(**USER))
+
+    @app.get("/login", response_model=BaseResponse[LoginResponse])
+    def login():
+        return success_response(
+            data=LoginResponse.model_construct(
+                email=USER["email"], access_token="x" * 200
+            )
+        )
+
+    @app.get("/history", response_model=BaseResponse[FaceHistoryResponse])
+    def history():
+        return success_response(data={"items": HISTORY, "next_cursor": "c"})
+
+    @app.get("/error", response_model=BaseResponse[GetUserResponse])
+    def error():
+        return error_response(ErrUserNotFound)
+
+    return app
+
+
+async def _call(app: FastAPI, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+        "root_path": "",
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _measure(app: FastAPI, path: str, requests: int) -> float:
+    for _ in range(200):
+        await _call(app, path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await _call(app, path)
+    return requests / (time.perf_counter() - started)
+
+
+async def _main(requests: int) -> None:
+    before, after = _before_app(), _after_app()
+    print(f"{'endpoint':<10} {'before rps':>12} {'after rps':>12} {'speedup':>8}")
+    for path in ("/user", "/login", "/history", "/error"):
+        old = await _measure(before, path, requests)
+        new = await _measure(after, path, requests)
+        print(f"{path:<10} {old:>12.0f} {new:>12.0f} {new / old:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(_main(parser.parse_args().requests))
@@ -0,0 +1,174 @@
+"""Throughput of the production server (``app.cli.serve``) by worker count.
+
+Usage:
+    uv run python -m benchmarks.server_workers [--workers 1 2 4] [--duration 10]
+        [--endpoint login|health] [--concurrency 64] [--clients 4]
+
+For every worker count a fresh ``serve`` process is started on a local port
+and driven by ``--clients`` load-generator processes sharing
+``--concurrency`` connections for ``--duration`` seconds. The ``login``
+endpoint (PBKDF2 + JSON, against the configured database) registers a
+throwaway user first; ``health`` measures bare framework overhead. Run the
+load generator on a machine with spare cores, or the numbers will flatten
+early.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from app.cli.serve import available_cpus
+
+PASSWORD = "Bench-Passw0rd!"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.cli.serve",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError(f"serve exited with {process.returncode}")
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("serve did not become healthy within 60s")
+
+
+def _request(endpoint: str, email: str) -> tuple[str, str, dict | None]:
+    if endpoint == "login":
+        return "POST", "/api/v1/user/login", {"email": email, "password": PASSWORD}
+    return "GET", "/health", None
+
+
+async def _drive(
+    base_url: str, endpoint: str, email: str, connections: int, duration: float
+) -> tuple[int, int, list[float]]:
+    method, path, body = _request(endpoint, email)
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started_at = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started_at)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(connections)))
+    return len(latencies), errors, latencies
+
+
+def _client(args: tuple) -> tuple[int, int, list[float]]:
+    return asyncio.run(_drive(*args))
+
+
+def _run(
+    workers: int,
+    endpoint: str,
+    duration: float,
+    concurrency: int,
+    clients: int,
+) -> tuple[float, float, float, int]:
+    port = _free_port()
+    server = _start_server(workers, port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        email = f"bench-{uuid.uuid4().hex}@example.com"
+        if endpoint == "login":
+            httpx.post(
+                f"{base_url}/api/v1/user/register",
+                json={"email": email, "password": PASSWORD, "full_name": "Bench"},
+                timeout=30,
+            ).raise_for_status()
+        # Warm every worker before measuring.
+        _client((base_url, endpoint, email, workers * 2, 1.0))
+
+        per_client = max(1, concurrency // clients)
+        jobs = [(base_url, endpoint, email, per_client, duration)] * clients
+        with multiprocessing.get_context("spawn").Pool(clients) as pool:
+            results = pool.map(_client, jobs)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    completed = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    latencies = sorted(latency for r in results for latency in r[2])
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return completed / duration, statistics.median(latencies), p99, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--endpoint", choices=["login", "health"], default="login")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    counts = args.workers or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    print(f"endpoint={args.endpoint} cpus={cpus} concurrency={args.concurrency}")
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    baseline = None
+    for workers in counts:
+        rps, p50, p99, errors = _run(
+            workers, args.endpoint, args.duration, args.concurrency, args.clients
+        )
+        baseline = baseline or rps
+        scaling = f"{rps / baseline:.2f}x" if baseline else "-"
+        print(
+            f"{workers:>7} {rps:>9.0f} {p50 * 1e3:>8.1f} {p99 * 1e3:>8.1f} "
+            f"{errors:>7}  {scaling}"
+        )
+
+
+if __name__ == "__main__":
+    main()
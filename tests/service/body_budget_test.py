@@ -0,0 +1,162 @@
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.body_budget import BodyBudgetMiddleware, ByteBudget
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _client(budget_bytes: int) -> tuple[TestClient, ByteBudget]:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    middleware = BodyBudgetMiddleware(app, budget_bytes=budget_bytes, wait_seconds=0)
+    return TestClient(middleware), middleware.budget
+
+
+# ---------------------------------------------------------------------------
+# ByteBudget
+# ---------------------------------------------------------------------------
+
+
+class TestByteBudget:
+    def test_waiter_is_admitted_on_release(self):
+        async def _test():
+            budget = ByteBudget(100)
+            assert budget.try_acquire(80)
+            waiter = asyncio.create_task(budget.acquire(50, timeout=1))
+            await asyncio.sleep(0.01)
+            assert budget.waiting == 1
+            budget.release(80)
+            assert await waiter is True
+            return budget.used
+
+        assert asyncio.run(_test()) == 50
+
+    def test_times_out_and_leaves_no_reservation(self):
+        async def _test():
+            budget = ByteBudget(100)
+            budget.try_acquire(80)
+            admitted = await budget.acquire(50, timeout=0.02)
+            return admitted, budget.used, budget.waiting
+
+        assert asyncio.run(_test()) == (False, 80, 0)
+
+    def test_waiters_are_served_in_order(self):
+        async def _test():
+            budget = ByteBudget(100)
+            budget.try_acquire(100)
+            order = []
+
+            async def acquire(name, size):
+                await budget.acquire(size, timeout=1)
+                order.append(name)
+
+            large = asyncio.create_task(acquire("large", 90))
+            await asyncio.sleep(0.01)
+            small = asyncio.create_task(acquire("small", 10))
+            await asyncio.sleep(0.01)
+            # Room for the small request alone does not let it jump the queue.
+            assert not budget.try_acquire(10)
+            budget.release(100)
+            await asyncio.gather(large, small)
+            return order
+
+        assert asyncio.run(_test()) == ["large", "small"]
+
+    def test_cancelled_head_unblocks_queue(self):
+        async def _test():
+            budget = ByteBudget(100)
+            budget.try_acquire(60)
+            large = asyncio.create_task(budget.acquire(90, timeout=1))
+            await asyncio.sleep(0.01)
+            small = asyncio.create_task(budget.acquire(30, timeout=1))
+            await asyncio.sleep(0.01)
+            large.cancel()
+            return await small, budget.used
+
+        assert asyncio.run(_test()) == (True, 90)
+
+
+# ---------------------------------------------------------------------------
+# BodyBudgetMiddleware
+# ---------------------------------------------------------------------------
+
+
+class TestBodyBudgetMiddleware:
+    def test_releases_budget_after_response(self):
+        client, budget = _client(budget_bytes=1000)
+
+        response = client.post("/echo", content=b"x" * 600)
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 600}
+        assert budget.used == 0
+        # A second request of the same size fits again.
+        assert client.post("/echo", content=b"x" * 600).status_code == 200
+
+    def test_rejects_when_budget_stays_full(self):
+        client, budget = _client(budget_bytes=1000)
+        budget.force_acquire(900)
+
+        response = client.post("/echo", content=b"x" * 600)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["code"] == 5030001
+
+    def test_rejects_body_larger_than_budget(self):
+        client, _ = _client(budget_bytes=100)
+
+        response = client.post("/echo", content=b"x" * 600)
+
+        assert response.status_code == 413
+        assert response.json()["code"] == 4130001
+
+    def test_unsized_body_is_accounted_and_released(self):
+        client, budget = _client(budget_bytes=200)
+
+        def chunks():
+            yield b"x" * 80
+            yield b"x" * 80
+
+        response = client.post("/echo", content=chunks())
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 160}
+        assert budget.used == 0
+
+    def test_unsized_body_larger_than_budget_is_cut_off(self):
+        client, budget = _client(budget_bytes=100)
+
+        def chunks():
+            for _ in range(10):
+                yield b"x" * 80
+
+        response = client.post("/echo", content=chunks())
+
+        assert response.status_code == 413
+        assert response.json()["code"] == 4130001
+        assert budget.used == 0
+
+    def test_unsized_body_is_refused_when_budget_is_full(self):
+        client, budget = _client(budget_bytes=1000)
+        budget.force_acquire(900)
+
+        def chunks():
+            yield b"x" * 80
+            yield b"x" * 80
+
+        response = client.post("/echo", content=chunks())
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert budget.used == 900
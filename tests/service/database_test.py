@@ -0,0 +1,184 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.database import REPLICA, WRITTEN_KEYS, Database
+from app.core.exceptions import ErrUserNotFound
+from app.repository.user_repository import UserRepository
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _session(lag: float = 0.0) -> MagicMock:
+    session = MagicMock()
+    session.info = {}
+    session.execute.return_value.scalar.return_value = lag
+    return session
+
+
+def _database(**kwargs) -> tuple[Database, MagicMock, MagicMock]:
+    """A Database whose primary and single replica hand out mock sessions."""
+    kwargs.setdefault("replica_max_lag_seconds", 5)
+    kwargs.setdefault("replica_lag_check_seconds", 60)
+    kwargs.setdefault("read_your_writes_seconds", 15)
+    database = Database(
+        "postgresql+psycopg2://app@primary/ekyc",
+        ["postgresql+psycopg2://app@replica/ekyc"],
+        breaker=CircuitBreaker("test-postgres", slow_call_seconds=1),
+        **kwargs,
+    )
+    primary = MagicMock(side_effect=lambda: _session())
+    replica = MagicMock(side_effect=lambda: _session())
+    database._session_factory = primary
+    database._replicas[0].session_factory = replica
+    return database, primary, replica
+
+
+def _read(database: Database, *keys: str) -> str:
+    with database.read_session(*keys) as session:
+        return "replica" if REPLICA in session.info else "primary"
+
+
+class _Sessions:
+    """Context-manager factory yielding sessions whose reads return ``rows``."""
+
+    def __init__(self, rows, replica: bool) -> None:
+        self.rows = rows
+        self.replica = replica
+        self.calls = 0
+
+    def __call__(self, *keys):
+        self.calls += 1
+        session = MagicMock()
+        session.info = {REPLICA: "replica"} if self.replica else {}
+        session.execute.return_value.first.return_value = self.rows
+        session.execute.return_value.mappings.return_value.all.return_value = self.rows
+        context = MagicMock()
+        context.__enter__.return_value = session
+        return context
+
+
+# ---------------------------------------------------------------------------
+# Read routing
+# ---------------------------------------------------------------------------
+
+
+class TestReadRouting:
+    def test_reads_go_to_the_replica(self):
+        database, primary, _ = _database()
+
+        assert _read(database, "a@example.com") == "replica"
+        assert _read(database, "a@example.com") == "replica"
+        primary.assert_not_called()
+
+    def test_without_replicas_reads_use_the_primary(self):
+        database = Database(
+            "postgresql+psycopg2://app@primary/ekyc",
+            breaker=CircuitBreaker("test-postgres", slow_call_seconds=1),
+        )
+        database._session_factory = MagicMock(side_effect=lambda: _session())
+
+        assert _read(database, "a@example.com") == "primary"
+
+    def test_lagging_replica_falls_back_until_rechecked(self):
+        database, _, replica = _database()
+        replica.side_effect = lambda: _session(lag=30.0)
+
+        assert _read(database) == "primary"
+        # The measured lag is reused until the next check is due.
+        assert _read(database) == "primary"
+        assert replica.call_count == 1
+
+        database._replicas[0].checked_at = float("-inf")
+        replica.side_effect = lambda: _session(lag=0.5)
+        assert _read(database) == "replica"
+
+    def test_unreachable_replica_is_skipped(self):
+        database, _, replica = _database()
+        broken = _session()
+        broken.execute.side_effect = ConnectionError("no route to host")
+        replica.side_effect = lambda: broken
+
+        assert _read(database) == "primary"
+        assert _read(database) == "primary"
+        assert replica.call_count == 1
+
+    def test_written_keys_are_read_from_the_primary(self):
+        database, _, _ = _database()
+
+        with database.session() as session:
+            session.info[WRITTEN_KEYS] = {"a@example.com"}
+
+        assert _read(database, "a@example.com") == "primary"
+        assert _read(database, "b@example.com") == "replica"
+
+    def test_failed_write_is_not_remembered(self):
+        database, _, _ = _database()
+
+        with pytest.raises(RuntimeError):
+            with database.session() as session:
+                session.info[WRITTEN_KEYS] = {"a@example.com"}
+                raise RuntimeError("rolled back")
+
+        assert _read(database, "a@example.com") == "replica"
+
+    def test_remembered_writes_expire(self):
+        database, _, _ = _database(read_your_writes_seconds=0)
+
+        with database.session() as session:
+            session.info[WRITTEN_KEYS] = {"a@example.com"}
+
+        assert _read(database, "a@example.com") == "replica"
+
+
+# ---------------------------------------------------------------------------
+# Replica misses
+# ---------------------------------------------------------------------------
+
+
+class TestUserLookupsAfterReplicaMiss:
+    def test_user_missing_on_replica_is_found_on_the_primary(self):
+        primary = _Sessions(("id", "a@example.com", "hash"), replica=False)
+        replica = _Sessions(None, replica=True)
+        repository = UserRepository(primary, replica)
+
+        user, err = repository.get_credentials_by_email("A@example.com")
+
+        assert err is None
+        assert user.password_hashed == "hash"
+        assert primary.calls == 1
+
+    def test_miss_on_the_primary_is_not_repeated(self):
+        primary = _Sessions(None, replica=False)
+        repository = UserRepository(primary)
+
+        user, err = repository.get_by_email("a@example.com")
+
+        assert user is None
+        assert err.code == ErrUserNotFound.code
+        assert primary.calls == 1
+
+    def test_hit_on_replica_skips_the_primary(self):
+        primary = _Sessions(None, replica=False)
+        replica = _Sessions(("id", "a@example.com", "hash"), replica=True)
+        repository = UserRepository(primary, replica)
+
+        _, err = repository.get_credentials_by_email("a@example.com")
+
+        assert err is None
+        assert primary.calls == 0
+
+    def test_partial_batch_on_replica_is_reread_on_the_primary(self):
+        primary = _Sessions([{"email": "a"}, {"email": "b"}], replica=False)
+        replica = _Sessions([{"email": "a"}], replica=True)
+        repository = UserRepository(primary, replica)
+
+        rows, err = repository.get_many_by_emails(["a", "b"])
+
+        assert err is None
+        assert len(rows) == 2
+        assert primary.calls == 1
@@ -1,13 +1,32 @@
 import pytest
 import asyncio
+import hashlib
+import io
+from datetime import datetime, timezone
 from unittest.mock import ANY, AsyncMock, Mock, patch
 
 from fastapi import UploadFile
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.constants import CircuitState
+from app.core.ecode import Error
+from app.core.exceptions import ErrFacePhotoBlurry, ErrStorageUnavailable
 from app.service.ekyc.ekyc_service import EkycService
 from app.service.pubsub.pubsub_service import PubsubService
+from app.service.storage.hedged_uploader import UploadedObject
 from app.repository import UserFaceRepository, UserRepository
 
 
+def _uploaded(name: str) -> UploadedObject:
+    return UploadedObject(
+        name=name,
+        url=f"https://storage.test/{name}",
+        size=4,
+        content_type="image/jpeg",
+        md5_hash="md5==",
+        crc32c="crc==",
+    )
+
+
 @pytest.fixture
 def mock_user_repository():
     return Mock(spec=UserRepository)
@@ -26,13 +45,12 @@ def mock_pubsub_service():
 @pytest.fixture
 def ekyc_service(mock_user_repository, mock_user_face_repository, mock_pubsub_service):
     with (
-        patch("app.service.ekyc.ekyc_service.firebase_admin"),
-        patch("app.service.ekyc.ekyc_service.storage"),
+        patch("app.core.firebase.firebase_admin"),
+        patch("app.core.firebase.storage"),
         patch("app.service.ekyc.ekyc_service.configs") as mock_configs,
     ):
         mock_configs.GCS_BUCKET_NAME = "test-bucket"
         mock_configs.GCS_UPLOAD_PREFIX = "test-uploads"
-        mock_configs.FIREBASE_UPLOAD_MAX_CONCURRENCY = 2
 
         service = EkycService(
             mock_user_repository, mock_user_face_repository, mock_pubsub_service
@@ -53,12 +71,13 @@ def test_upload_photos_success_publishes_event(
     mock_file.file = Mock()
 
     # Mock concurrent upload
-    ekyc_service._upload_group = AsyncMock(return_value=["http://url1"])
+    uploaded = [_uploaded("face_1.jpg")]
+    ekyc_service._upload_group = AsyncMock(return_value=uploaded)
 
     # Mock repository success
     mock_user = Mock()
     mock_user_repository.get_by_email.return_value = (mock_user, None)
-    mock_user_face_repository.save_ekyc_faces.return_value = None
+    mock_user_face_repository.save_ekyc_faces.return_value = ({}, None)
     mock_user_repository.mark_ekyc_uploaded.return_value = None
 
     async def _test():
@@ -80,7 +99,61 @@ def test_upload_photos_success_publishes_event(
 
     # Verify PubSub event published
     mock_pubsub_service.publish_signup_event.assert_called_once_with(
-        user_id=ANY, session_id=ANY
+        user_id=ANY,
+        session_id=ANY,
+        faces={"left_face": uploaded, "right_face": uploaded, "front_face": uploaded},
+    )
+    assert mock_user_face_repository.save_ekyc_faces.call_args.kwargs[
+        "front_face_urls"
+    ] == ["https://storage.test/face_1.jpg"]
+
+
+def test_upload_photos_deletes_replaced_enrollment_photos(
+    mock_user_repository, mock_user_face_repository, mock_pubsub_service
+):
+    object_storage = Mock()
+    object_storage.object_name_from_url.side_effect = lambda url: url.rsplit("/", 1)[1]
+    object_storage.delete_objects.return_value = []
+    service = EkycService(
+        mock_user_repository,
+        mock_user_face_repository,
+        mock_pubsub_service,
+        object_storage=object_storage,
+    )
+    service._get_bucket = Mock()
+    service._upload_group = AsyncMock(return_value=[_uploaded("new.jpg")])
+    mock_file = Mock(spec=UploadFile)
+    mock_file.file = Mock()
+    mock_user_repository.get_by_email.return_value = (Mock(), None)
+    mock_user_repository.mark_ekyc_uploaded.return_value = None
+    mock_user_face_repository.save_ekyc_faces.return_value = (
+        {
+            "left": ["https://storage.test/old_left.jpg"],
+            "straight": ["https://storage.test/old_front.jpg"],
+        },
+        None,
+    )
+
+    async def _test():
+        result = await service.upload_photos(
+            user_email="test@example.com",
+            left_faces=[mock_file],
+            right_faces=[mock_file],
+            front_faces=[mock_file],
+            fcm_token="test-fcm-token",
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 2
+        while not object_storage.delete_objects.called:
+            assert loop.time() < deadline, "replaced photos were not deleted"
+            await asyncio.sleep(0.005)
+        return result
+
+    _, error = asyncio.run(_test())
+
+    assert error is None
+    object_storage.delete_objects.assert_called_once_with(
+        ["old_left.jpg", "old_front.jpg"]
     )
 
 
@@ -124,7 +197,8 @@ def test_login_success_publishes_signin_event(
     mock_file.file = Mock()
 
     # Mock concurrent upload
-    ekyc_service._upload_group = AsyncMock(return_value=["http://url1"])
+    uploaded = [_uploaded("face_1.jpg")]
+    ekyc_service._upload_group = AsyncMock(return_value=uploaded)
 
     # Mock repository success
     mock_user = Mock()
@@ -150,7 +224,7 @@ def test_login_success_publishes_signin_event(
 
     # Verify PubSub event published
     mock_pubsub_service.publish_signin_event.assert_called_once_with(
-        user_id=ANY, session_id=ANY
+        user_id=ANY, session_id=ANY, faces={"login_face": uploaded}
     )
 
     # Verify save_login_faces called
@@ -213,3 +287,156 @@ def test_login_failure_invalid_photo_count(
 
     # Verify PubSub event NOT published
     mock_pubsub_service.publish_signin_event.assert_not_called()
+
+
+def test_face_history_returns_next_cursor_when_more_rows(
+    ekyc_service, mock_user_repository, mock_user_face_repository
+):
+    # Arrange
+    mock_user = Mock()
+    mock_user_repository.get_by_email.return_value = (mock_user, None)
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {"id": i, "pose": "login", "source_images": [], "created_at": created_at}
+        for i in (3, 2, 1)
+    ]
+    mock_user_face_repository.list_faces.return_value = (rows, None)
+
+    # Act
+    result, error = asyncio.run(
+        ekyc_service.get_face_history(user_email="test@example.com", limit=2)
+    )
+
+    # Assert
+    assert error is None
+    assert [item["id"] for item in result.items] == [3, 2]
+    assert ekyc_service._decode_cursor(result.next_cursor) == ("login", created_at, 2)
+    mock_user_face_repository.list_faces.assert_called_once_with(
+        user_id=mock_user.id,
+        limit=3,
+        pose=None,
+        created_from=None,
+        created_to=None,
+        after=None,
+    )
+
+
+def test_face_history_rejects_invalid_cursor(ekyc_service, mock_user_repository):
+    # Act
+    result, error = asyncio.run(
+        ekyc_service.get_face_history(
+            user_email="test@example.com", limit=2, cursor="not-a-cursor"
+        )
+    )
+
+    # Assert
+    assert result is None
+    assert error.code == 4000001
+    mock_user_repository.get_by_email.assert_not_called()
+
+
+@patch("app.service.ekyc.ekyc_service.breakers")
+def test_upload_photos_fails_fast_when_storage_circuit_open(
+    mock_breakers, ekyc_service, mock_user_repository
+):
+    # Arrange
+    mock_breakers.storage.state = CircuitState.OPEN
+    ekyc_service._upload_group = AsyncMock()
+    mock_file = Mock(spec=UploadFile)
+
+    # Act
+    result, error = asyncio.run(
+        ekyc_service.upload_photos(
+            user_email="test@example.com",
+            left_faces=[mock_file],
+            right_faces=[mock_file],
+            front_faces=[mock_file],
+            fcm_token="test-fcm-token",
+        )
+    )
+
+    # Assert
+    assert result is None
+    assert error is ErrStorageUnavailable
+    ekyc_service._upload_group.assert_not_called()
+    mock_user_repository.get_by_email.assert_not_called()
+
+
+def test_login_maps_open_circuit_during_upload_to_storage_unavailable(
+    ekyc_service, mock_pubsub_service, mock_user_face_repository
+):
+    # Arrange
+    ekyc_service._upload_group = AsyncMock(side_effect=CircuitOpenError("storage"))
+    mock_file = Mock(spec=UploadFile)
+    mock_file.file = Mock()
+
+    # Act
+    result, error = asyncio.run(
+        ekyc_service.login(
+            user_email="test@example.com",
+            faces=[mock_file] * 3,
+            fcm_token="test-fcm-token",
+        )
+    )
+
+    # Assert
+    assert result is None
+    assert error.code == ErrStorageUnavailable.code
+    mock_user_face_repository.save_login_faces.assert_not_called()
+    mock_pubsub_service.publish_signin_event.assert_not_called()
+
+
+def test_login_rejects_low_quality_photo_before_upload(
+    ekyc_service, mock_pubsub_service, mock_user_face_repository
+):
+    # Arrange
+    rejection = Error(ErrFacePhotoBlurry.code, "face photo is too blurry: login_face 2")
+    ekyc_service._face_quality_checker = Mock(check=AsyncMock(return_value=rejection))
+    ekyc_service._upload_group = AsyncMock()
+    mock_file = Mock(spec=UploadFile)
+    mock_file.file = Mock()
+    mock_file.read = AsyncMock(return_value=b"jpeg")
+
+    # Act
+    result, error = asyncio.run(
+        ekyc_service.login(
+            user_email="test@example.com",
+            faces=[mock_file] * 3,
+            fcm_token="test-fcm-token",
+        )
+    )
+
+    # Assert
+    assert result is None
+    assert error is rejection
+    ekyc_service._face_quality_checker.check.assert_awaited_once_with(
+        [
+            ("login_face 1", b"jpeg"),
+            ("login_face 2", b"jpeg"),
+            ("login_face 3", b"jpeg"),
+        ]
+    )
+    ekyc_service._upload_group.assert_not_called()
+    mock_user_face_repository.save_login_faces.assert_not_called()
+    mock_pubsub_service.publish_signin_event.assert_not_called()
+
+
+def test_idempotency_fingerprint_covers_file_contents(ekyc_service):
+    # Arrange
+    def upload(content: bytes) -> UploadFile:
+        return UploadFile(io.BytesIO(content), size=len(content), filename="face.jpg")
+
+    async def describe(content: bytes):
+        upload_file = upload(content)
+        described = await ekyc_service._describe_files([upload_file])
+        # The upload is rewound for the request that reads it next.
+        return described, await upload_file.read()
+
+    # Act
+    first, data = asyncio.run(describe(b"jpeg-a"))
+    second, _ = asyncio.run(describe(b"jpeg-b"))
+
+    # Assert
+    assert first != second
+    assert first == [f"face.jpg:{hashlib.sha256(b'jpeg-a').hexdigest()}"]
+    assert data == b"jpeg-a"
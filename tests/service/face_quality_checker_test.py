@@ -0,0 +1,109 @@
+import asyncio
+import io
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.core.exceptions import ErrFacePhotoBlurry
+from app.service.ekyc.face_quality_checker import FaceQualityChecker
+from app.util import image_quality
+from app.util.image_quality import QualityThresholds, measure
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _jpeg(image: "Image.Image") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _textured(size=(960, 1280), low=40, high=200, bands=30, seed=0) -> "Image.Image":
+    """Fine noise blocks (edges) over wide vertical bands (global contrast)."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(low, high, size=(size[1] // 8, size[0] // 8))
+    stripes = np.where((np.arange(size[0]) // 160) % 2 == 0, -bands, bands)
+    pixels = np.kron(blocks, np.ones((8, 8))) * 0.5 + (low + high) / 4 + stripes
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+THRESHOLDS = QualityThresholds()
+
+
+# ---------------------------------------------------------------------------
+# measure
+# ---------------------------------------------------------------------------
+
+
+class TestMeasure:
+    def test_good_photo_passes(self):
+        report = measure(_jpeg(_textured()), THRESHOLDS)
+
+        assert report.issue is None
+        assert (report.width, report.height) == (960, 1280)
+
+    def test_blurry_photo(self):
+        blurred = _textured().filter(ImageFilter.GaussianBlur(12))
+
+        assert measure(_jpeg(blurred), THRESHOLDS).issue == image_quality.BLURRY
+
+    def test_dark_photo(self):
+        dark = _textured(low=0, high=30)
+
+        assert measure(_jpeg(dark), THRESHOLDS).issue == image_quality.TOO_DARK
+
+    def test_overexposed_photo(self):
+        bright = _textured(low=225, high=256)
+
+        assert measure(_jpeg(bright), THRESHOLDS).issue == image_quality.OVEREXPOSED
+
+    def test_flat_photo_has_low_contrast(self):
+        flat = _textured(low=120, high=135, bands=0)
+
+        assert measure(_jpeg(flat), THRESHOLDS).issue == image_quality.LOW_CONTRAST
+
+    def test_small_photo(self):
+        small = _textured(size=(320, 240))
+
+        assert measure(_jpeg(small), THRESHOLDS).issue == image_quality.LOW_RESOLUTION
+
+    def test_garbage_is_unreadable(self):
+        assert measure(b"not an image", THRESHOLDS).issue == image_quality.UNREADABLE
+
+
+# ---------------------------------------------------------------------------
+# FaceQualityChecker
+# ---------------------------------------------------------------------------
+
+
+class TestFaceQualityChecker:
+    def test_rejects_first_failing_photo_with_its_label(self):
+        checker = FaceQualityChecker(enabled=True, workers=1)
+        good = _jpeg(_textured())
+        blurry = _jpeg(_textured().filter(ImageFilter.GaussianBlur(12)))
+        try:
+            err = asyncio.run(
+                checker.check([("left_face 1", good), ("left_face 2", blurry)])
+            )
+        finally:
+            checker.shutdown()
+
+        assert err.code == ErrFacePhotoBlurry.code
+        assert err.message.endswith("left_face 2")
+
+    def test_accepts_good_photos(self):
+        checker = FaceQualityChecker(enabled=True, workers=1)
+        photos = [(f"login_face {i}", _jpeg(_textured(seed=i))) for i in range(3)]
+        try:
+            assert asyncio.run(checker.check(photos)) is None
+        finally:
+            checker.shutdown()
+
+    def test_disabled_checker_skips(self):
+        checker = FaceQualityChecker(enabled=False)
+
+        assert asyncio.run(checker.check([("front_face 1", b"junk")])) is None
+        assert checker._pool is None
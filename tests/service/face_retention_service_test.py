@@ -0,0 +1,147 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.ecode import Error
+from app.core.exceptions import ErrDatabaseError
+from app.service.retention.face_retention_service import FaceRetentionService
+from app.service.storage import InMemoryObjectStorage
+
+NOW = datetime(2026, 10, 15, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def storage():
+    return InMemoryObjectStorage("bucket")
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock()
+    repo.ensure_login_partitions.return_value = None
+    repo.list_login_partitions.side_effect = lambda attached: (
+        (["tb_user_faces_login_p202603", "tb_user_faces_login_p202604"], None)
+        if attached
+        else ([], None)
+    )
+    repo.detach_login_partition.return_value = None
+    repo.drop_detached_partition.return_value = None
+    repo.get_checkpoint.return_value = (None, None)
+    repo.save_checkpoint.return_value = None
+    repo.fetch_source_images.return_value = ([], None)
+    return repo
+
+
+@pytest.fixture
+def service(mock_repo, storage):
+    return FaceRetentionService(
+        partition_repository=mock_repo,
+        object_storage=storage,
+        retention_days=180,
+        months_ahead=2,
+        batch_size=2,
+        delete_workers=2,
+        delete_rate=0,
+    )
+
+
+def _pages(*pages):
+    """fetch_source_images side effect serving ``pages`` by ``after_id``."""
+    by_after_id = {}
+    after_id = 0
+    for page in pages:
+        by_after_id[after_id] = page
+        after_id = page[-1][0]
+    return lambda name, after, limit: (by_after_id.get(after, []), None)
+
+
+# ---------------------------------------------------------------------------
+# run
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    def test_creates_upcoming_partitions(self, service, mock_repo):
+        result = service.run(NOW)
+
+        mock_repo.ensure_login_partitions.assert_called_once_with(date(2026, 10, 1), 3)
+        assert result.partitions_created_until == date(2026, 12, 1)
+
+    def test_detaches_only_months_entirely_past_cutoff(self, service, mock_repo):
+        # Cutoff is 2026-04-18: April still has rows inside the window.
+        service.run(NOW)
+
+        mock_repo.detach_login_partition.assert_called_once_with(
+            "tb_user_faces_login_p202603"
+        )
+
+    def test_deletes_referenced_objects_then_drops_partition(
+        self, service, mock_repo, storage
+    ):
+        urls = [storage.put(f"faces/{i}.jpg") for i in range(3)]
+        storage.put("faces/keep.jpg")
+        mock_repo.list_login_partitions.side_effect = lambda attached: (
+            ([], None) if attached else (["tb_user_faces_login_p202601"], None)
+        )
+        mock_repo.fetch_source_images.side_effect = _pages(
+            [(1, urls[:2]), (5, None)],
+            [(9, [urls[2], "https://elsewhere.example/x.jpg"])],
+        )
+
+        result = service.run(NOW)
+
+        assert storage.names() == ["faces/keep.jpg"]
+        assert result.objects_deleted == 3
+        assert result.partitions_dropped == ["tb_user_faces_login_p202601"]
+        assert [c.args for c in mock_repo.save_checkpoint.call_args_list] == [
+            ("tb_user_faces_login_p202601", 5, 2),
+            ("tb_user_faces_login_p202601", 9, 3),
+        ]
+
+    def test_resumes_from_checkpoint(self, service, mock_repo, storage):
+        mock_repo.list_login_partitions.side_effect = lambda attached: (
+            ([], None) if attached else (["tb_user_faces_login_p202601"], None)
+        )
+        mock_repo.get_checkpoint.return_value = (
+            SimpleNamespace(last_id=5, objects_deleted=2),
+            None,
+        )
+
+        service.run(NOW)
+
+        mock_repo.fetch_source_images.assert_called_once_with(
+            "tb_user_faces_login_p202601", 5, 2
+        )
+
+    def test_keeps_partition_when_objects_cannot_be_deleted(
+        self, service, mock_repo, storage
+    ):
+        url = storage.put("faces/a.jpg")
+        storage.delete_objects = MagicMock(return_value=["faces/a.jpg"])
+        mock_repo.list_login_partitions.side_effect = lambda attached: (
+            ([], None) if attached else (["tb_user_faces_login_p202601"], None)
+        )
+        mock_repo.fetch_source_images.side_effect = _pages([(1, [url])])
+
+        result = service.run(NOW)
+
+        assert result.partitions_failed == ["tb_user_faces_login_p202601"]
+        mock_repo.save_checkpoint.assert_not_called()
+        mock_repo.drop_detached_partition.assert_not_called()
+
+    def test_failed_detach_is_reported(self, service, mock_repo):
+        mock_repo.detach_login_partition.return_value = Error(
+            ErrDatabaseError.code, "Database error: lock timeout"
+        )
+
+        result = service.run(NOW)
+
+        assert result.partitions_detached == []
+        assert result.partitions_failed == ["tb_user_faces_login_p202603"]
@@ -0,0 +1,218 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import threading
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.constants import UploadPriority
+from app.core.executors import executors
+from app.service.storage.hedged_uploader import HedgedUploader
+from app.service.storage.upload_scheduler import UploadScheduler
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Blob:
+    def __init__(self, bucket: "_Bucket", name: str):
+        self._bucket = bucket
+        self.name = name
+        self.public_url = f"https://storage.test/{name}"
+        self.md5_hash = None
+        self.crc32c = None
+
+    def upload_from_string(self, data: bytes, content_type=None):
+        behaviour = self._bucket.behaviours.get(self.name)
+        if isinstance(behaviour, threading.Event):
+            behaviour.wait(5)
+        elif behaviour is not None:
+            raise behaviour
+        self._bucket.objects[self.name] = data
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+
+    def delete(self):
+        del self._bucket.objects[self.name]
+        self._bucket.deleted.append(self.name)
+
+
+class _Bucket:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.deleted: list[str] = []
+        # object name -> exception to raise, or an Event to block on
+        self.behaviours: dict = {}
+
+    def blob(self, name: str) -> _Blob:
+        return _Blob(self, name)
+
+
+def _names():
+    counter = itertools.count(1)
+    return lambda: f"obj-{next(counter)}"
+
+
+def _uploader(**kwargs) -> HedgedUploader:
+    scheduler = UploadScheduler(
+        initial_limit=4,
+        breaker=CircuitBreaker("storage-test", slow_call_seconds=10, min_calls=100),
+    )
+    kwargs.setdefault("retry_base_seconds", 0)
+    kwargs.setdefault("hedge_min_delay_seconds", 0.05)
+    return HedgedUploader(scheduler, **kwargs)
+
+
+async def _until(predicate, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+
+class TestRetries:
+    def test_retries_under_a_new_name_until_success(self):
+        bucket = _Bucket()
+        bucket.behaviours["obj-1"] = ConnectionError("reset")
+        bucket.behaviours["obj-2"] = TimeoutError("slow")
+        uploader = _uploader(max_attempts=3)
+
+        uploaded = asyncio.run(
+            uploader.upload(
+                UploadPriority.SIGNUP, "req", bucket, _names(), b"img", "image/jpeg"
+            )
+        )
+
+        assert uploaded.name == "obj-3"
+        assert uploaded.url == "https://storage.test/obj-3"
+        assert uploaded.size == 3
+        assert uploaded.content_type == "image/jpeg"
+        assert (
+            uploaded.md5_hash == base64.b64encode(hashlib.md5(b"img").digest()).decode()
+        )
+        assert bucket.objects == {"obj-3": b"img"}
+
+    def test_gives_up_after_max_attempts(self):
+        bucket = _Bucket()
+        bucket.behaviours.update(
+            {f"obj-{i}": ConnectionError("reset") for i in range(1, 4)}
+        )
+        uploader = _uploader(max_attempts=2)
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(
+                uploader.upload(UploadPriority.SIGNUP, "req", bucket, _names(), b"img")
+            )
+        assert bucket.objects == {}
+
+    def test_open_circuit_is_not_retried(self):
+        uploader = _uploader(max_attempts=3)
+        uploader._scheduler.run = _raise_circuit_open
+        names = _names()
+
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(
+                uploader.upload(UploadPriority.LOGIN, "req", _Bucket(), names, b"img")
+            )
+        assert names() == "obj-2"
+
+
+async def _raise_circuit_open(*args, **kwargs):
+    raise CircuitOpenError("storage")
+
+
+# ---------------------------------------------------------------------------
+# Hedging
+# ---------------------------------------------------------------------------
+
+
+class TestHedging:
+    def test_slow_upload_is_hedged_and_losing_copy_deleted(self):
+        async def _test():
+            bucket = _Bucket()
+            stuck = threading.Event()
+            bucket.behaviours["obj-1"] = stuck
+            uploader = _uploader(hedge_budget_percent=100)
+            uploader._latencies.extend([0.01] * 20)
+
+            uploaded = await uploader.upload(
+                UploadPriority.LOGIN, "req", bucket, _names(), b"img"
+            )
+
+            assert uploaded.url == "https://storage.test/obj-2"
+            stuck.set()
+            await _until(lambda: bucket.deleted == ["obj-1"])
+            assert bucket.objects == {"obj-2": b"img"}
+
+        asyncio.run(_test())
+
+    def test_losing_hedge_that_never_started_leaves_storage_health_alone(
+        self, monkeypatch
+    ):
+        run = executors.storage.run
+        calls = itertools.count()
+
+        async def queued_behind_other_uploads(fn, *args, **kwargs):
+            if next(calls) > 0:
+                # The hedge holds a slot but waits for a storage thread.
+                await asyncio.sleep(5)
+            return await run(fn, *args, **kwargs)
+
+        monkeypatch.setattr(executors.storage, "run", queued_behind_other_uploads)
+
+        async def _test():
+            bucket = _Bucket()
+            slow = threading.Event()
+            bucket.behaviours["obj-1"] = slow
+            uploader = _uploader(hedge_budget_percent=100)
+            uploader._latencies.extend([0.01] * 20)
+            scheduler = uploader._scheduler
+            threading.Timer(0.2, slow.set).start()
+
+            uploaded = await uploader.upload(
+                UploadPriority.LOGIN, "req", bucket, _names(), b"img"
+            )
+
+            assert uploaded.url == "https://storage.test/obj-1"
+            await _until(lambda: scheduler.in_flight == 0)
+            assert scheduler.limit == 4
+            # Only the winning upload reached the breaker, as a success.
+            assert [failed for _, failed, _ in scheduler._breaker._window] == [False]
+            assert bucket.objects == {"obj-1": b"img"}
+
+        asyncio.run(_test())
+
+    def test_no_hedge_without_budget(self):
+        async def _test():
+            bucket = _Bucket()
+            slow = threading.Event()
+            bucket.behaviours["obj-1"] = slow
+            uploader = _uploader(hedge_budget_percent=0)
+            uploader._latencies.extend([0.01] * 20)
+            threading.Timer(0.2, slow.set).start()
+
+            uploaded = await uploader.upload(
+                UploadPriority.LOGIN, "req", bucket, _names(), b"img"
+            )
+
+            assert uploaded.url == "https://storage.test/obj-1"
+            assert list(bucket.objects) == ["obj-1"]
+
+        asyncio.run(_test())
+
+    def test_hedge_delay_follows_latency_percentile(self):
+        uploader = _uploader(hedge_percentile=95, hedge_min_delay_seconds=0.05)
+        assert uploader.hedge_delay() is None
+
+        uploader._latencies.extend([0.1] * 18 + [1.0, 2.0])
+
+        assert uploader.hedge_delay() == 1.0
@@ -0,0 +1,242 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.constants import IdempotencyStatus
+from app.core.exceptions import ErrIdempotencyKeyInProgress, ErrIdempotencyKeyReused
+from app.service.idempotency.idempotency_service import IdempotencyService
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock()
+    repo.claim.return_value = (None, None)
+    repo.complete.return_value = None
+    repo.release.return_value = None
+    repo.purge_expired.return_value = (0, None)
+    return repo
+
+
+@pytest.fixture
+def service(mock_repo):
+    return IdempotencyService(idempotency_repository=mock_repo)
+
+
+def _ok(value):
+    return AsyncMock(return_value=(value, None))
+
+
+def _run(service, operation, key="key-1", fingerprint="fp"):
+    return service.run_async("scope", key, fingerprint, operation, dict, dict)
+
+
+# ---------------------------------------------------------------------------
+# run_async
+# ---------------------------------------------------------------------------
+
+
+class TestRunAsync:
+    def test_first_request_runs_and_stores_result(self, service, mock_repo):
+        operation = _ok({"session_id": "s-1"})
+
+        result, err = asyncio.run(_run(service, operation))
+
+        assert err is None
+        assert result == {"session_id": "s-1"}
+        operation.assert_awaited_once()
+        mock_repo.complete.assert_called_once_with(
+            "scope", "key-1", {"session_id": "s-1"}
+        )
+
+    def test_replay_is_served_from_local_cache(self, service, mock_repo):
+        operation = AsyncMock()
+
+        async def _test():
+            await _run(service, _ok({"session_id": "s-1"}))
+            return await _run(service, operation)
+
+        result, err = asyncio.run(_test())
+
+        assert err is None
+        assert result == {"session_id": "s-1"}
+        operation.assert_not_awaited()
+        assert mock_repo.claim.call_count == 1
+
+    def test_replay_is_served_from_stored_record(self, service, mock_repo):
+        mock_repo.claim.return_value = (
+            SimpleNamespace(
+                fingerprint="fp",
+                status=IdempotencyStatus.COMPLETED,
+                response={"session_id": "s-remote"},
+            ),
+            None,
+        )
+        operation = AsyncMock()
+
+        result, err = asyncio.run(_run(service, operation))
+
+        assert err is None
+        assert result == {"session_id": "s-remote"}
+        operation.assert_not_awaited()
+
+    def test_reused_key_with_different_request_is_rejected(self, service):
+        operation = AsyncMock()
+
+        async def _test():
+            await _run(service, _ok({"session_id": "s-1"}))
+            return await _run(service, operation, fingerprint="other-fp")
+
+        result, err = asyncio.run(_test())
+
+        assert result is None
+        assert err.code == ErrIdempotencyKeyReused.code
+        operation.assert_not_awaited()
+
+    def test_failed_request_releases_key(self, service, mock_repo):
+        failure = MagicMock(code=5000001, message="boom")
+
+        async def _test():
+            failed = await _run(service, AsyncMock(return_value=(None, failure)))
+            retried = await _run(service, _ok({"session_id": "s-2"}))
+            return failed, retried
+
+        (_, err), (result, _) = asyncio.run(_test())
+
+        assert err is failure
+        mock_repo.release.assert_called_once_with("scope", "key-1")
+        assert result == {"session_id": "s-2"}
+
+    def test_cancelled_request_frees_local_waiters(self, service, mock_repo):
+        async def _test():
+            started = asyncio.Event()
+
+            async def never_finishes():
+                started.set()
+                await asyncio.Event().wait()
+
+            first = asyncio.create_task(_run(service, never_finishes))
+            await started.wait()
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await _run(service, _ok({"session_id": "s-2"}))
+
+        result, err = asyncio.run(_test())
+
+        assert err is None
+        assert result == {"session_id": "s-2"}
+
+    def test_concurrent_duplicate_waits_for_in_flight_result(self, service):
+        calls = []
+
+        async def _test():
+            release = asyncio.Event()
+
+            async def slow_operation():
+                calls.append(1)
+                await release.wait()
+                return {"session_id": "s-1"}, None
+
+            first = asyncio.create_task(_run(service, slow_operation))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(_run(service, slow_operation))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        results = asyncio.run(_test())
+
+        assert len(calls) == 1
+        assert results == [({"session_id": "s-1"}, None)] * 2
+
+    def test_waiting_duplicates_do_not_hold_db_threads(self, service, mock_repo):
+        async def _test():
+            release = asyncio.Event()
+
+            async def slow_operation():
+                await release.wait()
+                return {"session_id": "s-1"}, None
+
+            tasks = [
+                asyncio.create_task(_run(service, slow_operation)) for _ in range(50)
+            ]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(_test())
+
+        # One claim query for the key; the duplicates waited on the loop.
+        assert mock_repo.claim.call_count == 1
+        assert results == [({"session_id": "s-1"}, None)] * 50
+
+    def test_local_wait_times_out(self, service):
+        service._wait_timeout_seconds = 0.05
+
+        async def _test():
+            release = asyncio.Event()
+
+            async def slow_operation():
+                await release.wait()
+                return {"session_id": "s-1"}, None
+
+            first = asyncio.create_task(_run(service, slow_operation))
+            await asyncio.sleep(0.01)
+            second = await _run(service, slow_operation)
+            release.set()
+            await first
+            return second
+
+        result, err = asyncio.run(_test())
+
+        assert result is None
+        assert err.code == ErrIdempotencyKeyInProgress.code
+
+    def test_remote_in_progress_times_out(self, service, mock_repo):
+        service._wait_timeout_seconds = 0.05
+        mock_repo.claim.return_value = (
+            SimpleNamespace(
+                fingerprint="fp", status=IdempotencyStatus.IN_PROGRESS, response=None
+            ),
+            None,
+        )
+
+        result, err = asyncio.run(_run(service, AsyncMock()))
+
+        assert result is None
+        assert err.code == ErrIdempotencyKeyInProgress.code
+
+    def test_remote_result_is_picked_up_by_polling(self, service, mock_repo):
+        mock_repo.claim.side_effect = [
+            (
+                SimpleNamespace(
+                    fingerprint="fp",
+                    status=IdempotencyStatus.IN_PROGRESS,
+                    response=None,
+                ),
+                None,
+            ),
+            (
+                SimpleNamespace(
+                    fingerprint="fp",
+                    status=IdempotencyStatus.COMPLETED,
+                    response={"session_id": "s-remote"},
+                ),
+                None,
+            ),
+        ]
+        operation = AsyncMock()
+
+        result, err = asyncio.run(_run(service, operation))
+
+        assert err is None
+        assert result == {"session_id": "s-remote"}
+        operation.assert_not_awaited()
+        assert mock_repo.claim.call_count == 2
@@ -0,0 +1,143 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt import InvalidTokenError
+
+from app.util.jwt_keys import KeyRing, SigningKey
+
+_SECRET = "test-secret-with-enough-bytes-for-hs256"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _payload() -> dict:
+    return {
+        "sub": "a@example.com",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+
+
+def _write_pem(path, private_key) -> None:
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+
+def _ring(tmp_path, active_kid: str = "", **kwargs) -> KeyRing:
+    kwargs.setdefault("secret_key", _SECRET)
+    kwargs.setdefault("secret_algorithm", "HS256")
+    return KeyRing.from_directory(tmp_path, active_kid=active_kid, **kwargs)
+
+
+@pytest.fixture
+def key_dir(tmp_path):
+    _write_pem(tmp_path / "2026-01.pem", ec.generate_private_key(ec.SECP256R1()))
+    _write_pem(tmp_path / "2026-07.pem", ed25519.Ed25519PrivateKey.generate())
+    return tmp_path
+
+
+# ---------------------------------------------------------------------------
+# Signing and verification
+# ---------------------------------------------------------------------------
+
+
+class TestSignAndVerify:
+    def test_latest_kid_signs_by_default(self, key_dir):
+        ring = _ring(key_dir)
+
+        token = ring.sign(_payload())
+
+        assert jwt.get_unverified_header(token) == {
+            "alg": "EdDSA",
+            "kid": "2026-07",
+            "typ": "JWT",
+        }
+        assert ring.decode(token)["sub"] == "a@example.com"
+
+    def test_tokens_of_previous_key_still_verify_after_rotation(self, key_dir):
+        old_token = _ring(key_dir, active_kid="2026-01").sign(_payload())
+
+        ring = _ring(key_dir, active_kid="2026-07")
+
+        assert jwt.get_unverified_header(old_token)["alg"] == "ES256"
+        assert ring.decode(old_token)["sub"] == "a@example.com"
+
+    def test_unknown_kid_is_rejected(self, key_dir, tmp_path_factory):
+        other = tmp_path_factory.mktemp("other")
+        _write_pem(other / "2026-07.pem", ed25519.Ed25519PrivateKey.generate())
+        forged = _ring(other).sign(_payload())
+        renamed = _ring(other)
+        renamed._active = SigningKey.from_private_key(
+            "2099-01", renamed._active.private_key
+        )
+
+        with pytest.raises(InvalidTokenError):
+            _ring(key_dir).decode(forged)
+        with pytest.raises(InvalidTokenError, match="unknown key id"):
+            _ring(key_dir).decode(renamed.sign(_payload()))
+
+    def test_hs256_fallback_can_be_disabled(self, key_dir):
+        legacy = jwt.encode(_payload(), _SECRET, algorithm="HS256")
+
+        assert _ring(key_dir).decode(legacy)["sub"] == "a@example.com"
+        with pytest.raises(InvalidTokenError, match="no key id"):
+            _ring(key_dir, accept_secret=False).decode(legacy)
+
+    def test_without_keys_signs_with_the_secret(self):
+        ring = KeyRing({}, secret_key=_SECRET, secret_algorithm="HS256")
+
+        token = ring.sign(_payload())
+
+        assert jwt.get_unverified_header(token)["alg"] == "HS256"
+        assert ring.decode(token)["sub"] == "a@example.com"
+
+    def test_rejects_unsupported_key_types(self, tmp_path):
+        _write_pem(tmp_path / "rsa.pem", rsa.generate_private_key(65537, 2048))
+
+        with pytest.raises(ValueError, match="P-256 and Ed25519"):
+            _ring(tmp_path)
+
+    def test_missing_active_kid_fails_fast(self, key_dir):
+        with pytest.raises(ValueError, match="2030-01"):
+            _ring(key_dir, active_kid="2030-01")
+
+
+# ---------------------------------------------------------------------------
+# JWKS
+# ---------------------------------------------------------------------------
+
+
+class TestJwks:
+    def test_publishes_every_public_key(self, key_dir):
+        ring = _ring(key_dir)
+
+        keys = json.loads(ring.jwks)["keys"]
+
+        assert [(k["kid"], k["alg"], k["kty"]) for k in keys] == [
+            ("2026-01", "ES256", "EC"),
+            ("2026-07", "EdDSA", "OKP"),
+        ]
+        assert all("d" not in k for k in keys)
+        token = ring.sign(_payload())
+        public = jwt.PyJWK(keys[1]).key
+        assert jwt.decode(token, public, algorithms=["EdDSA"])["sub"] == "a@example.com"
+
+    def test_etag_is_stable_and_matches_conditional_requests(self, key_dir):
+        ring = _ring(key_dir)
+
+        assert ring.jwks_etag == _ring(key_dir).jwks_etag
+        assert ring.jwks_not_modified(ring.jwks_etag)
+        assert ring.jwks_not_modified(f'"x", W/{ring.jwks_etag}')
+        assert not ring.jwks_not_modified('"x"')
+        assert not ring.jwks_not_modified(None)
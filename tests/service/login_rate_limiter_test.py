@@ -0,0 +1,198 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.exceptions import ErrDatabaseError, ErrTooManyRequests
+from app.repository import RateLimitRepository
+from app.service.user.login_rate_limiter import LoginRateLimiter
+from app.util.rate_limiter import SlidingWindowLimiter, sliding_window_retry_after
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(limit: int = 3, **kwargs) -> tuple[SlidingWindowLimiter, _Clock]:
+    clock = _Clock()
+    return SlidingWindowLimiter(limit, 10.0, clock=clock, **kwargs), clock
+
+
+def _service(**kwargs) -> tuple[LoginRateLimiter, MagicMock]:
+    repository = MagicMock()
+    repository.hit.return_value = (0.0, None)
+    repository.purge_stale.return_value = (0, None)
+    kwargs.setdefault("backend", "memory")
+    kwargs.setdefault("per_email", 2)
+    kwargs.setdefault("per_ip", 5)
+    kwargs.setdefault("window_seconds", 60)
+    return LoginRateLimiter(repository, **kwargs), repository
+
+
+# ---------------------------------------------------------------------------
+# Sliding window
+# ---------------------------------------------------------------------------
+
+
+class TestSlidingWindowLimiter:
+    def test_admits_limit_per_window_then_reports_wait(self):
+        limiter, _ = _limiter()
+
+        results = [limiter.hit("k") for _ in range(4)]
+
+        assert results[:3] == [0.0, 0.0, 0.0]
+        # The 3 hits of window [1000, 1010) start the next window at full
+        # weight and drop below the limit right after it begins.
+        assert results[3] == pytest.approx(10.0)
+
+    def test_previous_window_decays_across_the_boundary(self):
+        limiter, clock = _limiter()
+        for _ in range(3):
+            limiter.hit("k")
+
+        clock.now = 1012.0  # 20% into the next window: estimate 3 * 0.8
+        assert limiter.hit("k") == 0.0
+        # 3 * 0.8 + 1 = 3.4; under 3 once 3 * (1 - t/10) + 1 < 3, at t > 3.33.
+        assert limiter.hit("k") == pytest.approx(10 / 3 - 2)
+
+        clock.now = 1013.5
+        assert limiter.hit("k") == 0.0
+
+    def test_rejected_hits_are_not_counted(self):
+        limiter, clock = _limiter(limit=1)
+        limiter.hit("k")
+        for _ in range(100):
+            limiter.hit("k")
+
+        clock.now = 1020.0
+
+        assert limiter.hit("k") == 0.0
+
+    def test_keys_are_independent(self):
+        limiter, _ = _limiter(limit=1)
+
+        assert limiter.hit("a") == 0.0
+        assert limiter.hit("b") == 0.0
+        assert limiter.hit("a") > 0
+
+    def test_idle_keys_are_swept(self):
+        limiter, clock = _limiter(shards=1)
+        limiter.hit("a")
+        limiter.hit("b")
+
+        clock.now = 1030.0
+        limiter.hit("c")
+
+        assert len(limiter) == 1
+
+    def test_oldest_key_is_dropped_when_full(self):
+        limiter, _ = _limiter(limit=1, shards=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.hit(key)
+
+        assert len(limiter) == 2
+        assert limiter.hit("a") == 0.0
+
+    def test_zero_limit_disables(self):
+        limiter, _ = _limiter(limit=0)
+
+        assert all(limiter.hit("k") == 0.0 for _ in range(10))
+
+    def test_retry_after_without_previous_window(self):
+        assert sliding_window_retry_after(3, 10.0, 0, 2, 4.0) == 0.0
+        assert sliding_window_retry_after(3, 10.0, 0, 3, 4.0) == pytest.approx(6.0)
+
+
+# ---------------------------------------------------------------------------
+# Login throttling
+# ---------------------------------------------------------------------------
+
+
+class TestLoginRateLimiter:
+    def test_throttles_per_normalized_email(self):
+        service, _ = _service()
+
+        async def _test():
+            results = [
+                await service.check(email, f"10.0.0.{i}")
+                for i, email in enumerate(
+                    ["a@example.com", "A@Example.com ", "a@example.com"]
+                )
+            ]
+            return results
+
+        results = asyncio.run(_test())
+
+        assert [err for _, err in results] == [None, None, ErrTooManyRequests]
+        assert results[2][0] > 0
+
+    def test_throttles_per_ip_before_counting_the_account(self):
+        service, _ = _service(per_ip=1, per_email=1)
+
+        async def _test():
+            await service.check("a@example.com", "10.0.0.1")
+            blocked = await service.check("b@example.com", "10.0.0.1")
+            # b's budget was not used by the refused attempt.
+            allowed = await service.check("b@example.com", "10.0.0.2")
+            return blocked, allowed
+
+        (_, blocked), (_, allowed) = asyncio.run(_test())
+
+        assert blocked is ErrTooManyRequests
+        assert allowed is None
+
+    def test_postgres_backend_shares_counters(self):
+        service, repository = _service(backend="postgres")
+        repository.hit.side_effect = [(0.0, None), (12.5, None)]
+
+        retry_after, err = asyncio.run(service.check("a@example.com", "10.0.0.1"))
+
+        assert err is ErrTooManyRequests
+        assert retry_after == 12.5
+        assert [c.args for c in repository.hit.call_args_list] == [
+            ("login:ip:10.0.0.1", 5, 60),
+            ("login:email:a@example.com", 2, 60),
+        ]
+        repository.purge_stale.assert_called_once_with(60)
+
+    def test_postgres_errors_fall_back_to_local_counters(self):
+        service, repository = _service(backend="postgres", per_ip=0)
+        repository.hit.return_value = (0.0, ErrDatabaseError)
+
+        async def _test():
+            return [(await service.check("a@example.com", None))[1] for _ in range(3)]
+
+        assert asyncio.run(_test()) == [None, None, ErrTooManyRequests]
+
+
+# ---------------------------------------------------------------------------
+# Shared counters
+# ---------------------------------------------------------------------------
+
+
+class TestRateLimitRepository:
+    def test_refusal_without_previous_window_is_not_a_database_error(self):
+        session = MagicMock()
+        session.execute.return_value.first.side_effect = [
+            None,  # the hit was refused
+            SimpleNamespace(window_index=100, previous_count=0, current_count=1),
+        ]
+        factory = MagicMock()
+        factory.return_value.__enter__.return_value = session
+        repository = RateLimitRepository(factory)
+
+        with patch("app.repository.rate_limit_repository.time.time", return_value=1004):
+            retry_after, err = repository.hit("login:email:a@example.com", 3, 10)
+
+        assert err is None
+        assert retry_after == 0.0
@@ -0,0 +1,118 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlmodel import SQLModel
+
+from app.core.migrations import run_migrations
+from app.model import UserModel
+from app.model.user_face_model import ENROLLMENT_UNIQUE_INDEX
+
+# Migrations need a real Postgres; point TEST_DATABASE_URL at a scratch
+# database. Each test works in its own schema, dropped afterwards.
+_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not _DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def engine():
+    schema = f"test_migrations_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(
+        _DATABASE_URL, connect_args={"options": f"-c search_path={schema}"}
+    )
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def _create_legacy_faces(engine) -> uuid.UUID:
+    """A pre-partitioning schema with racing re-uploads left behind."""
+    SQLModel.metadata.create_all(engine, tables=[UserModel.__table__])
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE tb_user_faces ("
+                "id SERIAL PRIMARY KEY, "
+                "user_id uuid REFERENCES tb_users (id), "
+                "pose text, "
+                "source_images text[], "
+                "created_at timestamptz DEFAULT now(), "
+                "updated_at timestamptz DEFAULT now())"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO tb_users (id, email, is_ekyc_uploaded, created_at) "
+                "VALUES (:id, 'a@example.com', true, now())"
+            ),
+            {"id": user_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO tb_user_faces (user_id, pose, source_images, created_at) "
+                "VALUES "
+                "(:u, 'left', ARRAY['left-old'], now() - interval '2 days'), "
+                "(:u, 'left', ARRAY['left-new'], now() - interval '1 day'), "
+                "(:u, 'right', ARRAY['right'], now() - interval '1 day'), "
+                "(:u, 'login', ARRAY['login-1'], now() - interval '2 days'), "
+                "(:u, 'login', ARRAY['login-2'], now() - interval '1 day')"
+            ),
+            {"u": user_id},
+        )
+    return user_id
+
+
+# ---------------------------------------------------------------------------
+# Partitioning legacy tables
+# ---------------------------------------------------------------------------
+
+
+class TestPartitionUserFaces:
+    def test_duplicate_enrollment_rows_keep_the_newest(self, engine):
+        user_id = _create_legacy_faces(engine)
+
+        applied = run_migrations(engine)
+
+        assert "0002_tb_user_faces_partition_by_pose" in applied
+        assert "0004_tb_user_faces_enrollment_unique_pose" in applied
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT pose, source_images FROM tb_user_faces "
+                    "WHERE user_id = :u ORDER BY pose, created_at"
+                ),
+                {"u": user_id},
+            ).all()
+            index = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": ENROLLMENT_UNIQUE_INDEX}
+            ).scalar()
+        assert [(pose, images) for pose, images in rows] == [
+            ("left", ["left-new"]),
+            ("login", ["login-1"]),
+            ("login", ["login-2"]),
+            ("right", ["right"]),
+        ]
+        assert index is not None
+
+    def test_second_run_applies_nothing(self, engine):
+        _create_legacy_faces(engine)
+        run_migrations(engine)
+
+        assert run_migrations(engine) == []
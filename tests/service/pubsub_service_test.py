@@ -0,0 +1,140 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import msgpack
+import pytest
+
+from app.core.constants import Event
+from app.service.pubsub.pubsub_service import EVENT_SCHEMA_VERSION, PubsubService
+from app.service.storage.hedged_uploader import UploadedObject
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _uploaded(name: str, size: int = 1024) -> UploadedObject:
+    return UploadedObject(
+        name=name,
+        url=f"https://storage.test/{name}",
+        size=size,
+        content_type="image/jpeg",
+        md5_hash="1B2M2Y8AsgTpgAmY7PhCfg==",
+        crc32c="AAAAAA==",
+    )
+
+
+def _service(**kwargs) -> tuple[PubsubService, MagicMock]:
+    service = PubsubService(**kwargs)
+    publisher = MagicMock()
+    service._publisher = publisher
+    service._signup_topic_path = "projects/p/topics/sign-up"
+    service._signin_topic_path = "projects/p/topics/sign-in"
+    return service, publisher
+
+
+@pytest.fixture(autouse=True)
+def closed_breaker():
+    with patch("app.service.pubsub.pubsub_service.breakers") as breakers:
+        breakers.pubsub.allow.return_value = True
+        yield breakers
+
+
+# ---------------------------------------------------------------------------
+# Payload
+# ---------------------------------------------------------------------------
+
+
+class TestPayload:
+    def test_event_carries_objects_by_pose(self):
+        service, _ = _service(encoding="json")
+
+        message = service.build_event(
+            Event.SIGN_UP,
+            "42",
+            "session-1",
+            {
+                "left_face": [_uploaded("s/left_face_1.jpg")],
+                "front_face": [_uploaded("s/front_face_1.jpg", 2048)],
+            },
+        )
+
+        assert message["schema_version"] == EVENT_SCHEMA_VERSION
+        assert message["event"] == "sign_up"
+        assert message["faces"]["front_face"] == [
+            {
+                "key": "s/front_face_1.jpg",
+                "size": 2048,
+                "content_type": "image/jpeg",
+                "md5_hash": "1B2M2Y8AsgTpgAmY7PhCfg==",
+                "crc32c": "AAAAAA==",
+            }
+        ]
+
+    def test_msgpack_round_trips_and_is_smaller_than_json(self):
+        packed_service, _ = _service(encoding="msgpack")
+        json_service, _ = _service(encoding="json")
+        message = packed_service.build_event(
+            Event.SIGN_IN,
+            "42",
+            "session-1",
+            {"login_face": [_uploaded(f"s/login_face_{i}.jpg") for i in range(3)]},
+        )
+
+        packed, content_type = packed_service.encode_event(message)
+        encoded, _ = json_service.encode_event(message)
+
+        assert content_type == "application/msgpack"
+        assert msgpack.unpackb(packed) == message
+        assert json.loads(encoded) == message
+        assert len(packed) < len(encoded)
+
+    def test_unknown_encoding_falls_back_to_json(self):
+        service, _ = _service(encoding="protobuf")
+
+        _, content_type = service.encode_event({"event": "sign_in"})
+
+        assert content_type == "application/json"
+
+
+# ---------------------------------------------------------------------------
+# Publishing
+# ---------------------------------------------------------------------------
+
+
+class TestPublish:
+    def test_publishes_with_attributes_and_user_ordering_key(self):
+        service, publisher = _service(encoding="json", ordering_enabled=True)
+
+        service.publish_signin_event(
+            user_id="42", session_id="session-1", faces={"login_face": []}
+        )
+
+        args, kwargs = publisher.publish.call_args
+        assert args == ("projects/p/topics/sign-in",)
+        assert kwargs["ordering_key"] == "42"
+        assert kwargs["event"] == "sign_in"
+        assert kwargs["schema_version"] == str(EVENT_SCHEMA_VERSION)
+        assert kwargs["content_type"] == "application/json"
+        assert json.loads(kwargs["data"])["session_id"] == "session-1"
+
+    def test_no_ordering_key_when_ordering_disabled(self):
+        service, publisher = _service(encoding="json", ordering_enabled=False)
+
+        service.publish_signup_event(user_id="42", session_id="s", faces={})
+
+        assert publisher.publish.call_args.kwargs["ordering_key"] == ""
+
+    def test_failed_publish_resumes_ordering_key(self):
+        service, publisher = _service(encoding="json", ordering_enabled=True)
+        future = MagicMock()
+        future.result.side_effect = RuntimeError("deadline exceeded")
+        future.add_done_callback.side_effect = lambda callback: callback(future)
+        publisher.publish.return_value = future
+
+        service.publish_signin_event(user_id="42", session_id="s", faces={})
+
+        publisher.resume_publish.assert_called_once_with(
+            "projects/p/topics/sign-in", "42"
+        )
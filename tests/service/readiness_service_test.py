@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+from app.core.executors import executors
+from app.service.health.readiness_service import ReadinessService
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Probe:
+    def __init__(self, error: Exception | None = None, gate=None):
+        self.calls = 0
+        self.error = error
+        self.gate = gate
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+
+
+def _service(probes: dict, **kwargs) -> ReadinessService:
+    kwargs.setdefault("required", ["database", "storage"])
+    kwargs.setdefault("warmup_budget_seconds", 1)
+    kwargs.setdefault("probe_timeout_seconds", 1)
+    kwargs.setdefault("cache_seconds", 60)
+    service = ReadinessService(MagicMock(), MagicMock(), **kwargs)
+    service._probes = {name: (executors.storage, fn) for name, fn in probes.items()}
+    return service
+
+
+# ---------------------------------------------------------------------------
+# warm_up
+# ---------------------------------------------------------------------------
+
+
+class TestWarmUp:
+    def test_not_ready_before_warm_up(self):
+        probe = _Probe()
+        service = _service({"database": probe, "storage": probe})
+
+        ready, results = asyncio.run(service.check())
+
+        assert ready is False
+        assert results == {}
+        assert probe.calls == 0
+
+    def test_optional_failure_does_not_block_readiness(self):
+        service = _service(
+            {
+                "database": _Probe(),
+                "storage": _Probe(),
+                "pubsub": _Probe(RuntimeError("no credentials")),
+            }
+        )
+
+        ready = asyncio.run(service.warm_up())
+
+        assert ready is True
+        assert service._results["pubsub"].ok is False
+        assert service._results["pubsub"].error == "no credentials"
+
+    def test_required_failure_blocks_readiness(self):
+        service = _service(
+            {"database": _Probe(ConnectionError("refused")), "storage": _Probe()}
+        )
+
+        assert asyncio.run(service.warm_up()) is False
+        assert service.ready is False
+
+    def test_probe_over_budget_counts_as_failed(self):
+        gate = threading.Event()
+        service = _service(
+            {"database": _Probe(), "storage": _Probe(gate=gate)},
+            warmup_budget_seconds=0.05,
+        )
+        try:
+            ready = asyncio.run(service.warm_up())
+        finally:
+            gate.set()
+
+        assert ready is False
+        assert service._results["storage"].error == "timed out"
+
+
+# ---------------------------------------------------------------------------
+# check
+# ---------------------------------------------------------------------------
+
+
+class TestCheck:
+    def test_results_are_cached(self):
+        probe = _Probe()
+        service = _service({"database": probe, "storage": _Probe()})
+
+        async def _test():
+            await service.warm_up()
+            await service.check()
+            return await service.check()
+
+        ready, _ = asyncio.run(_test())
+
+        assert ready is True
+        assert probe.calls == 1
+
+    def test_stale_results_are_reprobed_and_recover(self):
+        storage = _Probe(ConnectionError("refused"))
+        service = _service({"database": _Probe(), "storage": storage}, cache_seconds=0)
+
+        async def _test():
+            assert await service.warm_up() is False
+            storage.error = None
+            return await service.check()
+
+        ready, results = asyncio.run(_test())
+
+        assert ready is True
+        assert results["storage"].ok is True
+        assert storage.calls == 2
+
+    def test_hung_probe_is_not_started_twice(self):
+        gate = threading.Event()
+        storage = _Probe(gate=gate)
+        service = _service(
+            {"database": _Probe(), "storage": storage},
+            warmup_budget_seconds=0.05,
+            probe_timeout_seconds=0.05,
+            cache_seconds=0,
+        )
+
+        async def _test():
+            await service.warm_up()
+            ready, _ = await service.check()
+            gate.set()
+            await asyncio.sleep(0.05)
+            return ready, await service.check()
+
+        first, (second, _) = asyncio.run(_test())
+
+        assert first is False
+        assert second is True
+        assert storage.calls == 2
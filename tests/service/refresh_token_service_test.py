@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import uuid
+from unittest.mock import MagicMock
+
+from app.core.exceptions import ErrInvalidRefreshToken, ErrRefreshTokenReused
+from app.repository import RefreshTokenOwner
+from app.service.user.refresh_token_service import RefreshTokenService
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _service() -> tuple[RefreshTokenService, MagicMock]:
+    repository = MagicMock()
+    repository.create.return_value = None
+    repository.purge_expired.return_value = (0, None)
+    return RefreshTokenService(repository, ttl_seconds=60), repository
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+# ---------------------------------------------------------------------------
+# Issue
+# ---------------------------------------------------------------------------
+
+
+class TestIssue:
+    def test_stores_only_the_hash_in_a_new_family(self):
+        service, repository = _service()
+        user_id = uuid.uuid4()
+
+        token, err = asyncio.run(service.issue(user_id))
+
+        assert err is None
+        token_hash, family_id, stored_user_id, ttl = repository.create.call_args.args
+        assert token_hash == _digest(token)
+        assert isinstance(family_id, uuid.UUID)
+        assert stored_user_id == user_id
+        assert ttl == 60
+
+    def test_purges_at_most_once_per_interval(self):
+        service, repository = _service()
+
+        async def _test():
+            await service.issue(uuid.uuid4())
+            await service.issue(uuid.uuid4())
+
+        asyncio.run(_test())
+
+        repository.purge_expired.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+
+class TestRefresh:
+    def test_rotates_to_a_new_token(self):
+        service, repository = _service()
+        owner = RefreshTokenOwner(user_id=uuid.uuid4(), email="a@example.com")
+        repository.rotate.return_value = (owner, None)
+
+        result, err = asyncio.run(service.refresh("old-token"))
+
+        assert err is None
+        got_owner, new_token = result
+        assert got_owner is owner
+        assert new_token != "old-token"
+        assert repository.rotate.call_args.args == (
+            _digest("old-token"),
+            _digest(new_token),
+            60,
+        )
+
+    def test_unknown_token_is_invalid(self):
+        service, repository = _service()
+        repository.rotate.return_value = (None, None)
+        repository.get_state.return_value = (None, None)
+
+        result, err = asyncio.run(service.refresh("nope"))
+
+        assert result is None
+        assert err is ErrInvalidRefreshToken
+        repository.revoke_family.assert_not_called()
+
+    def test_reused_token_revokes_its_family(self):
+        service, repository = _service()
+        family_id = uuid.uuid4()
+        repository.rotate.return_value = (None, None)
+        repository.get_state.return_value = (
+            {"family_id": family_id, "used": True, "revoked": False, "expired": False},
+            None,
+        )
+        repository.revoke_family.return_value = (3, None)
+
+        result, err = asyncio.run(service.refresh("stolen"))
+
+        assert result is None
+        assert err is ErrRefreshTokenReused
+        repository.revoke_family.assert_called_once_with(family_id)
+
+    def test_overlong_token_skips_the_database(self):
+        service, repository = _service()
+
+        result, err = asyncio.run(service.refresh("x" * 500))
+
+        assert result is None
+        assert err is ErrInvalidRefreshToken
+        repository.rotate.assert_not_called()
@@ -0,0 +1,155 @@
+import os
+import signal
+import time
+
+import pytest
+
+from app.cli import serve
+from app.cli.serve import _Supervisor
+
+# The supervisor forks real processes; only the worker body is replaced, so
+# restarts, signals and reaping run as in production. Executor threads left
+# by other tests make Python warn about forking; the stub workers are safe.
+pytestmark = pytest.mark.filterwarnings(
+    "ignore:This process .* is multi-threaded:DeprecationWarning"
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def _restore_signals(monkeypatch):
+    monkeypatch.setattr(serve, "_MIN_WORKER_UPTIME_SECONDS", 0.0)
+    handlers = {
+        signum: signal.getsignal(signum)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM)
+    }
+    yield
+    signal.alarm(0)
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+def _supervisor(monkeypatch, worker, workers=1, graceful_timeout=5) -> _Supervisor:
+    """A supervisor whose forked workers run ``worker(parent_pid)``."""
+
+    monkeypatch.setattr(
+        _Supervisor, "_run_worker", lambda self, parent_pid: worker(parent_pid)
+    )
+    return _Supervisor(None, None, workers, graceful_timeout)
+
+
+def _log(path, line: str) -> None:
+    with open(path, "a") as f:
+        f.write(f"{line}\n")
+
+
+def _lines(path) -> list[str]:
+    return path.read_text().splitlines() if path.exists() else []
+
+
+def _first(marker) -> bool:
+    """True for exactly one process, however many race for ``marker``."""
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        return False
+    return True
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _wait_for_sigterm() -> None:
+    while True:
+        signal.pause()
+
+
+# ---------------------------------------------------------------------------
+# Supervisor
+# ---------------------------------------------------------------------------
+
+
+class TestSupervisor:
+    def test_crashed_worker_is_restarted(self, monkeypatch, tmp_path):
+        starts = tmp_path / "starts"
+
+        def worker(parent_pid):
+            _log(starts, str(os.getpid()))
+            if _first(tmp_path / "crashed"):
+                return 1
+            os.kill(parent_pid, signal.SIGTERM)
+            _wait_for_sigterm()
+
+        started_at = time.monotonic()
+        code = _supervisor(monkeypatch, worker).run()
+
+        assert code == 0
+        assert len(_lines(starts)) == 2
+        # Stopped by SIGTERM, not by the kill alarm 10s later.
+        assert time.monotonic() - started_at < 5
+
+    def test_startup_failure_stops_all_workers(self, monkeypatch, tmp_path):
+        ready = tmp_path / "ready"
+        stopped = tmp_path / "stopped"
+
+        def worker(parent_pid):
+            if _first(tmp_path / "failed"):
+                # Fail once the others can report being stopped.
+                _wait_until(lambda: len(_lines(ready)) == 2)
+                return serve._STARTUP_FAILURE
+            signal.signal(signal.SIGTERM, lambda *_: (_log(stopped, ""), os._exit(0)))
+            _log(ready, "")
+            _wait_for_sigterm()
+
+        code = _supervisor(monkeypatch, worker, workers=3).run()
+
+        assert code == 1
+        # The failed worker is not restarted; the other two were stopped.
+        assert len(_lines(stopped)) == 2
+
+    def test_sigterm_lets_workers_drain(self, monkeypatch, tmp_path):
+        drained = tmp_path / "drained"
+        started = tmp_path / "started"
+
+        def worker(parent_pid):
+            def drain(*_):
+                time.sleep(0.2)  # finish in-flight requests
+                _log(drained, str(os.getpid()))
+                os._exit(0)
+
+            signal.signal(signal.SIGTERM, drain)
+            _log(started, "")
+            if _first(tmp_path / "stopper"):
+                _wait_until(lambda: len(_lines(started)) == 2)
+                os.kill(parent_pid, signal.SIGTERM)
+            _wait_for_sigterm()
+
+        code = _supervisor(monkeypatch, worker, workers=2).run()
+
+        assert code == 0
+        assert len(_lines(drained)) == 2
+
+    def test_workers_ignoring_sigterm_are_killed(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(serve, "_KILL_GRACE_SECONDS", 0)
+        finished = tmp_path / "finished"
+
+        def worker(parent_pid):
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            os.kill(parent_pid, signal.SIGTERM)
+            time.sleep(30)
+            _log(finished, "")
+            return 0
+
+        started_at = time.monotonic()
+        code = _supervisor(monkeypatch, worker, graceful_timeout=0).run()
+
+        assert code == 0
+        assert time.monotonic() - started_at < 10
+        assert not _lines(finished)
@@ -0,0 +1,172 @@
+import asyncio
+
+from app.core.exceptions import ErrServiceOverloaded, ErrSessionEventsUnavailable
+from app.service.ekyc.session_event_hub import (
+    InMemorySessionSource,
+    SessionEventHub,
+    _apply,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _CountingSource(InMemorySessionSource):
+    def __init__(self, error: Exception | None = None):
+        super().__init__()
+        self.listens = 0
+        self.error = error
+
+    def listen(self, session_id, callback):
+        self.listens += 1
+        if self.error is not None:
+            raise self.error
+        return super().listen(session_id, callback)
+
+    def listener_count(self, session_id: str) -> int:
+        return len(self._listeners.get(session_id, []))
+
+
+def _hub(source, **kwargs) -> SessionEventHub:
+    kwargs.setdefault("heartbeat_seconds", 5)
+    kwargs.setdefault("timeout_seconds", 5)
+    return SessionEventHub(source, **kwargs)
+
+
+async def _until(predicate, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+async def _collect(subscription) -> list[bytes]:
+    return [frame async for frame in subscription.frames()]
+
+
+# ---------------------------------------------------------------------------
+# Fan-out
+# ---------------------------------------------------------------------------
+
+
+class TestFanOut:
+    def test_subscribers_share_one_listener_until_result(self):
+        async def _test():
+            source = _CountingSource()
+            source.update("s1", {"fcm_token": "secret"})
+            hub = _hub(source)
+
+            first, _ = await hub.subscribe("s1")
+            second, _ = await hub.subscribe("s1")
+            streams = [
+                asyncio.create_task(_collect(first)),
+                asyncio.create_task(_collect(second)),
+            ]
+            await asyncio.sleep(0.01)
+            source.update("s1", {"status": "verifying"})
+            await asyncio.sleep(0.01)
+            source.update("s1", {"result": {"match": True}})
+            frames = await asyncio.gather(*streams)
+
+            await _until(lambda: source.listener_count("s1") == 0)
+            return source.listens, frames
+
+        listens, (first, second) = asyncio.run(_test())
+
+        assert listens == 1
+        assert first == second
+        assert first[0] == b"retry: 3000\n\n"
+        assert first[1:] == [
+            b'id: 1\nevent: session\ndata: {"status":"verifying"}\n\n',
+            b"id: 2\nevent: session\n"
+            b'data: {"status":"verifying","result":{"match":true}}\n\n',
+        ]
+        assert all(b"secret" not in frame for frame in first)
+
+    def test_late_subscriber_gets_current_state(self):
+        async def _test():
+            source = _CountingSource()
+            source.update("s1", {"status": "verifying"})
+            hub = _hub(source, timeout_seconds=0.05)
+            subscription, _ = await hub.subscribe("s1")
+            return await _collect(subscription)
+
+        frames = asyncio.run(_test())
+
+        assert frames[1] == b'id: 1\nevent: session\ndata: {"status":"verifying"}\n\n'
+        assert frames[-1] == b"event: timeout\ndata: {}\n\n"
+
+    def test_heartbeats_until_timeout(self):
+        async def _test():
+            hub = _hub(_CountingSource(), heartbeat_seconds=0.02, timeout_seconds=0.07)
+            subscription, _ = await hub.subscribe("s1")
+            return await _collect(subscription)
+
+        frames = asyncio.run(_test())
+
+        assert frames.count(b": keep-alive\n\n") >= 2
+        assert frames[-1] == b"event: timeout\ndata: {}\n\n"
+
+
+# ---------------------------------------------------------------------------
+# Limits and failures
+# ---------------------------------------------------------------------------
+
+
+class TestLimits:
+    def test_closing_last_subscriber_closes_listener(self):
+        async def _test():
+            source = _CountingSource()
+            hub = _hub(source)
+            subscription, _ = await hub.subscribe("s1")
+            assert source.listener_count("s1") == 1
+
+            subscription.close()
+            subscription.close()
+
+            await _until(lambda: source.listener_count("s1") == 0)
+            return hub._sessions
+
+        assert asyncio.run(_test()) == {}
+
+    def test_rejects_sessions_over_limit(self):
+        async def _test():
+            hub = _hub(_CountingSource(), max_sessions=1)
+            await hub.subscribe("s1")
+            return await hub.subscribe("s2")
+
+        subscription, err = asyncio.run(_test())
+
+        assert subscription is None
+        assert err is ErrServiceOverloaded
+
+    def test_listener_failure_is_reported_and_forgotten(self):
+        async def _test():
+            source = _CountingSource(error=ConnectionError("refused"))
+            hub = _hub(source)
+            result = await hub.subscribe("s1")
+            return result, hub._sessions
+
+        (subscription, err), sessions = asyncio.run(_test())
+
+        assert subscription is None
+        assert err is ErrSessionEventsUnavailable
+        assert sessions == {}
+
+
+# ---------------------------------------------------------------------------
+# Snapshot updates
+# ---------------------------------------------------------------------------
+
+
+class TestApply:
+    def test_nested_put_and_patch(self):
+        snapshot = _apply(None, "put", "/", {"fcm_token": "t"})
+        snapshot = _apply(snapshot, "put", "/result/match", True)
+        snapshot = _apply(snapshot, "patch", "/result", {"score": 0.9})
+        snapshot = _apply(snapshot, "put", "/fcm_token", None)
+
+        assert snapshot == {"result": {"match": True, "score": 0.9}}
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.service.storage import InMemoryObjectStorage, StorageGcService
+
+NOW = datetime(2026, 10, 15, 12, tzinfo=timezone.utc)
+OLD = NOW - timedelta(days=2)
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def storage():
+    return InMemoryObjectStorage("bucket")
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock()
+    repo.iter_referenced_urls.return_value = iter([])
+    return repo
+
+
+@pytest.fixture
+def service(mock_repo, storage):
+    return StorageGcService(
+        user_face_repository=mock_repo,
+        object_storage=storage,
+        grace_period=timedelta(hours=24),
+    )
+
+
+def _referenced(mock_repo, urls):
+    mock_repo.iter_referenced_urls.return_value = iter(sorted(urls))
+
+
+# ---------------------------------------------------------------------------
+# collect
+# ---------------------------------------------------------------------------
+
+
+class TestCollect:
+    def test_deletes_only_unreferenced_objects_past_grace(
+        self, service, mock_repo, storage
+    ):
+        kept = storage.put("uploads/s1/left_1_a.jpg", updated=OLD)
+        storage.put("uploads/s1/left_2_b.jpg", size=7, updated=OLD)
+        storage.put("uploads/s2/login_1_c.jpg", updated=NOW - timedelta(hours=1))
+        storage.put("other/s3/x.jpg", updated=OLD)
+        _referenced(mock_repo, [kept])
+
+        result, err = service.collect("uploads", now=NOW)
+
+        assert err is None
+        assert storage.names() == [
+            "other/s3/x.jpg",
+            "uploads/s1/left_1_a.jpg",
+            "uploads/s2/login_1_c.jpg",
+        ]
+        assert (result.scanned, result.referenced, result.too_recent) == (3, 1, 1)
+        assert (result.deleted, result.bytes_deleted) == (1, 7)
+        mock_repo.iter_referenced_urls.assert_called_once_with(
+            "https://storage.googleapis.com/bucket/uploads/"
+        )
+
+    def test_merge_join_handles_interleaved_names(self, service, mock_repo, storage):
+        names = [f"uploads/s{i:03d}/f.jpg" for i in range(250)]
+        for name in names:
+            storage.put(name, updated=OLD)
+        _referenced(
+            mock_repo,
+            [storage.url_for(name) for name in names[::3]]
+            + ["https://storage.googleapis.com/bucket/uploads/s999/gone.jpg"],
+        )
+        storage.delete_objects = MagicMock(wraps=storage.delete_objects)
+
+        result, err = service.collect("uploads", now=NOW)
+
+        assert err is None
+        assert storage.names() == names[::3]
+        assert result.deleted == 250 - len(names[::3])
+        # Deletes are batched (at most 100 per call).
+        assert [len(c.args[0]) for c in storage.delete_objects.call_args_list] == [
+            100,
+            66,
+        ]
+
+    def test_dry_run_deletes_nothing(self, service, storage):
+        storage.put("uploads/s1/a.jpg", updated=OLD)
+
+        result, err = service.collect("uploads", now=NOW, dry_run=True)
+
+        assert err is None
+        assert result.deleted == 1
+        assert storage.names() == ["uploads/s1/a.jpg"]
+
+    def test_names_needing_escaping_are_never_deleted(self, service, storage):
+        storage.put("uploads/s1/with space.jpg", updated=OLD)
+
+        result, err = service.collect("uploads", now=NOW)
+
+        assert err is None
+        assert result.deleted == 0
+        assert storage.names() == ["uploads/s1/with space.jpg"]
+
+    def test_database_failure_aborts_without_deleting(
+        self, service, mock_repo, storage
+    ):
+        storage.put("uploads/s1/a.jpg", updated=OLD)
+
+        def failing(url_prefix):
+            raise RuntimeError("connection lost")
+            yield
+
+        mock_repo.iter_referenced_urls.side_effect = failing
+
+        result, err = service.collect("uploads", now=NOW)
+
+        assert err is not None
+        assert storage.names() == ["uploads/s1/a.jpg"]
@@ -0,0 +1,236 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.constants import CircuitState, UploadPriority
+from app.service.storage.upload_scheduler import UploadScheduler
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Gate:
+    """Blocking upload stand-in that records start order and waits to finish."""
+
+    def __init__(self):
+        self.started: list[str] = []
+        self._release = threading.Event()
+        self._lock = threading.Lock()
+
+    def upload(self, name: str) -> str:
+        with self._lock:
+            self.started.append(name)
+        self._release.wait(5)
+        return name
+
+    def open(self):
+        self._release.set()
+
+
+async def _until(predicate, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestScheduling:
+    def test_limit_is_shared_across_requests(self):
+        async def _test():
+            scheduler = UploadScheduler(initial_limit=2, min_limit=1, max_limit=2)
+            gate = _Gate()
+            tasks = [
+                asyncio.create_task(
+                    scheduler.run(UploadPriority.SIGNUP, f"req-{i}", gate.upload, i)
+                )
+                for i in range(5)
+            ]
+            await _until(lambda: len(gate.started) == 2)
+            await asyncio.sleep(0.05)
+            assert scheduler.in_flight == 2
+            assert scheduler.queued() == 3
+            gate.open()
+            return await asyncio.gather(*tasks)
+
+        assert asyncio.run(_test()) == list(range(5))
+
+    def test_login_is_served_before_signup_and_requests_round_robin(self):
+        async def _test():
+            scheduler = UploadScheduler(initial_limit=1, min_limit=1, max_limit=1)
+            gate = _Gate()
+            blocker = asyncio.create_task(
+                scheduler.run(UploadPriority.SIGNUP, "blocker", gate.upload, "blocker")
+            )
+            await _until(lambda: gate.started == ["blocker"])
+
+            tasks = []
+            for name, priority, request_id in [
+                ("a1", UploadPriority.SIGNUP, "a"),
+                ("a2", UploadPriority.SIGNUP, "a"),
+                ("a3", UploadPriority.SIGNUP, "a"),
+                ("b1", UploadPriority.SIGNUP, "b"),
+                ("login", UploadPriority.LOGIN, "c"),
+            ]:
+                tasks.append(
+                    asyncio.create_task(
+                        scheduler.run(priority, request_id, gate.upload, name)
+                    )
+                )
+                await asyncio.sleep(0)
+            gate.open()
+            await asyncio.gather(blocker, *tasks)
+            return gate.started
+
+        assert asyncio.run(_test()) == ["blocker", "login", "a1", "b1", "a2", "a3"]
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        async def _test():
+            scheduler = UploadScheduler(initial_limit=1, min_limit=1, max_limit=1)
+            gate = _Gate()
+            first = asyncio.create_task(
+                scheduler.run(UploadPriority.SIGNUP, "a", gate.upload, "first")
+            )
+            await _until(lambda: gate.started == ["first"])
+            waiting = asyncio.create_task(
+                scheduler.run(UploadPriority.SIGNUP, "b", gate.upload, "cancelled")
+            )
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            gate.open()
+            await first
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            return scheduler.in_flight, scheduler.queued(), gate.started
+
+        assert asyncio.run(_test()) == (0, 0, ["first"])
+
+
+# ---------------------------------------------------------------------------
+# Adaptive limit
+# ---------------------------------------------------------------------------
+
+
+class TestAdaptiveLimit:
+    def test_errors_shrink_the_limit(self):
+        def failing_upload():
+            raise RuntimeError("503 from storage")
+
+        async def _test():
+            scheduler = UploadScheduler(initial_limit=10, min_limit=2, max_limit=10)
+            for _ in range(3):
+                with pytest.raises(RuntimeError):
+                    await scheduler.run(UploadPriority.SIGNUP, "a", failing_upload)
+            return scheduler.limit
+
+        assert asyncio.run(_test()) == 3
+
+    def test_limit_grows_while_saturated_at_healthy_latency(self):
+        async def _test():
+            scheduler = UploadScheduler(
+                initial_limit=2, min_limit=1, max_limit=8, latency_tolerance=100
+            )
+            await asyncio.gather(
+                *(
+                    scheduler.run(UploadPriority.SIGNUP, f"r{i % 4}", lambda: None)
+                    for i in range(40)
+                )
+            )
+            return scheduler.limit
+
+        assert asyncio.run(_test()) > 2
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+
+def _failing_upload():
+    raise ConnectionError("storage down")
+
+
+class TestCircuitBreaker:
+    def test_opens_on_error_rate_and_fails_fast(self):
+        async def _test():
+            breaker = CircuitBreaker(
+                "storage-test", slow_call_seconds=10, failure_rate=0.5, min_calls=4
+            )
+            scheduler = UploadScheduler(initial_limit=4, breaker=breaker)
+            for _ in range(4):
+                with pytest.raises(ConnectionError):
+                    await scheduler.run(UploadPriority.SIGNUP, "req", _failing_upload)
+            assert breaker.state == CircuitState.OPEN
+
+            calls = []
+            with pytest.raises(CircuitOpenError):
+                await scheduler.run(UploadPriority.LOGIN, "req", calls.append, 1)
+            assert calls == []
+            assert scheduler.in_flight == 0
+
+        asyncio.run(_test())
+
+    def test_half_open_trial_calls_close_the_circuit(self):
+        async def _test():
+            breaker = CircuitBreaker(
+                "storage-test",
+                slow_call_seconds=10,
+                min_calls=1,
+                open_seconds=0.05,
+                half_open_calls=2,
+            )
+            scheduler = UploadScheduler(initial_limit=4, breaker=breaker)
+            with pytest.raises(ConnectionError):
+                await scheduler.run(UploadPriority.SIGNUP, "req", _failing_upload)
+            assert breaker.state == CircuitState.OPEN
+
+            await asyncio.sleep(0.06)
+            assert breaker.state == CircuitState.HALF_OPEN
+            for i in range(2):
+                assert await scheduler.run(UploadPriority.LOGIN, "req", str, i) == str(
+                    i
+                )
+            assert breaker.state == CircuitState.CLOSED
+
+        asyncio.run(_test())
+
+    def test_slow_calls_open_the_circuit(self):
+        breaker = CircuitBreaker(
+            "rtdb-test", slow_call_seconds=1.0, slow_call_rate=0.5, min_calls=2
+        )
+
+        breaker.record(0.1, failed=False)
+        breaker.record(2.0, failed=False)
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+
+
+class TestCancellation:
+    def test_cancelled_upload_is_not_counted_as_a_failure(self):
+        async def _test():
+            breaker = CircuitBreaker("storage-test", slow_call_seconds=10)
+            scheduler = UploadScheduler(
+                initial_limit=4, min_limit=1, max_limit=4, breaker=breaker
+            )
+            gate = _Gate()
+            running = asyncio.create_task(
+                scheduler.run(UploadPriority.SIGNUP, "a", gate.upload, "hedge")
+            )
+            await _until(lambda: gate.started == ["hedge"])
+            running.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await running
+            gate.open()
+            return scheduler.limit, scheduler.in_flight, len(breaker._window)
+
+        assert asyncio.run(_test()) == (4, 0, 0)
@@ -0,0 +1,149 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.ecode import Error
+from app.core.exceptions import ErrDatabaseError
+from app.service.user.user_import_service import UserImportService, read_rows
+
+PRE_HASHED = "a" * 32 + "$" + "b" * 64
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock()
+    repo.bulk_insert.side_effect = lambda rows: ({row["email"] for row in rows}, None)
+    return repo
+
+
+@pytest.fixture
+def service(mock_repo):
+    return UserImportService(user_repository=mock_repo)
+
+
+def _errors(error_out: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in error_out.getvalue().splitlines()]
+
+
+# ---------------------------------------------------------------------------
+# read_rows
+# ---------------------------------------------------------------------------
+
+
+class TestReadRows:
+    def test_csv(self):
+        stream = io.StringIO("email,password\na@b.com,secret\nc@d.com,other\n")
+
+        rows = list(read_rows(stream, "csv"))
+
+        assert rows == [
+            (2, {"email": "a@b.com", "password": "secret"}),
+            (3, {"email": "c@d.com", "password": "other"}),
+        ]
+
+    def test_ndjson_marks_bad_lines(self):
+        stream = io.StringIO('{"email": "a@b.com"}\n\nnot json\n[1, 2]\n')
+
+        rows = list(read_rows(stream, "ndjson"))
+
+        assert rows[0] == (1, {"email": "a@b.com"})
+        assert [line_no for line_no, _ in rows] == [1, 3, 4]
+        assert "__error__" in rows[1][1]
+        assert "__error__" in rows[2][1]
+
+
+# ---------------------------------------------------------------------------
+# import_users
+# ---------------------------------------------------------------------------
+
+
+class TestImportUsers:
+    @patch("app.service.user.user_import_service.hash_password", return_value="h")
+    def test_hashes_plain_passwords_and_keeps_pre_hashed(
+        self, mock_hash, service, mock_repo
+    ):
+        records = [
+            (1, {"email": "a@b.com", "password": "secret"}),
+            (2, {"email": "c@d.com", "password_hashed": PRE_HASHED}),
+        ]
+
+        result = service.import_users(records, error_out=io.StringIO())
+
+        mock_hash.assert_called_once_with("secret")
+        rows = mock_repo.bulk_insert.call_args.args[0]
+        assert [row["password_hashed"] for row in rows] == ["h", PRE_HASHED]
+        assert "password" not in rows[0]
+        assert result.inserted == 2
+
+    @patch("app.service.user.user_import_service.hash_password", return_value="h")
+    def test_reports_invalid_and_duplicate_rows_without_aborting(
+        self, mock_hash, service, mock_repo
+    ):
+        mock_repo.bulk_insert.side_effect = lambda rows: ({"a@b.com"}, None)
+        records = [
+            (1, {"email": "a@b.com", "password": "secret"}),
+            (2, {"email": "not-an-email", "password": "secret"}),
+            (3, {"email": "a@b.com", "password": "again"}),
+            (4, {"email": "c@d.com", "password_hashed": "plain"}),
+        ]
+        error_out = io.StringIO()
+
+        result = service.import_users(records, error_out=error_out)
+
+        assert (result.processed, result.inserted) == (4, 1)
+        assert (result.invalid, result.duplicates) == (2, 1)
+        assert {(e["line"], e["reason"]) for e in _errors(error_out)} == {
+            (2, "invalid email"),
+            (3, "duplicate"),
+            (4, "invalid password_hashed format"),
+        }
+
+    @patch("app.service.user.user_import_service.hash_password", return_value="h")
+    def test_rejects_non_text_fields(self, mock_hash, service):
+        records = [
+            (1, {"email": 5, "password": "secret"}),
+            (2, {"email": "a@b.com", "password_hashed": ["x"]}),
+            (3, {"email": "b@b.com", "password": "secret", "full_name": 123}),
+            (4, {"email": "c@b.com", "password": "secret", "phone_number": 84}),
+            (5, {"email": "d@b.com", "password": 1234, "full_name": None}),
+        ]
+        error_out = io.StringIO()
+
+        result = service.import_users(records, error_out=error_out)
+
+        assert (result.processed, result.inserted, result.invalid) == (5, 1, 4)
+        assert [(e["line"], e["reason"]) for e in _errors(error_out)] == [
+            (1, "invalid email type"),
+            (2, "invalid password_hashed type"),
+            (3, "invalid full_name type"),
+            (4, "invalid phone_number type"),
+        ]
+
+    @patch("app.service.user.user_import_service.hash_password", return_value="h")
+    def test_loads_in_batches_and_continues_after_failed_batch(
+        self, mock_hash, service, mock_repo
+    ):
+        failure = Error(ErrDatabaseError.code, "Database error: boom")
+        mock_repo.bulk_insert.side_effect = [
+            (None, failure),
+            ({"c@d.com"}, None),
+        ]
+        records = [
+            (1, {"email": "a@b.com", "password": "x"}),
+            (2, {"email": "b@b.com", "password": "x"}),
+            (3, {"email": "c@d.com", "password": "x"}),
+        ]
+        error_out = io.StringIO()
+
+        result = service.import_users(records, error_out=error_out, batch_size=2)
+
+        assert mock_repo.bulk_insert.call_count == 2
+        assert (result.failed, result.inserted) == (2, 1)
+        assert [e["line"] for e in _errors(error_out)] == [1, 2]
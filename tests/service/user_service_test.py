@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime
 from unittest.mock import MagicMock, patch
@@ -7,6 +8,7 @@ import pytest
 from app.core.ecode import Error
 from app.core.exceptions import ErrInvalidCredentials, ErrUserNotFound
 from app.model import UserModel
+from app.repository import UserCredentials
 from app.service.user.user_service import UserService
 
 
@@ -30,6 +32,14 @@ def _make_user(**overrides) -> UserModel:
     return UserModel(**defaults)
 
 
+def _make_credentials() -> UserCredentials:
+    return UserCredentials(
+        id=uuid.uuid4(),
+        email="linh@example.com",
+        password_hashed="abc123salt$abc123hash",
+    )
+
+
 @pytest.fixture
 def mock_repo():
     return MagicMock()
@@ -50,7 +60,9 @@ class TestGetUserByEmail:
         user = _make_user()
         mock_repo.get_by_email.return_value = (user, None)
 
-        result_user, result_error = service.get_user_by_email("linh@example.com")
+        result_user, result_error = asyncio.run(
+            service.get_user_by_email("linh@example.com")
+        )
 
         mock_repo.get_by_email.assert_called_once_with("linh@example.com")
         assert result_user == user
@@ -60,13 +72,84 @@ class TestGetUserByEmail:
         error = Error(ErrUserNotFound.code, "user not found")
         mock_repo.get_by_email.return_value = (None, error)
 
-        result_user, result_error = service.get_user_by_email("unknown@example.com")
+        result_user, result_error = asyncio.run(
+            service.get_user_by_email("unknown@example.com")
+        )
 
         mock_repo.get_by_email.assert_called_once_with("unknown@example.com")
         assert result_user is None
         assert result_error.code == ErrUserNotFound.code
 
 
+# ---------------------------------------------------------------------------
+# get_users_batch
+# ---------------------------------------------------------------------------
+
+
+class TestGetUsersBatch:
+    def test_by_email_preserves_order_and_marks_missing(self, service, mock_repo):
+        a = {"id": uuid.uuid4(), "email": "a@example.com"}
+        b = {"id": uuid.uuid4(), "email": "b@example.com"}
+        mock_repo.get_many_by_emails.return_value = ([b, a], None)
+
+        results, error = asyncio.run(
+            service.get_users_batch(
+                emails=[
+                    "a@example.com",
+                    "missing@example.com",
+                    "b@example.com",
+                    "a@example.com",
+                ]
+            )
+        )
+
+        mock_repo.get_many_by_emails.assert_called_once_with(
+            ["a@example.com", "missing@example.com", "b@example.com"]
+        )
+        assert error is None
+        assert results == [
+            ("a@example.com", a),
+            ("missing@example.com", None),
+            ("b@example.com", b),
+            ("a@example.com", a),
+        ]
+
+    def test_by_email_matches_case_insensitively(self, service, mock_repo):
+        row = {"id": uuid.uuid4(), "email": "linh@example.com"}
+        mock_repo.get_many_by_emails.return_value = ([row], None)
+
+        results, error = asyncio.run(
+            service.get_users_batch(emails=["Linh@Example.com", "linh@example.com"])
+        )
+
+        mock_repo.get_many_by_emails.assert_called_once_with(["linh@example.com"])
+        assert error is None
+        assert results == [("Linh@Example.com", row), ("linh@example.com", row)]
+
+    def test_by_id(self, service, mock_repo):
+        user_id, missing_id = uuid.uuid4(), uuid.uuid4()
+        row = {"id": user_id, "email": "a@example.com"}
+        mock_repo.get_many_by_ids.return_value = ([row], None)
+
+        results, error = asyncio.run(
+            service.get_users_batch(user_ids=[missing_id, user_id])
+        )
+
+        assert error is None
+        assert results == [(str(missing_id), None), (str(user_id), row)]
+
+    def test_repository_error(self, service, mock_repo):
+        mock_repo.get_many_by_emails.return_value = (
+            None,
+            Error(5000001, "Database error: boom"),
+        )
+
+        results, error = asyncio.run(service.get_users_batch(emails=["a@example.com"]))
+
+        assert results is None
+        assert error.code == 5000001
+
+
 # ---------------------------------------------------------------------------
 # register_user
 # ---------------------------------------------------------------------------
@@ -78,11 +161,13 @@ class TestRegisterUser:
         user = _make_user(password_hashed="hashed_pw")
         mock_repo.create.return_value = (user, None)
 
-        result_user, result_error = service.register_user(
-            email="linh@example.com",
-            password="secret123",
-            full_name="Linh Nguyen",
-            phone_number="0901234567",
+        result_user, result_error = asyncio.run(
+            service.register_user(
+                email="linh@example.com",
+                password="secret123",
+                full_name="Linh Nguyen",
+                phone_number="0901234567",
+            )
         )
 
         mock_hash.assert_called_once_with("secret123")
@@ -100,9 +185,11 @@ class TestRegisterUser:
         error = Error(4090001, "user already exists")
         mock_repo.create.return_value = (None, error)
 
-        result_user, result_error = service.register_user(
-            email="dup@example.com",
-            password="secret123",
+        result_user, result_error = asyncio.run(
+            service.register_user(
+                email="dup@example.com",
+                password="secret123",
+            )
         )
 
         assert result_user is None
@@ -112,7 +199,7 @@ class TestRegisterUser:
     def test_optional_fields_default_to_none(self, mock_hash, service, mock_repo):
         mock_repo.create.return_value = (_make_user(), None)
 
-        service.register_user(email="a@b.com", password="pw")
+        asyncio.run(service.register_user(email="a@b.com", password="pw"))
 
         mock_repo.create.assert_called_once_with(
             email="a@b.com",
@@ -130,31 +217,45 @@ class TestRegisterUser:
 class TestLogin:
     @patch("app.service.user.user_service.verify_password", return_value=True)
     def test_success(self, mock_verify, service, mock_repo):
-        user = _make_user()
-        mock_repo.get_by_email.return_value = (user, None)
+        user = _make_credentials()
+        mock_repo.get_credentials_by_email.return_value = (user, None)
 
-        result_user, result_error = service.login("linh@example.com", "correct_pw")
+        result_user, result_error = asyncio.run(
+            service.login("linh@example.com", "correct_pw")
+        )
 
-        mock_repo.get_by_email.assert_called_once_with("linh@example.com")
+        mock_repo.get_credentials_by_email.assert_called_once_with("linh@example.com")
         mock_verify.assert_called_once_with("correct_pw", user.password_hashed)
         assert result_user == user
         assert result_error is None
 
+    @patch("app.service.user.user_service.verify_password", return_value=True)
+    def test_email_is_normalized(self, mock_verify, service, mock_repo):
+        mock_repo.get_credentials_by_email.return_value = (_make_credentials(), None)
+
+        asyncio.run(service.login("  Linh@Example.COM ", "correct_pw"))
+
+        mock_repo.get_credentials_by_email.assert_called_once_with("linh@example.com")
+
     def test_user_not_found(self, service, mock_repo):
         error = Error(ErrUserNotFound.code, "user not found")
-        mock_repo.get_by_email.return_value = (None, error)
+        mock_repo.get_credentials_by_email.return_value = (None, error)
 
-        result_user, result_error = service.login("unknown@example.com", "pw")
+        result_user, result_error = asyncio.run(
+            service.login("unknown@example.com", "pw")
+        )
 
         assert result_user is None
         assert result_error.code == ErrUserNotFound.code
 
     @patch("app.service.user.user_service.verify_password", return_value=False)
     def test_invalid_password(self, mock_verify, service, mock_repo):
-        user = _make_user()
-        mock_repo.get_by_email.return_value = (user, None)
+        user = _make_credentials()
+        mock_repo.get_credentials_by_email.return_value = (user, None)
 
-        result_user, result_error = service.login("linh@example.com", "wrong_pw")
+        result_user, result_error = asyncio.run(
+            service.login("linh@example.com", "wrong_pw")
+        )
 
         mock_verify.assert_called_once_with("wrong_pw", user.password_hashed)
         assert result_user is None